@@ -40,9 +40,34 @@ try:
 except:
     in_webui = False
 
+PRECISIONS = ('fp32', 'fp16', 'bf16')
+
+def resolve_precision(precision, device):
+    """
+    Map a precision name to the autocast dtype used on `device` (None for fp32).
+    fp16 is only used on CUDA; on CPU it falls back to bf16.
+    """
+    if precision is None or precision == 'fp32':
+        return None
+    if precision == 'bf16':
+        return torch.bfloat16
+    if precision == 'fp16':
+        if str(device).startswith('cuda'):
+            return torch.float16
+        print('fp16 autocast is not supported on CPU, using bf16 instead.')
+        return torch.bfloat16
+    raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+
+def convert_conv2d_channels_last(module):
+    # only the 2D convolutions benefit; 5D weights have no channels_last layout
+    for m in module.modules():
+        if isinstance(m, torch.nn.Conv2d):
+            m.to(memory_format=torch.channels_last)
+    return module
+
 class AnimateFromCoeff():
 
-    def __init__(self, sadtalker_path, device):
+    def __init__(self, sadtalker_path, device, precision='fp32', channels_last=False):
 
         with open(sadtalker_path['facerender_yaml']) as f:
             config = yaml.safe_load(f)
@@ -90,6 +115,12 @@ class AnimateFromCoeff():
         self.generator.eval()
         self.he_estimator.eval()
         self.mapping.eval()
+
+        self.amp_dtype = resolve_precision(precision, device)
+        self.channels_last = channels_last
+        if channels_last:
+            for module in (self.kp_extractor, self.generator, self.mapping):
+                convert_conv2d_channels_last(module)
          
         self.device = device
     
@@ -192,7 +223,9 @@ class AnimateFromCoeff():
 
         predictions_video = make_animation(source_image, source_semantics, target_semantics,
                                         self.generator, self.kp_extractor, self.he_estimator, self.mapping, 
-                                        yaw_c_seq, pitch_c_seq, roll_c_seq, use_exp = True)
+                                        yaw_c_seq, pitch_c_seq, roll_c_seq, use_exp = True,
+                                        use_half=self.amp_dtype is not None, amp_dtype=self.amp_dtype,
+                                        channels_last=self.channels_last)
 
         predictions_video = predictions_video.reshape((-1,)+predictions_video.shape[2:])
         predictions_video = predictions_video[:frame_num]
@@ -29,19 +29,27 @@ class DenseMotionNetwork(nn.Module):
             self.occlusion = None
 
         self.num_kp = num_kp
+        # coordinate grids depend only on shape, dtype and device; reused every frame
+        self.grid_cache = {}
 
+    def coordinate_grid(self, spatial_size, like):
+        key = (tuple(spatial_size), like.dtype, like.device)
+        grid = self.grid_cache.get(key)
+        if grid is None:
+            grid = make_coordinate_grid(spatial_size, type=like.type())
+            self.grid_cache[key] = grid
+        return grid
 
     def create_sparse_motions(self, feature, kp_driving, kp_source):
         bs, _, d, h, w = feature.shape
-        identity_grid = make_coordinate_grid((d, h, w), type=kp_source['value'].type())
+        identity_grid = self.coordinate_grid((d, h, w), kp_source['value'])
         identity_grid = identity_grid.view(1, 1, d, h, w, 3)
         coordinate_grid = identity_grid - kp_driving['value'].view(bs, self.num_kp, 1, 1, 1, 3)
         
         # if 'jacobian' in kp_driving:
         if 'jacobian' in kp_driving and kp_driving['jacobian'] is not None:
             jacobian = torch.matmul(kp_source['jacobian'], torch.inverse(kp_driving['jacobian']))
-            jacobian = jacobian.unsqueeze(-3).unsqueeze(-3).unsqueeze(-3)
-            jacobian = jacobian.repeat(1, 1, d, h, w, 1, 1)
+            jacobian = jacobian.unsqueeze(-3).unsqueeze(-3).unsqueeze(-3)   # broadcast over d, h, w in matmul
             coordinate_grid = torch.matmul(jacobian, coordinate_grid.unsqueeze(-1))
             coordinate_grid = coordinate_grid.squeeze(-1)                  
 
@@ -49,7 +57,7 @@ class DenseMotionNetwork(nn.Module):
         driving_to_source = coordinate_grid + kp_source['value'].view(bs, self.num_kp, 1, 1, 1, 3)    # (bs, num_kp, d, h, w, 3)
 
         #adding background feature
-        identity_grid = identity_grid.repeat(bs, 1, 1, 1, 1, 1)
+        identity_grid = identity_grid.expand(bs, 1, d, h, w, 3)
         sparse_motions = torch.cat([identity_grid, driving_to_source], dim=1)                #bs num_kp+1 d h w 3
         
         # sparse_motions = driving_to_source
@@ -67,22 +75,32 @@ class DenseMotionNetwork(nn.Module):
 
     def create_heatmap_representations(self, feature, kp_driving, kp_source):
         spatial_size = feature.shape[3:]
-        gaussian_driving = kp2gaussian(kp_driving, spatial_size=spatial_size, kp_variance=0.01)
-        gaussian_source = kp2gaussian(kp_source, spatial_size=spatial_size, kp_variance=0.01)
+        grid = self.coordinate_grid(spatial_size, kp_driving['value'])
+        gaussian_driving = kp2gaussian(kp_driving, spatial_size=spatial_size, kp_variance=0.01, coordinate_grid=grid)
+        gaussian_source = kp2gaussian(kp_source, spatial_size=spatial_size, kp_variance=0.01, coordinate_grid=grid)
         heatmap = gaussian_driving - gaussian_source
 
         # adding background feature
-        zeros = torch.zeros(heatmap.shape[0], 1, spatial_size[0], spatial_size[1], spatial_size[2]).type(heatmap.type())
+        zeros = heatmap.new_zeros(heatmap.shape[0], 1, spatial_size[0], spatial_size[1], spatial_size[2])
         heatmap = torch.cat([zeros, heatmap], dim=1)
         heatmap = heatmap.unsqueeze(2)         # (bs, num_kp+1, 1, d, h, w)
         return heatmap
 
-    def forward(self, feature, kp_driving, kp_source):
-        bs, _, d, h, w = feature.shape
-
+    def compress_feature(self, feature):
+        """
+        Compress the source feature volume; depends only on the source image
+        """
         feature = self.compress(feature)
         feature = self.norm(feature)
         feature = F.relu(feature)
+        return feature
+
+    def forward(self, feature, kp_driving, kp_source, compressed_feature=None):
+        bs, _, d, h, w = feature.shape
+
+        if compressed_feature is None:
+            compressed_feature = self.compress_feature(feature)
+        feature = compressed_feature
 
         out_dict = dict()
         sparse_motion = self.create_sparse_motions(feature, kp_driving, kp_source)
@@ -103,8 +121,7 @@ class DenseMotionNetwork(nn.Module):
         out_dict['mask'] = mask
         mask = mask.unsqueeze(2)                                   # (bs, num_kp+1, 1, d, h, w)
         
-        zeros_mask = torch.zeros_like(mask)   
-        mask = torch.where(mask < 1e-3, zeros_mask, mask) 
+        mask = mask.masked_fill(mask < 1e-3, 0)
 
         sparse_motion = sparse_motion.permute(0, 1, 5, 2, 3, 4)    # (bs, num_kp+1, 3, d, h, w)
         deformation = (sparse_motion * mask).sum(dim=1)            # (bs, 3, d, h, w)
@@ -207,7 +207,11 @@ class OcclusionAwareSPADEGenerator(nn.Module):
             deformation = deformation.permute(0, 2, 3, 4, 1)
         return F.grid_sample(inp, deformation)
 
-    def forward(self, source_image, kp_driving, kp_source):
+    def encode_source(self, source_image):
+        """
+        Source-only stage: the 3D feature volume and its compressed dense-motion
+        feature. Both are constant for a video and can be cached by the caller.
+        """
         # Encoding (downsampling) part
         out = self.first(source_image)
         for i in range(len(self.down_blocks)):
@@ -218,11 +222,26 @@ class OcclusionAwareSPADEGenerator(nn.Module):
         feature_3d = out.view(bs, self.reshape_channel, self.reshape_depth, h ,w) 
         feature_3d = self.resblocks_3d(feature_3d)
 
+        source_features = {'feature_3d': feature_3d}
+        if self.dense_motion_network is not None:
+            source_features['motion_feature'] = self.dense_motion_network.compress_feature(feature_3d)
+        else:
+            source_features['feature_2d'] = out
+        return source_features
+
+    def decode(self, source_features, kp_driving, kp_source):
+        """
+        Per-frame stage: warp the cached source features to the driving keypoints and decode.
+        """
+        feature_3d = source_features['feature_3d']
+        out = source_features.get('feature_2d')
+
         # Transforming feature representation according to deformation and occlusion
         output_dict = {}
         if self.dense_motion_network is not None:
             dense_motion = self.dense_motion_network(feature=feature_3d, kp_driving=kp_driving,
-                                                     kp_source=kp_source)
+                                                     kp_source=kp_source,
+                                                     compressed_feature=source_features.get('motion_feature'))
             output_dict['mask'] = dense_motion['mask']
 
             # import pdb; pdb.set_trace()
@@ -252,4 +271,7 @@ class OcclusionAwareSPADEGenerator(nn.Module):
 
         output_dict["prediction"] = out
         
-        return output_dict
\ No newline at end of file
+        return output_dict
+
+    def forward(self, source_image, kp_driving, kp_source):
+        return self.decode(self.encode_source(source_image), kp_driving=kp_driving, kp_source=kp_source)
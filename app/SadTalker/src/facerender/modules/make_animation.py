@@ -1,3 +1,4 @@
+import contextlib
 from scipy.spatial import ConvexHull
 import torch
 import torch.nn.functional as F
@@ -99,13 +100,29 @@ def keypoint_transformation(kp_canonical, he, wo_exp=False):
 
 
 
+def inference_autocast(device_type, use_half=False, amp_dtype=None):
+    # use_half runs the renderer under autocast: fp16 on CUDA, bf16 on CPU
+    # unless amp_dtype says otherwise
+    if not use_half:
+        return contextlib.nullcontext()
+    if amp_dtype is None:
+        amp_dtype = torch.float16 if device_type == 'cuda' else torch.bfloat16
+    return torch.autocast(device_type=device_type, dtype=amp_dtype)
+
 def make_animation(source_image, source_semantics, target_semantics,
                             generator, kp_detector, he_estimator, mapping, 
                             yaw_c_seq=None, pitch_c_seq=None, roll_c_seq=None,
-                            use_exp=True, use_half=False):
-    with torch.no_grad():
+                            use_exp=True, use_half=False, amp_dtype=None, channels_last=False):
+    # predictions are always returned as fp32
+    if channels_last:
+        source_image = source_image.contiguous(memory_format=torch.channels_last)
+
+    with torch.no_grad(), inference_autocast(source_image.device.type, use_half, amp_dtype):
         predictions = []
 
+        # the source image is constant for the whole video, encode it once
+        source_features = generator.encode_source(source_image)
+
         kp_canonical = kp_detector(source_image)
         he_source = mapping(source_semantics)
         kp_source = keypoint_transformation(kp_canonical, he_source)
@@ -125,7 +142,7 @@ def make_animation(source_image, source_semantics, target_semantics,
             kp_driving = keypoint_transformation(kp_canonical, he_driving)
                 
             kp_norm = kp_driving
-            out = generator(source_image, kp_source=kp_source, kp_driving=kp_norm)
+            out = generator.decode(source_features, kp_source=kp_source, kp_driving=kp_norm)
             '''
             source_image_new = out['prediction'].squeeze(1)
             kp_canonical_new =  kp_detector(source_image_new)
@@ -134,7 +151,7 @@ def make_animation(source_image, source_semantics, target_semantics,
             kp_driving_new = keypoint_transformation(kp_canonical_new, he_driving, wo_exp=True)
             out = generator(source_image_new, kp_source=kp_source_new, kp_driving=kp_driving_new)
             '''
-            predictions.append(out['prediction'])
+            predictions.append(out['prediction'].float())
         predictions_ts = torch.stack(predictions, dim=1)
     return predictions_ts
 
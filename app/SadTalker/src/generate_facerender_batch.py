@@ -7,7 +7,7 @@ import scipy.io as scio
 
 def get_facerender_data(coeff_path, pic_path, first_coeff_path, audio_path, 
                         batch_size, input_yaw_list=None, input_pitch_list=None, input_roll_list=None, 
-                        expression_scale=1.0, still_mode = False, preprocess='crop', size = 256):
+                        expression_scale=1.0, still_mode = False, preprocess='crop', size = 256, save_txt=False):
 
     semantic_radius = 13
     video_name = os.path.splitext(os.path.split(coeff_path)[-1])[0]
@@ -49,25 +49,16 @@ def get_facerender_data(coeff_path, pic_path, first_coeff_path, audio_path,
     if still_mode:
         generated_3dmm[:, 64:] = np.repeat(source_semantics[:, 64:], generated_3dmm.shape[0], axis=0)
 
-    with open(txt_path+'.txt', 'w') as f:
-        for coeff in generated_3dmm:
-            for i in coeff:
-                f.write(str(i)[:7]   + '  '+'\t')
-            f.write('\n')
+    if save_txt:
+        with open(txt_path+'.txt', 'w') as f:
+            for coeff in generated_3dmm:
+                for i in coeff:
+                    f.write(str(i)[:7]   + '  '+'\t')
+                f.write('\n')
 
-    target_semantics_list = [] 
     frame_num = generated_3dmm.shape[0]
     data['frame_num'] = frame_num
-    for frame_idx in range(frame_num):
-        target_semantics = transform_semantic_target(generated_3dmm, frame_idx, semantic_radius)
-        target_semantics_list.append(target_semantics)
-
-    remainder = frame_num%batch_size
-    if remainder!=0:
-        for _ in range(batch_size-remainder):
-            target_semantics_list.append(target_semantics)
-
-    target_semantics_np = np.array(target_semantics_list)             #frame_num 70 semantic_radius*2+1
+    target_semantics_np = transform_semantic_target_all(generated_3dmm, semantic_radius, batch_size)   #frame_num 70 semantic_radius*2+1
     target_semantics_np = target_semantics_np.reshape(batch_size, -1, target_semantics_np.shape[-2], target_semantics_np.shape[-1])
     data['target_semantics_list'] = torch.FloatTensor(target_semantics_np)
     data['video_name'] = video_name
@@ -97,6 +88,17 @@ def transform_semantic_target(coeff_3dmm, frame_index, semantic_radius):
     coeff_3dmm_g = coeff_3dmm[index, :]
     return coeff_3dmm_g.transpose(1,0)
 
+def transform_semantic_target_all(coeff_3dmm, semantic_radius, batch_size=1):
+    # same windows as transform_semantic_target for every frame, gathered at once;
+    # the tail is padded with the last window up to a multiple of batch_size
+    num_frames = coeff_3dmm.shape[0]
+    offsets = np.arange(-semantic_radius, semantic_radius+1)
+    index = np.clip(np.arange(num_frames)[:, None] + offsets[None, :], 0, num_frames-1)   #frame_num semantic_radius*2+1
+    remainder = num_frames%batch_size
+    if remainder!=0:
+        index = np.concatenate([index, np.repeat(index[-1:], batch_size-remainder, axis=0)], axis=0)
+    return coeff_3dmm[index].transpose(0, 2, 1)
+
 def gen_camera_pose(camera_degree_list, frame_num, batch_size):
 
     new_degree_list = [] 
@@ -24,30 +24,39 @@ def load_cpk(checkpoint_path, model=None, optimizer=None, device="cpu"):
 
 class Audio2Coeff():
 
-    def __init__(self, sadtalker_path, device):
+    def __init__(self, sadtalker_path, device, still_only=False):
         #load config
-        fcfg_pose = open(sadtalker_path['audio2pose_yaml_path'])
-        cfg_pose = CN.load_cfg(fcfg_pose)
-        cfg_pose.freeze()
         fcfg_exp = open(sadtalker_path['audio2exp_yaml_path'])
         cfg_exp = CN.load_cfg(fcfg_exp)
         cfg_exp.freeze()
 
-        # load audio2pose_model
-        self.audio2pose_model = Audio2Pose(cfg_pose, None, device=device)
-        self.audio2pose_model = self.audio2pose_model.to(device)
-        self.audio2pose_model.eval()
-        for param in self.audio2pose_model.parameters():
-            param.requires_grad = False 
-        
-        try:
-            if sadtalker_path['use_safetensor']:
-                checkpoints = safetensors.torch.load_file(sadtalker_path['checkpoint'])
-                self.audio2pose_model.load_state_dict(load_x_from_safetensor(checkpoints, 'audio2pose'))
-            else:
-                load_cpk(sadtalker_path['audio2pose_checkpoint'], model=self.audio2pose_model, device=device)
-        except:
-            raise Exception("Failed in loading audio2pose_checkpoint")
+        # in still mode the predicted pose is replaced by the source pose, so
+        # a still-only instance never needs the audio2pose weights
+        self.still_only = still_only
+        self.audio2pose_model = None
+        checkpoints = None
+        if sadtalker_path['use_safetensor']:
+            checkpoints = safetensors.torch.load_file(sadtalker_path['checkpoint'])
+
+        if not still_only:
+            fcfg_pose = open(sadtalker_path['audio2pose_yaml_path'])
+            cfg_pose = CN.load_cfg(fcfg_pose)
+            cfg_pose.freeze()
+
+            # load audio2pose_model
+            self.audio2pose_model = Audio2Pose(cfg_pose, None, device=device)
+            self.audio2pose_model = self.audio2pose_model.to(device)
+            self.audio2pose_model.eval()
+            for param in self.audio2pose_model.parameters():
+                param.requires_grad = False 
+            
+            try:
+                if sadtalker_path['use_safetensor']:
+                    self.audio2pose_model.load_state_dict(load_x_from_safetensor(checkpoints, 'audio2pose'))
+                else:
+                    load_cpk(sadtalker_path['audio2pose_checkpoint'], model=self.audio2pose_model, device=device)
+            except:
+                raise Exception("Failed in loading audio2pose_checkpoint")
 
         # load audio2exp_model
         netG = SimpleWrapperV2()
@@ -57,7 +66,6 @@ class Audio2Coeff():
         netG.eval()
         try:
             if sadtalker_path['use_safetensor']:
-                checkpoints = safetensors.torch.load_file(sadtalker_path['checkpoint'])
                 netG.load_state_dict(load_x_from_safetensor(checkpoints, 'audio2exp'))
             else:
                 load_cpk(sadtalker_path['audio2exp_checkpoint'], model=netG, device=device)
@@ -68,35 +76,41 @@ class Audio2Coeff():
         for param in self.audio2exp_model.parameters():
             param.requires_grad = False
         self.audio2exp_model.eval()
+        del checkpoints
  
         self.device = device
 
-    def generate(self, batch, coeff_save_dir, pose_style, ref_pose_coeff_path=None):
+    def generate(self, batch, coeff_save_dir, pose_style, ref_pose_coeff_path=None, still=False):
 
         with torch.no_grad():
             #test
             results_dict_exp= self.audio2exp_model.test(batch)
             exp_pred = results_dict_exp['exp_coeff_pred']                         #bs T 64
 
-            #for class_id in  range(1):
-            #class_id = 0#(i+10)%45
-            #class_id = random.randint(0,46)                                   #46 styles can be selected 
-            batch['class'] = torch.LongTensor([pose_style]).to(self.device)
-            results_dict_pose = self.audio2pose_model.test(batch) 
-            pose_pred = results_dict_pose['pose_pred']                        #bs T 6
-
-            pose_len = pose_pred.shape[1]
-            if pose_len<13: 
-                pose_len = int((pose_len-1)/2)*2+1
-                pose_pred = torch.Tensor(savgol_filter(np.array(pose_pred.cpu()), pose_len, 2, axis=1)).to(self.device)
+            if still or self.still_only:
+                # get_facerender_data overwrites the pose with the source pose
+                # in still mode, so skip audio2pose and emit that pose directly
+                pose_pred = batch['ref'][:, :, 64:70]                         #bs T 6
             else:
-                pose_pred = torch.Tensor(savgol_filter(np.array(pose_pred.cpu()), 13, 2, axis=1)).to(self.device) 
+                #for class_id in  range(1):
+                #class_id = 0#(i+10)%45
+                #class_id = random.randint(0,46)                                   #46 styles can be selected 
+                batch['class'] = torch.LongTensor([pose_style]).to(self.device)
+                results_dict_pose = self.audio2pose_model.test(batch) 
+                pose_pred = results_dict_pose['pose_pred']                        #bs T 6
+
+                pose_len = pose_pred.shape[1]
+                if pose_len<13: 
+                    pose_len = int((pose_len-1)/2)*2+1
+                    pose_pred = torch.Tensor(savgol_filter(np.array(pose_pred.cpu()), pose_len, 2, axis=1)).to(self.device)
+                else:
+                    pose_pred = torch.Tensor(savgol_filter(np.array(pose_pred.cpu()), 13, 2, axis=1)).to(self.device) 
             
             coeffs_pred = torch.cat((exp_pred, pose_pred), dim=-1)            #bs T 70
 
             coeffs_pred_numpy = coeffs_pred[0].clone().detach().cpu().numpy() 
 
-            if ref_pose_coeff_path is not None: 
+            if ref_pose_coeff_path is not None and not (still or self.still_only): 
                  coeffs_pred_numpy = self.using_refpose(coeffs_pred_numpy, ref_pose_coeff_path)
         
             savemat(os.path.join(coeff_save_dir, '%s##%s.mat'%(batch['pic_name'], batch['audio_name'])),  
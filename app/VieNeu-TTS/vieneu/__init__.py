@@ -1,4 +1,4 @@
 from .core import VieNeuTTS, FastVieNeuTTS, RemoteVieNeuTTS, Vieneu
+from .process_pool import VieNeuProcessPool
 
-__all__ = ["VieNeuTTS", "FastVieNeuTTS", "RemoteVieNeuTTS", "Vieneu"]
-
+__all__ = ["VieNeuTTS", "FastVieNeuTTS", "RemoteVieNeuTTS", "Vieneu", "VieNeuProcessPool"]
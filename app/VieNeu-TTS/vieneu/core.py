@@ -4,16 +4,19 @@ import librosa
 import numpy as np
 import torch
 from neucodec import NeuCodec, DistillNeuCodec
-from vieneu_utils.phonemize_text import phonemize_with_dict
-from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks
+from vieneu_utils.phonemize_text import phonemize_with_dict, phonemize_batch
+from vieneu_utils.core_utils import split_text_into_chunks, split_text_into_token_chunks, join_audio_chunks
 from collections import defaultdict
 import re
 import gc
+import copy
+import contextlib
 import json
 import requests
 import asyncio
-from huggingface_hub import hf_hub_download
+from . import hub_assets
 from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 
 # ============================================================================
 # Shared Utilities
@@ -45,6 +48,133 @@ def _linear_overlap_add(frames: list[np.ndarray], stride: int) -> np.ndarray:
     assert sum_weight.min() > 0
     return out / sum_weight
 
+class _StreamingOverlapAdd:
+    """
+    Incremental _linear_overlap_add for streaming decode.
+
+    Keeps running out/sum_weight buffers for the samples that later frames can still
+    overlap, caches the triangular weight per frame length and only returns the
+    newly finalised samples. Output matches slicing _linear_overlap_add over the
+    growing frame list.
+    """
+
+    def __init__(self, stride: int):
+        self.stride = stride
+        self._weights: dict[int, np.ndarray] = {}
+        self._out = None
+        self._sum_weight = None
+        self._start = 0    # absolute sample index of the buffers' first sample
+        self._offset = 0   # absolute sample index where the next frame starts
+        self._end = 0      # absolute end of the furthest frame so far
+
+    def _weight(self, frame_length: int, dtype) -> np.ndarray:
+        weight = self._weights.get(frame_length)
+        if weight is None:
+            t = np.linspace(0, 1, frame_length + 2, dtype=dtype)[1:-1]
+            weight = self._weights[frame_length] = np.abs(0.5 - (t - 0.5))
+        return weight
+
+    def add(self, frame: np.ndarray, final: bool = False) -> np.ndarray:
+        """
+        Add the next frame and return the samples no later frame can touch
+        (every remaining sample when final=True, e.g. for a shorter last frame).
+        """
+        frame_length = frame.shape[-1]
+        if self._out is None:
+            self._out = np.zeros(0, dtype=frame.dtype)
+            self._sum_weight = np.zeros(0, dtype=frame.dtype)
+
+        frame_end = self._offset + frame_length
+        if frame_end > self._start + len(self._out):
+            grow = frame_end - self._start - len(self._out)
+            self._out = np.concatenate([self._out, np.zeros(grow, dtype=self._out.dtype)])
+            self._sum_weight = np.concatenate([self._sum_weight, np.zeros(grow, dtype=self._sum_weight.dtype)])
+        self._end = max(self._end, frame_end)
+
+        weight = self._weight(frame_length, frame.dtype)
+        lo = self._offset - self._start
+        self._out[lo : lo + frame_length] += weight * frame
+        self._sum_weight[lo : lo + frame_length] += weight
+        self._offset += self.stride
+        return self._emit(self._end if final else self._offset)
+
+    def _emit(self, until: int) -> np.ndarray:
+        n = max(min(until, self._end) - self._start, 0)
+        sum_weight = self._sum_weight[:n]
+        assert n == 0 or sum_weight.min() > 0
+        samples = self._out[:n] / sum_weight
+        self._out = self._out[n:]
+        self._sum_weight = self._sum_weight[n:]
+        self._start += n
+        return samples
+
+class _ReferenceCodes:
+    """
+    Reference speech codes converted once into every form the prompt builders use:
+    the int array, one "<|speech_N|>" token per code, their concatenation and (torch
+    backbone) the tokenised ids. Preset voices are prepared when voices.json is loaded.
+    Measures and iterates like the list of codes it replaces.
+    """
+
+    def __init__(self, codes, tokenizer=None):
+        if isinstance(codes, torch.Tensor):
+            self.tensor = codes
+            codes = codes.detach().cpu().numpy()
+        else:
+            self.tensor = None
+        self.ids = np.asarray(codes, dtype=np.int64).reshape(-1)
+        if self.tensor is None:
+            self.tensor = torch.from_numpy(self.ids)
+        self.tokens = [f"<|speech_{idx}|>" for idx in self.ids.tolist()]
+        self.speech_str = "".join(self.tokens)
+        self.token_ids = None
+        if tokenizer is not None:
+            self.tokenize(tokenizer)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def tokenize(self, tokenizer) -> list[int]:
+        if self.token_ids is None:
+            self.token_ids = tokenizer.encode(self.speech_str, add_special_tokens=False)
+        return self.token_ids
+
+
+def _decode_speech_ids_batch(codec, speech_ids_list: list[list[int]], is_onnx: bool, hop_length: int, pad: bool = False) -> list[np.ndarray]:
+    """
+    Decode several speech-id sequences with as few codec calls as possible.
+
+    Sequences of equal length are always stacked into one call. With pad=True, all
+    sequences are right-padded (repeating the last code) to a common length and the
+    outputs trimmed back to len(ids) * hop_length; the codec attends across the whole
+    sequence, so padded outputs can differ slightly from individual decodes.
+    """
+    groups = defaultdict(list)
+    for idx, ids in enumerate(speech_ids_list):
+        groups[0 if pad else len(ids)].append(idx)
+
+    wavs = [None] * len(speech_ids_list)
+    for indices in groups.values():
+        max_len = max(len(speech_ids_list[idx]) for idx in indices)
+        codes = np.stack([
+            np.pad(speech_ids_list[idx], (0, max_len - len(speech_ids_list[idx])), mode="edge")
+            for idx in indices
+        ])[:, np.newaxis, :]
+
+        if is_onnx:
+            recon = codec.decode_code(codes.astype(np.int32))
+        else:
+            with torch.no_grad():
+                recon = codec.decode_code(torch.from_numpy(codes).long().to(codec.device)).cpu().numpy()
+
+        for row, idx in enumerate(indices):
+            wav = recon[row, 0, :]
+            wavs[idx] = wav[: len(speech_ids_list[idx]) * hop_length] if pad else wav
+    return wavs
+
 def _compile_codec_with_triton(codec):
     """Compile codec with Triton for faster decoding (Windows/Linux compatible)"""
     try:
@@ -67,12 +197,40 @@ def _compile_codec_with_triton(codec):
         return False
 
 
+class _PhonemeCache:
+    """
+    Per-instance LRU memo of phonemised texts shared by VieNeuTTS and FastVieNeuTTS.
+    The engine sets phoneme_cache_size and _phoneme_cache (an OrderedDict).
+    """
+
+    def _phonemize(self, text: str) -> str:
+        """phonemize_with_dict, memoised per instance (reference texts, prepared chunks)."""
+        phones = self._phoneme_cache.get(text)
+        if phones is None:
+            phones = phonemize_with_dict(text)
+        self._remember_phonemes(text, phones)
+        return phones
+
+    def _remember_phonemes(self, text: str, phones: str):
+        self._phoneme_cache[text] = phones
+        self._phoneme_cache.move_to_end(text)
+        while len(self._phoneme_cache) > self.phoneme_cache_size:
+            self._phoneme_cache.popitem(last=False)
+
+    def _phonemize_all(self, texts: list[str]) -> int:
+        """Phonemise all texts not memoised yet with a single phonemize_batch call."""
+        pending = [text for text in dict.fromkeys(texts) if text not in self._phoneme_cache]
+        if pending:
+            for text, phones in zip(pending, phonemize_batch(pending)):
+                self._remember_phonemes(text, phones)
+        return len(pending)
+
 # ============================================================================
 # VieNeuTTS - Standard implementation (CPU/GPU compatible)
 # Supports: PyTorch Transformers, GGUF/GGML quantized models
 # ============================================================================
 
-class VieNeuTTS:
+class VieNeuTTS(_PhonemeCache):
     """
     Standard VieNeu-TTS implementation.
     
@@ -93,6 +251,9 @@ class VieNeuTTS:
         codec_repo="neuphonic/distill-neucodec",
         codec_device="cpu",
         hf_token=None,
+        max_batch_size=4,
+        token_chunking=False,
+        backbone_threads=None,
     ):
         """
         Initialize VieNeu-TTS.
@@ -102,6 +263,9 @@ class VieNeuTTS:
             backbone_device: Device for backbone ('cpu', 'cuda', 'gpu')
             codec_repo: Codec repository
             codec_device: Device for codec
+            max_batch_size: Maximum chunks generated together (PyTorch backbone only)
+            token_chunking: Split text by phonemised token budget instead of max_chars
+            backbone_threads: llama.cpp threads (GGUF only, default: llama.cpp's choice)
         """
 
         # Constants
@@ -113,6 +277,13 @@ class VieNeuTTS:
         self.streaming_lookforward = 10
         self.streaming_lookback = 100
         self.streaming_stride_samples = self.streaming_frames_per_chunk * self.hop_length
+        self.max_batch_size = max_batch_size
+        # Pad chunks of different lengths into one codec call (faster, not bit-exact)
+        self.batch_decode_padding = False
+        # Token-budget chunking: fraction of the free context given to input + generated tokens
+        self.token_chunking = token_chunking
+        self.token_budget_ratio = 0.8
+        self.backbone_threads = backbone_threads
 
         # Flags
         self._is_quantized_model = False
@@ -120,6 +291,15 @@ class VieNeuTTS:
 
         # HF tokenizer
         self.tokenizer = None
+        self._template_ids = None
+
+        # KV/state cache of the shared prompt prefix, keyed by (backend, backbone, prefix)
+        self.prefix_cache_size = 8
+        self._prefix_cache = OrderedDict()
+
+        # Phonemes of reference texts and prepared chunks (see prepare_phonemes)
+        self.phoneme_cache_size = 4096
+        self._phoneme_cache = OrderedDict()
 
         # Load models
         if backbone_repo:
@@ -129,6 +309,8 @@ class VieNeuTTS:
         # Asset path
         self.assets_dir = Path(__file__).parent / "assets"
         self._preset_voices = {}
+        self._preset_references = {}
+        self._references_by_id = {}
         self._default_voice = None
         self._load_voices(backbone_repo, hf_token)
 
@@ -216,22 +398,35 @@ class VieNeuTTS:
                     "Failed to import `llama_cpp`. "
                     "Xem hướng dẫn cài đặt llama_cpp_python phiên bản tối thiểu 0.3.16 tại: https://llama-cpp-python.readthedocs.io/en/latest/"
                 ) from e
-            self.backbone = Llama.from_pretrained(
-                repo_id=backbone_repo,
-                filename="*.gguf",
+            backbone_path = Path(backbone_repo)
+            if backbone_path.is_file():
+                model_path = str(backbone_path)
+            elif backbone_path.is_dir():
+                model_path = str(next(backbone_path.glob("*.gguf")))
+            else:
+                # Offline-first: pinned folder or HF cache, the hub only on first run
+                model_path = hub_assets.resolve_file(backbone_repo, "*.gguf", token=hf_token)
+            self.backbone = Llama(
+                model_path=model_path,
                 verbose=False,
                 n_gpu_layers=-1 if backbone_device == "gpu" else 0,
                 n_ctx=self.max_context,
+                n_threads=self.backbone_threads,
+                n_threads_batch=self.backbone_threads,
                 mlock=True,
                 flash_attn=True if backbone_device == "gpu" else False,
-                token=hf_token,
             )
             self._is_quantized_model = True
             
         else:
             from transformers import AutoTokenizer, AutoModelForCausalLM
-            self.tokenizer = AutoTokenizer.from_pretrained(backbone_repo, token=hf_token)
-            self.backbone = AutoModelForCausalLM.from_pretrained(backbone_repo, token=hf_token).to(
+            if Path(backbone_repo).exists():
+                self.tokenizer = AutoTokenizer.from_pretrained(backbone_repo, token=hf_token)
+                model = AutoModelForCausalLM.from_pretrained(backbone_repo, token=hf_token)
+            else:
+                self.tokenizer = hub_assets.from_pretrained(AutoTokenizer, backbone_repo, token=hf_token)
+                model = hub_assets.from_pretrained(AutoModelForCausalLM, backbone_repo, token=hf_token)
+            self.backbone = model.to(
                 torch.device(backbone_device)
             )
     
@@ -245,10 +440,10 @@ class VieNeuTTS:
         print(f"Loading codec from: {codec_repo} on {codec_device} ...")
         match codec_repo:
             case "neuphonic/neucodec":
-                self.codec = NeuCodec.from_pretrained(codec_repo)
+                self.codec = hub_assets.from_pretrained(NeuCodec, codec_repo)
                 self.codec.eval().to(codec_device)
             case "neuphonic/distill-neucodec":
-                self.codec = DistillNeuCodec.from_pretrained(codec_repo)
+                self.codec = hub_assets.from_pretrained(DistillNeuCodec, codec_repo)
                 self.codec.eval().to(codec_device)
             case "neuphonic/neucodec-onnx-decoder-int8":
                 if codec_device != "cpu":
@@ -260,8 +455,16 @@ class VieNeuTTS:
                         "Failed to import the onnx decoder."
                         "Ensure you have onnxruntime installed as well as neucodec >= 0.0.4."
                     ) from e
-                self.codec = NeuCodecOnnxDecoder.from_pretrained(codec_repo)
+                self.codec = hub_assets.from_pretrained(NeuCodecOnnxDecoder, codec_repo)
+                self._is_onnx_codec = True
+            case _ if str(codec_repo).endswith(".onnx"):
+                # Decoder exported with `python -m vieneu.onnx_codec export`
+                if codec_device != "cpu":
+                    raise ValueError("Onnx decoder only currently runs on CPU.")
+                from .onnx_codec import OnnxCodecDecoder
+                self.codec = OnnxCodecDecoder(codec_repo)
                 self._is_onnx_codec = True
+                print(f"   ✅ ONNX codec decoder loaded ({self.codec.num_threads} threads)")
             case _:
                 raise ValueError(f"Unsupported codec repository: {codec_repo}")
     
@@ -297,6 +500,7 @@ class VieNeuTTS:
             )
             self._lora_loaded = True
             self._current_lora_repo = lora_repo_id
+            self._prefix_cache.clear()
             
             # Load voices from LoRA repo (if any) and REPLACE base voices
             self._load_voices(lora_repo_id, hf_token, clear_existing=True)
@@ -321,6 +525,7 @@ class VieNeuTTS:
             self.backbone = self.backbone.unload()
             self._lora_loaded = False
             self._current_lora_repo = None
+            self._prefix_cache.clear()
             
             # Cleanup memory
             gc.collect()
@@ -382,36 +587,38 @@ class VieNeuTTS:
             # Update default voice if provided
             if "default_voice" in data and data["default_voice"]:
                 self._default_voice = data["default_voice"]
+
+            self._prepare_preset_voices()
                 
         except Exception as e:
             print(f"   ⚠️ Failed to load voices from {file_path}: {e}")
 
+    def _prepare_preset_voices(self):
+        """Convert every preset's codes once into the forms used to build prompts."""
+        self._preset_references = {
+            name: _ReferenceCodes(data["codes"], self.tokenizer)
+            for name, data in self._preset_voices.items()
+            if isinstance(data, dict) and "codes" in data
+        }
+        self._references_by_id = {id(ref.tensor): ref for ref in self._preset_references.values()}
+
+    def _reference_codes(self, ref_codes) -> _ReferenceCodes:
+        """Prepared reference codes: prebuilt for preset voices, converted once per call otherwise."""
+        if isinstance(ref_codes, _ReferenceCodes):
+            return ref_codes
+        prepared = self._references_by_id.get(id(ref_codes))
+        if prepared is not None and prepared.tensor is ref_codes:
+            return prepared
+        return _ReferenceCodes(ref_codes, self.tokenizer)
+
     def _load_voices_from_repo(self, repo_id: str, hf_token=None):
-        """Download and load voices.json from a HuggingFace repo. STRICT MODE with Offline Cache Fallback."""
+        """Load voices.json from a HuggingFace repo, offline-first (see hub_assets)."""
         voices_file = None
         try:
-            # 1. Try normal download (checks for updates from server)
-            voices_file = hf_hub_download(
-                repo_id=repo_id,
-                filename="voices.json",
-                token=hf_token,
-                repo_type="model"
-            )
+            # Pinned folder or local cache first (refreshed in the background), download only on first run
+            voices_file = hub_assets.resolve_file(repo_id, "voices.json", token=hf_token)
         except Exception as e:
-            # 2. Network error? Try to use cached version if available
-            print(f"   ⚠️ Network check failed for voices.json. Trying local cache...")
-            try:
-                voices_file = hf_hub_download(
-                    repo_id=repo_id,
-                    filename="voices.json",
-                    token=hf_token,
-                    repo_type="model",
-                    local_files_only=True
-                )
-                print(f"   ✅ Using cached voices.json")
-            except Exception:
-                # 3. No cache available either
-                pass
+            print(f"   ⚠️ Could not resolve voices.json: {e}")
 
         if voices_file:
             self._load_voices_from_file(Path(voices_file))
@@ -450,12 +657,8 @@ class VieNeuTTS:
         
         voice_data = self._preset_voices[voice_name]
         
-        # Convert list of codes to tensor if needed (JSON stores lists)
-        codes = voice_data["codes"]
-        if isinstance(codes, list):
-            codes = torch.tensor(codes, dtype=torch.long)
-            
-        return {"codes": codes, "text": voice_data["text"]}
+        # Same tensor on every call, so infer finds the prepared prompt pieces (_reference_codes)
+        return {"codes": self._preset_references[voice_name].tensor, "text": voice_data["text"]}
 
     def encode_reference(self, ref_audio_path: str | Path):
         """Encode reference audio to codes"""
@@ -506,23 +709,13 @@ class VieNeuTTS:
              raise ValueError("Must provide either 'voice' dict or both 'ref_codes' and 'ref_text'.")
 
         # Split text into chunks for better processing of long text
-        chunks = split_text_into_chunks(text, max_chars=max_chars)
+        chunks = self._split_text(text, max_chars, ref_codes, ref_text)
         
         if not chunks:
             return np.array([], dtype=np.float32)
 
-        all_wavs = []
-        for chunk in chunks:
-            # Generate tokens
-            if self._is_quantized_model:
-                output_str = self._infer_ggml(ref_codes, ref_text, chunk, temperature, top_k)
-            else:
-                prompt_ids = self._apply_chat_template(ref_codes, ref_text, chunk)
-                output_str = self._infer_torch(prompt_ids, temperature, top_k)
-
-            # Decode
-            wav = self._decode(output_str)
-            all_wavs.append(wav)
+        # Generate tokens (batched on the PyTorch backbone) while the previous batch is decoded
+        all_wavs = self._generate_and_decode(chunks, ref_codes, ref_text, temperature, top_k)
 
         # Join all chunks with optional padding/crossfade
         final_wav = join_audio_chunks(all_wavs, self.sample_rate, silence_p, crossfade_p)
@@ -533,6 +726,37 @@ class VieNeuTTS:
 
         return final_wav
 
+    def infer_batch(self, texts: list[str], ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_batch_size: int = None, voice: dict = None, temperature: float = 1.0, top_k: int = 50) -> list[np.ndarray]:
+        """
+        Batch inference for multiple texts (same signature as FastVieNeuTTS.infer_batch).
+        Each text is generated as a single prompt, up to max_batch_size at a time.
+        """
+        if voice is not None:
+            ref_codes = voice.get('codes', ref_codes)
+            ref_text = voice.get('text', ref_text)
+        elif self._default_voice and (ref_codes is None or ref_text is None):
+            print(f"   ⚠️ No reference provided. Using default voice: {self._default_voice}")
+            try:
+                voice_data = self.get_preset_voice(None)
+                ref_codes = voice_data['codes']
+                ref_text = voice_data['text']
+            except Exception as e:
+                print(f"Warning: Failed to auto-load default voice: {e}")
+
+        if ref_codes is None or ref_text is None:
+             raise ValueError("Must provide either 'voice' dict or both 'ref_codes' and 'ref_text'.")
+
+        if not isinstance(texts, list):
+            texts = [texts]
+
+        all_wavs = self._generate_and_decode(texts, ref_codes, ref_text, temperature, top_k, max_batch_size)
+
+        # Apply watermark if available
+        if self.watermarker:
+            all_wavs = [self.watermarker.apply_watermark(w, sample_rate=self.sample_rate) for w in all_wavs]
+
+        return all_wavs
+
     def infer_stream(self, text: str, ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_chars: int = 256, voice: dict = None, temperature: float = 1.0, top_k: int = 50) -> Generator[np.ndarray, None, None]:
         """
         Perform streaming inference to generate speech from text using the TTS model and reference audio.
@@ -565,7 +789,9 @@ class VieNeuTTS:
         if ref_codes is None or ref_text is None:
              raise ValueError("Must provide either 'voice' dict or both 'ref_codes' and 'ref_text'.")
 
-        chunks = split_text_into_chunks(text, max_chars=max_chars)
+        ref_codes = self._reference_codes(ref_codes)
+        chunks = self._split_text(text, max_chars, ref_codes, ref_text)
+        prefix_ids = None if self._is_quantized_model or not chunks else self._reference_prefix_ids(ref_text)
         
         for chunk in chunks:
             if self._is_quantized_model:
@@ -573,21 +799,45 @@ class VieNeuTTS:
             else:
                 # Fallback for torch backend (no internal streaming, but can stream by chunks)
                 prompt_ids = self._apply_chat_template(ref_codes, ref_text, chunk)
-                output_str = self._infer_torch(prompt_ids, temperature, top_k)
+                output_str = self._infer_torch(prompt_ids, temperature, top_k, prefix_ids=prefix_ids)
                 wav = self._decode(output_str)
                 if self.watermarker:
                     wav = self.watermarker.apply_watermark(wav, sample_rate=self.sample_rate)
                 yield wav
 
-    def _decode(self, codes: str):
-        """Decode speech tokens to audio waveform."""
-        # Extract speech token IDs using regex
+    def _speech_ids(self, codes: str) -> list[int]:
+        """Extract speech token IDs from generated text."""
         speech_ids = [int(num) for num in re.findall(r"<\|speech_(\d+)\|>", codes)]
         
         if len(speech_ids) == 0:
             raise ValueError(
                 "No valid speech tokens found in the output. Nếu gặp lỗi này, hãy tạo issue trên github repo hoặc thông báo với chúng tôi tại: https://discord.com/invite/yJt8kzjzWZ"
             )
+        return speech_ids
+
+    def _decode_batch(self, codes_list: list[str]) -> list[np.ndarray]:
+        """Decode several speech token strings, batching codec calls where possible."""
+        if len(codes_list) == 1:
+            return [self._decode(codes_list[0])]
+        speech_ids_list = [self._speech_ids(codes) for codes in codes_list]
+        return _decode_speech_ids_batch(self.codec, speech_ids_list, self._is_onnx_codec, self.hop_length, pad=self.batch_decode_padding)
+
+    def _generate_and_decode(self, chunks: list[str], ref_codes, ref_text: str, temperature: float = 1.0, top_k: int = 50, max_batch_size: int = None) -> list[np.ndarray]:
+        """
+        Two-stage pipeline: the backbone generates the next batch of chunks while a
+        decoder thread turns the previous batch into audio.
+        """
+        with ThreadPoolExecutor(max_workers=1) as decoder:
+            futures = [
+                decoder.submit(self._decode_batch, output_strs)
+                for output_strs in self._generate_chunk_batches(chunks, ref_codes, ref_text, temperature, top_k, max_batch_size)
+            ]
+            return [wav for future in futures for wav in future.result()]
+
+    def _decode(self, codes: str):
+        """Decode speech tokens to audio waveform."""
+        # Extract speech token IDs using regex
+        speech_ids = self._speech_ids(codes)
         
         # Onnx decode
         if self._is_onnx_codec:
@@ -603,41 +853,212 @@ class VieNeuTTS:
         
         return recon[0, 0, :]
     
-    def _apply_chat_template(self, ref_codes: list[int], ref_text: str, input_text: str) -> list[int]:
-        input_text = phonemize_with_dict(ref_text) + " " + phonemize_with_dict(input_text)
+    def _chat_template_ids(self) -> tuple[list[int], list[int]]:
+        """Token ids of the chat template before and after the input text (tokenised once)."""
+        if self._template_ids is None:
+            speech_replace = self.tokenizer.convert_tokens_to_ids("<|SPEECH_REPLACE|>")
+            speech_gen_start = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_START|>")
+            text_replace = self.tokenizer.convert_tokens_to_ids("<|TEXT_REPLACE|>")
+            text_prompt_start = self.tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_START|>")
+            text_prompt_end = self.tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_END|>")
+
+            chat = """user: Convert the text to speech:<|TEXT_REPLACE|>\nassistant:<|SPEECH_REPLACE|>"""
+            ids = self.tokenizer.encode(chat)
+            text_replace_idx = ids.index(text_replace)
+            speech_replace_idx = ids.index(speech_replace)
+            self._template_ids = (
+                ids[:text_replace_idx] + [text_prompt_start],
+                [text_prompt_end] + ids[text_replace_idx + 1:speech_replace_idx] + [speech_gen_start],
+            )
+        return self._template_ids
+
+    def _apply_chat_template(self, ref_codes, ref_text: str, input_text: str) -> list[int]:
+        input_text = self._phonemize(ref_text) + " " + self._phonemize(input_text)
+        input_ids = self.tokenizer.encode(input_text, add_special_tokens=False)
 
-        speech_replace = self.tokenizer.convert_tokens_to_ids("<|SPEECH_REPLACE|>")
-        speech_gen_start = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_START|>")
+        head, tail = self._chat_template_ids()
+        return head + input_ids + tail + self._reference_codes(ref_codes).tokenize(self.tokenizer)
+
+    def prepare_phonemes(self, texts: list[str], max_chars: int = 256, voice: dict = None, ref_text: str = None, ref_codes=None) -> int:
+        """
+        Phonemise every chunk of several texts (e.g. all slides of a presentation) and the
+        reference text with a single phonemize_batch call, so the following infer calls
+        do not invoke espeak again. max_chars must match the one passed to infer.
+
+        Returns:
+            int: Number of newly phonemised texts.
+        """
+        if voice is not None:
+            ref_text = voice.get('text', ref_text)
+            ref_codes = voice.get('codes', ref_codes)
+
+        count = self._phonemize_all([ref_text] if ref_text else [])
+        chunks = []
+        for text in texts:
+            chunks.extend(self._split_text(text, max_chars, ref_codes, ref_text))
+        return count + self._phonemize_all(chunks)
+
+    def _count_tokens(self, text: str) -> int:
+        """Backbone token length of the phonemised text."""
+        phones = self._phonemize(text)
+        if self._is_quantized_model:
+            return len(self.backbone.tokenize(phones.encode("utf-8"), add_bos=False, special=True))
+        return len(self.tokenizer.encode(phones, add_special_tokens=False))
+
+    def _token_budget(self, ref_codes, ref_text: str) -> int:
+        """
+        Input tokens per chunk so that prompt + generated speech stay within max_context.
+        The reference pair gives the speech tokens produced per input token.
+        """
+        n_ref_codes = len(ref_codes)
+        ref_tokens = max(self._count_tokens(ref_text), 1)
+        speech_per_token = n_ref_codes / ref_tokens
+        free = self.max_context - n_ref_codes - ref_tokens - 16  # 16: chat template tokens
+        return max(int(free * self.token_budget_ratio / (1 + speech_per_token)), 16)
+
+    def _split_text(self, text: str, max_chars: int, ref_codes=None, ref_text: str = None) -> list[str]:
+        """Chunk text by characters, or by token budget when token_chunking is enabled."""
+        if not self.token_chunking or getattr(self, "backbone", None) is None or ref_codes is None or not ref_text:
+            return split_text_into_chunks(text, max_chars=max_chars)
+
+        # phonemise all pieces in one batch before they are measured one by one
+        self._phonemize_all(split_text_into_chunks(text, max_chars=64))
+        return split_text_into_token_chunks(text, self._count_tokens, self._token_budget(ref_codes, ref_text), piece_chars=64)
+
+    def _reference_prefix_ids(self, ref_text: str) -> list[int]:
+        """
+        Token ids of the prompt part shared by every chunk of one voice: the chat
+        header and the phonemised reference text. The reference codes come after
+        the input text in the prompt, so they are not part of the shared prefix.
+        """
         text_replace = self.tokenizer.convert_tokens_to_ids("<|TEXT_REPLACE|>")
         text_prompt_start = self.tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_START|>")
-        text_prompt_end = self.tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_END|>")
 
-        input_ids = self.tokenizer.encode(input_text, add_special_tokens=False)
-        chat = """user: Convert the text to speech:<|TEXT_REPLACE|>\nassistant:<|SPEECH_REPLACE|>"""
-        ids = self.tokenizer.encode(chat)
-
-        text_replace_idx = ids.index(text_replace)
-        ids = (
-            ids[:text_replace_idx]
-            + [text_prompt_start]
-            + input_ids
-            + [text_prompt_end]
-            + ids[text_replace_idx + 1 :]  # noqa
-        )
+        ids = self.tokenizer.encode("user: Convert the text to speech:<|TEXT_REPLACE|>\nassistant:<|SPEECH_REPLACE|>")
+        ids = ids[:ids.index(text_replace)] + [text_prompt_start]
+        return ids + self.tokenizer.encode(self._phonemize(ref_text), add_special_tokens=False)
+
+    def _cache_put(self, key, value):
+        self._prefix_cache[key] = value
+        self._prefix_cache.move_to_end(key)
+        while len(self._prefix_cache) > self.prefix_cache_size:
+            self._prefix_cache.popitem(last=False)
+
+    def _get_prefix_kv(self, prefix_ids: list[int], prompt_ids: list[int]):
+        """
+        Return a private copy of the prefilled KV cache for the part of
+        `prefix_ids` that `prompt_ids` actually starts with, or None.
+        """
+        # Tokenisation at the reference/input boundary may differ, so only reuse
+        # the common prefix, and always leave at least one token for generate()
+        n_common = 0
+        limit = min(len(prefix_ids), len(prompt_ids) - 1)
+        while n_common < limit and prefix_ids[n_common] == prompt_ids[n_common]:
+            n_common += 1
+        if n_common == 0:
+            return None
+
+        key = ("torch", id(self.backbone), tuple(prefix_ids))
+        cached = self._prefix_cache.get(key)
+        if cached is None:
+            from transformers import DynamicCache
+            prefix_tensor = torch.tensor(prefix_ids).unsqueeze(0).to(self.backbone.device)
+            with torch.no_grad():
+                outputs = self.backbone(input_ids=prefix_tensor, past_key_values=DynamicCache(), use_cache=True)
+            cached = outputs.past_key_values
+        self._cache_put(key, cached)
+
+        # generate() appends to the cache in place, so every chunk gets its own copy
+        past_key_values = copy.deepcopy(cached)
+        if n_common < len(prefix_ids):
+            past_key_values.crop(n_common - len(prefix_ids))
+        return past_key_values
+
+    def _restore_ggml_prefix(self, ref_text_phones: str):
+        """
+        Make the llama.cpp context start with the evaluated prefix for this
+        reference text, restoring a saved state when another voice ran last.
+        llama.cpp then only prefills the tokens after the common prefix.
+        """
+        prefix = f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text_phones}"
+        key = ("gguf", id(self.backbone), prefix)
+        state = self._prefix_cache.get(key)
+        if state is None:
+            tokens = self.backbone.tokenize(prefix.encode("utf-8"), special=True)
+            self.backbone.reset()
+            self.backbone.eval(tokens)
+            state = self.backbone.save_state()
+        else:
+            current = self.backbone.input_ids
+            n_prefix = state.n_tokens
+            if len(current) < n_prefix or not np.array_equal(current[:n_prefix], state.input_ids[:n_prefix]):
+                self.backbone.load_state(state)
+        self._cache_put(key, state)
+
+    def _generate_chunk_batches(self, chunks: list[str], ref_codes, ref_text: str, temperature: float = 1.0, top_k: int = 50, max_batch_size: int = None) -> Generator[list[str], None, None]:
+        """Generate the speech-token strings of every chunk, in order, one batch at a time."""
+        ref_codes = self._reference_codes(ref_codes)
+        if self._is_quantized_model:
+            for chunk in chunks:
+                yield [self._infer_ggml(ref_codes, ref_text, chunk, temperature, top_k)]
+            return
+
+        if max_batch_size is None:
+            max_batch_size = self.max_batch_size
+        max_batch_size = max(1, max_batch_size)
 
-        speech_replace_idx = ids.index(speech_replace)
-        codes_str = "".join([f"<|speech_{i}|>" for i in ref_codes])
-        codes = self.tokenizer.encode(codes_str, add_special_tokens=False)
-        ids = ids[:speech_replace_idx] + [speech_gen_start] + list(codes)
+        # The reference text prefix is shared by every chunk; its KV cache is prefilled once.
+        # Left padding shifts positions, so only single-prompt generation reuses it.
+        prefix_ids = self._reference_prefix_ids(ref_text)
 
-        return ids
+        for i in range(0, len(chunks), max_batch_size):
+            prompts = [self._apply_chat_template(ref_codes, ref_text, chunk) for chunk in chunks[i:i + max_batch_size]]
+            if len(prompts) == 1:
+                yield [self._infer_torch(prompts[0], temperature, top_k, prefix_ids=prefix_ids)]
+            else:
+                yield self._infer_torch_batch(prompts, temperature, top_k)
+
+    def _infer_torch_batch(self, prompts: list[list[int]], temperature: float = 1.0, top_k: int = 50) -> list[str]:
+        """Generate several prompts at once with left padding; each row stops at its own end token."""
+        speech_end_id = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
+        pad_id = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else speech_end_id
+
+        input_length = max(len(ids) for ids in prompts)
+        input_ids = torch.full((len(prompts), input_length), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(prompts), input_length), dtype=torch.long)
+        for row, ids in enumerate(prompts):
+            input_ids[row, input_length - len(ids):] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, input_length - len(ids):] = 1
 
-    def _infer_torch(self, prompt_ids: list[int], temperature: float = 1.0, top_k: int = 50) -> str:
+        with torch.no_grad():
+            output_tokens = self.backbone.generate(
+                input_ids.to(self.backbone.device),
+                attention_mask=attention_mask.to(self.backbone.device),
+                max_length=self.max_context,
+                eos_token_id=speech_end_id,
+                pad_token_id=pad_id,
+                do_sample=True,
+                temperature=temperature,
+                top_k=top_k,
+                use_cache=True,
+                min_new_tokens=50,
+            )
+
+        output_strs = []
+        for row in output_tokens[:, input_length:].cpu().numpy().tolist():
+            if speech_end_id in row:
+                row = row[:row.index(speech_end_id)]
+            output_strs.append(self.tokenizer.decode(row, add_special_tokens=False))
+        return output_strs
+
+    def _infer_torch(self, prompt_ids: list[int], temperature: float = 1.0, top_k: int = 50, prefix_ids: list[int] = None) -> str:
         prompt_tensor = torch.tensor(prompt_ids).unsqueeze(0).to(self.backbone.device)
         speech_end_id = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
+        past_key_values = self._get_prefix_kv(prefix_ids, prompt_ids) if prefix_ids else None
         with torch.no_grad():
             output_tokens = self.backbone.generate(
                 prompt_tensor,
+                past_key_values=past_key_values,
                 max_length=self.max_context,
                 eos_token_id=speech_end_id,
                 do_sample=True,
@@ -652,15 +1073,15 @@ class VieNeuTTS:
         )
         return output_str
 
-    def _infer_ggml(self, ref_codes: list[int], ref_text: str, input_text: str, temperature: float = 1.0, top_k: int = 50) -> str:
-        ref_text = phonemize_with_dict(ref_text)
-        input_text = phonemize_with_dict(input_text)
+    def _infer_ggml(self, ref_codes, ref_text: str, input_text: str, temperature: float = 1.0, top_k: int = 50) -> str:
+        ref_text = self._phonemize(ref_text)
+        input_text = self._phonemize(input_text)
 
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
         prompt = (
             f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text} {input_text}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{self._reference_codes(ref_codes).speech_str}"
         )
+        self._restore_ggml_prefix(ref_text)
         output = self.backbone(
             prompt,
             max_tokens=self.max_context,
@@ -671,21 +1092,21 @@ class VieNeuTTS:
         output_str = output["choices"][0]["text"]
         return output_str
 
-    def _infer_stream_ggml(self, ref_codes: torch.Tensor, ref_text: str, input_text: str, temperature: float = 1.0, top_k: int = 50) -> Generator[np.ndarray, None, None]:
-        ref_text = phonemize_with_dict(ref_text)
-        input_text = phonemize_with_dict(input_text)
+    def _infer_stream_ggml(self, ref_codes, ref_text: str, input_text: str, temperature: float = 1.0, top_k: int = 50) -> Generator[np.ndarray, None, None]:
+        ref_codes = self._reference_codes(ref_codes)
+        ref_text = self._phonemize(ref_text)
+        input_text = self._phonemize(input_text)
 
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
         prompt = (
             f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text} {input_text}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{ref_codes.speech_str}"
         )
 
-        audio_cache: list[np.ndarray] = []
-        token_cache: list[str] = [f"<|speech_{idx}|>" for idx in ref_codes]
-        n_decoded_samples: int = 0
+        overlap_add = _StreamingOverlapAdd(self.streaming_stride_samples)
+        token_cache: list[str] = list(ref_codes.tokens)
         n_decoded_tokens: int = len(ref_codes)
 
+        self._restore_ggml_prefix(ref_text)
         for item in self.backbone(
             prompt,
             max_tokens=self.max_context,
@@ -726,17 +1147,9 @@ class VieNeuTTS:
                     recon = self.watermarker.apply_watermark(recon, sample_rate=self.sample_rate)
                 
                 recon = recon[sample_start:sample_end]
-                audio_cache.append(recon)
 
                 # postprocess
-                processed_recon = _linear_overlap_add(
-                    audio_cache, stride=self.streaming_stride_samples
-                )
-                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                processed_recon = processed_recon[
-                    n_decoded_samples:new_samples_end
-                ]
-                n_decoded_samples = new_samples_end
+                processed_recon = overlap_add.add(recon)
                 n_decoded_tokens += self.streaming_frames_per_chunk
                 yield processed_recon
 
@@ -761,10 +1174,8 @@ class VieNeuTTS:
                 recon = self.watermarker.apply_watermark(recon, sample_rate=self.sample_rate)
 
             recon = recon[sample_start:]
-            audio_cache.append(recon)
 
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
+            processed_recon = overlap_add.add(recon, final=True)
             yield processed_recon
 
 
@@ -773,7 +1184,7 @@ class VieNeuTTS:
 # Requires: LMDeploy with CUDA
 # ============================================================================
 
-class FastVieNeuTTS:
+class FastVieNeuTTS(_PhonemeCache):
     """
     GPU-optimized VieNeu-TTS using LMDeploy TurbomindEngine.
     """
@@ -822,9 +1233,15 @@ class FastVieNeuTTS:
         self.streaming_stride_samples = self.streaming_frames_per_chunk * self.hop_length
         
         self.max_batch_size = max_batch_size
+        # Pad chunks of different lengths into one codec call (faster, not bit-exact)
+        self.batch_decode_padding = False
         
         self._ref_cache = {}
         
+        # Phonemes of reference texts and prepared chunks (see prepare_phonemes)
+        self.phoneme_cache_size = 4096
+        self._phoneme_cache = OrderedDict()
+        
         self.stored_dict = defaultdict(dict)
         
         # Flags
@@ -838,6 +1255,8 @@ class FastVieNeuTTS:
         # Asset path & Voice loading
         self.assets_dir = Path(__file__).parent / "assets"
         self._preset_voices = {}
+        self._preset_references = {}
+        self._references_by_id = {}
         self._default_voice = None
         
         # 1. Load model-specific voices (Strict Mode)
@@ -889,36 +1308,38 @@ class FastVieNeuTTS:
             
             if "default_voice" in data and data["default_voice"]:
                 self._default_voice = data["default_voice"]
+
+            self._prepare_preset_voices()
                 
         except Exception as e:
             print(f"   ⚠️ Failed to load voices from {file_path}: {e}")
 
+    def _prepare_preset_voices(self):
+        """Convert every preset's codes once into the forms used to build prompts."""
+        self._preset_references = {
+            name: _ReferenceCodes(data["codes"])
+            for name, data in self._preset_voices.items()
+            if isinstance(data, dict) and "codes" in data
+        }
+        self._references_by_id = {id(ref.tensor): ref for ref in self._preset_references.values()}
+
+    def _reference_codes(self, ref_codes) -> _ReferenceCodes:
+        """Prepared reference codes: prebuilt for preset voices, converted once per call otherwise."""
+        if isinstance(ref_codes, _ReferenceCodes):
+            return ref_codes
+        prepared = self._references_by_id.get(id(ref_codes))
+        if prepared is not None and prepared.tensor is ref_codes:
+            return prepared
+        return _ReferenceCodes(ref_codes)
+
     def _load_voices_from_repo(self, repo_id: str, hf_token=None):
-        """Download and load voices.json from a HuggingFace repo. STRICT MODE with Offline Cache Fallback."""
+        """Load voices.json from a HuggingFace repo, offline-first (see hub_assets)."""
         voices_file = None
         try:
-            # 1. Try normal download (checks for updates from server)
-            voices_file = hf_hub_download(
-                repo_id=repo_id,
-                filename="voices.json",
-                token=hf_token,
-                repo_type="model"
-            )
+            # Pinned folder or local cache first (refreshed in the background), download only on first run
+            voices_file = hub_assets.resolve_file(repo_id, "voices.json", token=hf_token)
         except Exception as e:
-            # 2. Network error? Try to use cached version if available
-            print(f"   ⚠️ Network check failed for voices.json. Trying local cache...")
-            try:
-                voices_file = hf_hub_download(
-                    repo_id=repo_id,
-                    filename="voices.json",
-                    token=hf_token,
-                    repo_type="model",
-                    local_files_only=True
-                )
-                print(f"   ✅ Using cached voices.json")
-            except Exception:
-                # 3. No cache available either
-                pass
+            print(f"   ⚠️ Could not resolve voices.json: {e}")
 
         if voices_file:
             self._load_voices_from_file(Path(voices_file))
@@ -946,11 +1367,7 @@ class FastVieNeuTTS:
             raise ValueError(f"Voice '{voice_name}' not found. Available: {self.list_preset_voices()}")
         
         voice_data = self._preset_voices[voice_name]
-        codes = voice_data["codes"]
-        if isinstance(codes, list):
-            codes = torch.tensor(codes, dtype=torch.long)
-            
-        return {"codes": codes, "text": voice_data["text"]}
+        return {"codes": self._preset_references[voice_name].tensor, "text": voice_data["text"]}
     
     def _load_backbone_lmdeploy(self, repo, memory_util, tp, enable_prefix_caching, quant_policy, hf_token=None):
         """Load backbone using LMDeploy's TurbomindEngine"""
@@ -979,7 +1396,9 @@ class FastVieNeuTTS:
             quant_policy=quant_policy
         )
         
-        self.backbone = pipeline(repo, backend_config=backend_config)
+        # Pinned local copy when VIENEU_MODELS_DIR is set, otherwise LMDeploy resolves the repo
+        pinned = hub_assets.pinned_path(repo) if not Path(repo).exists() else None
+        self.backbone = pipeline(str(pinned or repo), backend_config=backend_config)
         
         self.gen_config = GenerationConfig(
             top_p=0.95,
@@ -1002,10 +1421,10 @@ class FastVieNeuTTS:
         
         match codec_repo:
             case "neuphonic/neucodec":
-                self.codec = NeuCodec.from_pretrained(codec_repo)
+                self.codec = hub_assets.from_pretrained(NeuCodec, codec_repo)
                 self.codec.eval().to(codec_device)
             case "neuphonic/distill-neucodec":
-                self.codec = DistillNeuCodec.from_pretrained(codec_repo)
+                self.codec = hub_assets.from_pretrained(DistillNeuCodec, codec_repo)
                 self.codec.eval().to(codec_device)
             case "neuphonic/neucodec-onnx-decoder-int8":
                 if codec_device != "cpu":
@@ -1017,7 +1436,7 @@ class FastVieNeuTTS:
                         "Failed to import ONNX decoder. "
                         "Ensure onnxruntime and neucodec >= 0.0.4 are installed."
                     ) from e
-                self.codec = NeuCodecOnnxDecoder.from_pretrained(codec_repo)
+                self.codec = hub_assets.from_pretrained(NeuCodecOnnxDecoder, codec_repo)
                 self._is_onnx_codec = True
             case _:
                 raise ValueError(f"Unsupported codec repository: {codec_repo}")
@@ -1105,8 +1524,8 @@ class FastVieNeuTTS:
         
         return user_id
     
-    def _decode(self, codes: str):
-        """Decode speech tokens to audio waveform"""
+    def _speech_ids(self, codes: str) -> list[int]:
+        """Extract speech token IDs from generated text"""
         speech_ids = [int(num) for num in re.findall(r"<\|speech_(\d+)\|>", codes)]
         
         if len(speech_ids) == 0:
@@ -1116,6 +1535,18 @@ class FastVieNeuTTS:
                 "dẫn đến sai số khi tính toán. Bạn hãy thử chuyển sang dùng phiên bản VieNeu-TTS-0.3B nếu vẫn muốn dùng LmDeploy hoặc "
                 "bỏ chọn 'LMDeploy' trong Tùy chọn nâng cao. Nếu vẫn gặp lỗi này, hãy thông báo với chúng tôi tại: https://discord.com/invite/yJt8kzjzWZ"
             )
+        return speech_ids
+
+    def _decode_batch(self, codes_list: list[str]) -> list[np.ndarray]:
+        """Decode several speech token strings, batching codec calls where possible"""
+        if len(codes_list) == 1:
+            return [self._decode(codes_list[0])]
+        speech_ids_list = [self._speech_ids(codes) for codes in codes_list]
+        return _decode_speech_ids_batch(self.codec, speech_ids_list, self._is_onnx_codec, self.hop_length, pad=self.batch_decode_padding)
+
+    def _decode(self, codes: str):
+        """Decode speech tokens to audio waveform"""
+        speech_ids = self._speech_ids(codes)
         
         if self._is_onnx_codec:
             codes = np.array(speech_ids, dtype=np.int32)[np.newaxis, np.newaxis, :]
@@ -1129,16 +1560,32 @@ class FastVieNeuTTS:
         
         return recon[0, 0, :]
     
-    def _format_prompt(self, ref_codes: list[int], ref_text: str, input_text: str) -> str:
+    def prepare_phonemes(self, texts: list[str], max_chars: int = 256, voice: dict = None, ref_text: str = None) -> int:
+        """
+        Phonemise every chunk of several texts (e.g. all slides of a presentation) and the
+        reference text with a single phonemize_batch call, so the following infer calls
+        do not invoke espeak again. max_chars must match the one passed to infer.
+
+        Returns:
+            int: Number of newly phonemised texts.
+        """
+        if voice is not None:
+            ref_text = voice.get('text', ref_text)
+
+        candidates = [ref_text] if ref_text else []
+        for text in texts:
+            candidates.extend(split_text_into_chunks(text, max_chars=max_chars))
+
+        return self._phonemize_all(candidates)
+
+    def _format_prompt(self, ref_codes, ref_text: str, input_text: str) -> str:
         """Format prompt for LMDeploy"""
-        ref_text_phones = phonemize_with_dict(ref_text)
-        input_text_phones = phonemize_with_dict(input_text)
-        
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
+        ref_text_phones = self._phonemize(ref_text)
+        input_text_phones = self._phonemize(input_text)
         
         prompt = (
             f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text_phones} {input_text_phones}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{self._reference_codes(ref_codes).speech_str}"
         )
         
         return prompt
@@ -1192,11 +1639,6 @@ class FastVieNeuTTS:
             
         if len(chunks) == 1:
             # Single chunk optimization
-            if isinstance(ref_codes, torch.Tensor):
-                ref_codes = ref_codes.cpu().numpy()
-            if isinstance(ref_codes, np.ndarray):
-                ref_codes = ref_codes.flatten().tolist()
-            
             prompt = self._format_prompt(ref_codes, ref_text, chunks[0])
             responses = self.backbone([prompt], gen_config=self.gen_config, do_preprocess=False)
             wav = self._decode(responses[0].text)
@@ -1241,31 +1683,29 @@ class FastVieNeuTTS:
         self.gen_config.top_k = top_k
         self.gen_config.repetition_penalty = 1.0 # default
         
-        if isinstance(ref_codes, torch.Tensor):
-            ref_codes = ref_codes.cpu().numpy()
-        if isinstance(ref_codes, np.ndarray):
-            ref_codes = ref_codes.flatten().tolist()
+        ref_codes = self._reference_codes(ref_codes)
         
-        all_wavs = []
+        futures = []
         
-        for i in range(0, len(texts), max_batch_size):
-            batch_texts = texts[i:i+max_batch_size]
-            prompts = [self._format_prompt(ref_codes, ref_text, text) for text in batch_texts]
-            responses = self.backbone(prompts, gen_config=self.gen_config, do_preprocess=False)
-            batch_codes = [response.text for response in responses]
-            
-            # Decode sequentially to check for errors individually and save VRAM
-            batch_wavs = [self._decode(codes) for codes in batch_codes]
-            
-            # Apply watermark if available
-            if self.watermarker:
-                batch_wavs = [self.watermarker.apply_watermark(w, sample_rate=self.sample_rate) for w in batch_wavs]
+        # Decode batch i in a background thread while the backbone generates batch i+1
+        with ThreadPoolExecutor(max_workers=1) as decoder:
+            for i in range(0, len(texts), max_batch_size):
+                batch_texts = texts[i:i+max_batch_size]
+                prompts = [self._format_prompt(ref_codes, ref_text, text) for text in batch_texts]
+                responses = self.backbone(prompts, gen_config=self.gen_config, do_preprocess=False)
+                batch_codes = [response.text for response in responses]
                 
-            all_wavs.extend(batch_wavs)
+                futures.append(decoder.submit(self._decode_batch, batch_codes))
+                
+                if i + max_batch_size < len(texts):
+                    if torch.cuda.is_available():
+                        torch.cuda.empty_cache()
             
-            if i + max_batch_size < len(texts):
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
+            all_wavs = [wav for future in futures for wav in future.result()]
+        
+        # Apply watermark if available
+        if self.watermarker:
+            all_wavs = [self.watermarker.apply_watermark(w, sample_rate=self.sample_rate) for w in all_wavs]
         
         return all_wavs
     
@@ -1305,6 +1745,7 @@ class FastVieNeuTTS:
         self.gen_config.top_k = top_k
         self.gen_config.repetition_penalty = 1.0
 
+        ref_codes = self._reference_codes(ref_codes)
         chunks = split_text_into_chunks(text, max_chars=max_chars)
         
         for chunk in chunks:
@@ -1312,16 +1753,11 @@ class FastVieNeuTTS:
 
     def _infer_stream_single(self, text: str, ref_codes: np.ndarray | torch.Tensor, ref_text: str) -> Generator[np.ndarray, None, None]:
         """Internal method for streaming a single short text chunk"""
-        if isinstance(ref_codes, torch.Tensor):
-            ref_codes = ref_codes.cpu().numpy()
-        if isinstance(ref_codes, np.ndarray):
-            ref_codes = ref_codes.flatten().tolist()
-        
+        ref_codes = self._reference_codes(ref_codes)
         prompt = self._format_prompt(ref_codes, ref_text, text)
         
-        audio_cache = []
-        token_cache = [f"<|speech_{idx}|>" for idx in ref_codes]
-        n_decoded_samples = 0
+        overlap_add = _StreamingOverlapAdd(self.streaming_stride_samples)
+        token_cache = list(ref_codes.tokens)
         n_decoded_tokens = len(ref_codes)
         
         for response in self.backbone.stream_infer([prompt], gen_config=self.gen_config, do_preprocess=False):
@@ -1356,15 +1792,9 @@ class FastVieNeuTTS:
                 curr_codes = token_cache[tokens_start:tokens_end]
                 recon = self._decode("".join(curr_codes))
                 recon = recon[sample_start:sample_end]
-                audio_cache.append(recon)
                 
                 # Overlap-add processing
-                processed_recon = _linear_overlap_add(
-                    audio_cache, stride=self.streaming_stride_samples
-                )
-                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                processed_recon = processed_recon[n_decoded_samples:new_samples_end]
-                n_decoded_samples = new_samples_end
+                processed_recon = overlap_add.add(recon)
                 n_decoded_tokens += self.streaming_frames_per_chunk
                 
                 yield processed_recon
@@ -1383,10 +1813,8 @@ class FastVieNeuTTS:
             curr_codes = token_cache[tokens_start:]
             recon = self._decode("".join(curr_codes))
             recon = recon[sample_start:]
-            audio_cache.append(recon)
             
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
+            processed_recon = overlap_add.add(recon, final=True)
             yield processed_recon
     
     def cleanup_memory(self):
@@ -1462,6 +1890,9 @@ class RemoteVieNeuTTS(VieNeuTTS):
         self.streaming_lookback = 50           
         self.streaming_stride_samples = self.streaming_frames_per_chunk * self.hop_length
         
+        # Codec decoding of async responses runs here, off the event loop
+        self._async_decoder = None
+        
         self._load_voices_from_repo(model_name, hf_token)
         
         print(f"📡 RemoteVieNeuTTS ready! Using backend: {self.api_base}")
@@ -1469,16 +1900,20 @@ class RemoteVieNeuTTS(VieNeuTTS):
     def _load_backbone(self, backbone_repo, backbone_device):
         pass 
 
-    def _format_prompt(self, ref_codes: list[int], ref_text: str, input_text: str) -> str:
+    def close(self):
+        if getattr(self, "_async_decoder", None) is not None:
+            self._async_decoder.shutdown(wait=False)
+            self._async_decoder = None
+        super().close()
+
+    def _format_prompt(self, ref_codes, ref_text: str, input_text: str) -> str:
         """Format prompt for remote LMDeploy server"""
-        ref_text_phones = phonemize_with_dict(ref_text)
-        input_text_phones = phonemize_with_dict(input_text)
-        
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
+        ref_text_phones = self._phonemize(ref_text)
+        input_text_phones = self._phonemize(input_text)
         
         prompt = (
             f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text_phones} {input_text_phones}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{self._reference_codes(ref_codes).speech_str}"
         )
         return prompt
 
@@ -1526,16 +1961,10 @@ class RemoteVieNeuTTS(VieNeuTTS):
         if not chunks:
             return np.array([], dtype=np.float32)
 
+        ref_codes = self._reference_codes(ref_codes)
         all_wavs = []
         for chunk in chunks:
-            if isinstance(ref_codes, torch.Tensor):
-                ref_codes_list = ref_codes.cpu().numpy().flatten().tolist()
-            elif isinstance(ref_codes, np.ndarray):
-                ref_codes_list = ref_codes.flatten().tolist()
-            else:
-                ref_codes_list = ref_codes
-
-            prompt = self._format_prompt(ref_codes_list, ref_text, chunk)
+            prompt = self._format_prompt(ref_codes, ref_text, chunk)
             
             payload = {
                 "model": self.model_name,
@@ -1570,6 +1999,15 @@ class RemoteVieNeuTTS(VieNeuTTS):
             
         return final_wav    
 
+    def infer_batch(self, texts: list[str], ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_batch_size: int = None, voice: dict = None, temperature: float = 1.0, top_k: int = 50) -> list[np.ndarray]:
+        """
+        Remote batch inference. Batching happens on the server, so texts are sent one by one
+        (use infer_batch_async for concurrent requests).
+        """
+        if not isinstance(texts, list):
+            texts = [texts]
+        return [self.infer(text, ref_codes=ref_codes, ref_text=ref_text, voice=voice, temperature=temperature, top_k=top_k) for text in texts]
+
     def infer_stream(self, text: str, ref_audio: str | Path = None, ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_chars: int = 256, voice: dict = None, temperature: float = 1.0, top_k: int = 50) -> Generator[np.ndarray, None, None]:
         """
         Stream output audio (generator).
@@ -1592,20 +2030,15 @@ class RemoteVieNeuTTS(VieNeuTTS):
         if ref_codes is None or ref_text is None:
              raise ValueError("Must provide either 'voice' dict or both 'ref_codes' and 'ref_text'.")
 
+        ref_codes = self._reference_codes(ref_codes)
         chunks = split_text_into_chunks(text, max_chars=max_chars)
         for chunk in chunks:
             yield from self._infer_stream_chunk(chunk, ref_codes, ref_text, temperature, top_k)
 
     def _infer_stream_chunk(self, chunk, ref_codes, ref_text, temperature, top_k):
         """Internal helper to stream a single text chunk"""
-        if isinstance(ref_codes, torch.Tensor):
-            ref_codes_list = ref_codes.cpu().numpy().flatten().tolist()
-        elif isinstance(ref_codes, np.ndarray):
-            ref_codes_list = ref_codes.flatten().tolist()
-        else:
-            ref_codes_list = ref_codes
-
-        prompt = self._format_prompt(ref_codes_list, ref_text, chunk)
+        ref_codes = self._reference_codes(ref_codes)
+        prompt = self._format_prompt(ref_codes, ref_text, chunk)
         
         payload = {
             "model": self.model_name,
@@ -1618,10 +2051,9 @@ class RemoteVieNeuTTS(VieNeuTTS):
         }
 
         # Streaming window state
-        audio_cache: list[np.ndarray] = []
-        token_cache: list[str] = [f"<|speech_{idx}|>" for idx in ref_codes_list]
-        n_decoded_samples: int = 0
-        n_decoded_tokens: int = len(ref_codes_list)
+        overlap_add = _StreamingOverlapAdd(self.streaming_stride_samples)
+        token_cache: list[str] = list(ref_codes.tokens)
+        n_decoded_tokens: int = len(ref_codes)
 
         try:
              with requests.post(f"{self.api_base}/chat/completions", json=payload, stream=True, timeout=60) as r:
@@ -1660,12 +2092,8 @@ class RemoteVieNeuTTS(VieNeuTTS):
                                     recon = self.watermarker.apply_watermark(recon, sample_rate=self.sample_rate)
                                 
                                 recon = recon[sample_start:sample_end]
-                                audio_cache.append(recon)
                                 
-                                processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-                                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                                processed_recon = processed_recon[n_decoded_samples:new_samples_end]
-                                n_decoded_samples = new_samples_end
+                                processed_recon = overlap_add.add(recon)
                                 n_decoded_tokens += self.streaming_frames_per_chunk
                                 yield processed_recon
                                 
@@ -1685,15 +2113,16 @@ class RemoteVieNeuTTS(VieNeuTTS):
             curr_codes = token_cache[tokens_start:]
             recon = self._decode("".join(curr_codes))
             recon = recon[sample_start:]
-            audio_cache.append(recon)
             
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
+            processed_recon = overlap_add.add(recon, final=True)
             yield processed_recon
 
-    async def infer_async(self, text: str, ref_audio: str | Path = None, ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: dict = None, temperature: float = 1.0, top_k: int = 50, session=None) -> np.ndarray:
+    async def infer_async(self, text: str, ref_audio: str | Path = None, ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: dict = None, temperature: float = 1.0, top_k: int = 50, session=None, semaphore: asyncio.Semaphore = None, strict: bool = False) -> np.ndarray:
         """
         Asynchronous inference (Non-blocking I/O).
+        
+        semaphore bounds the chunk requests in flight (shared by infer_batch_async).
+        strict raises on a failed chunk instead of leaving it out of the audio.
         """
         try:
             import aiohttp
@@ -1729,9 +2158,10 @@ class RemoteVieNeuTTS(VieNeuTTS):
             should_close_session = True
 
         try:
+            ref_codes = self._reference_codes(ref_codes)
             tasks = []
             for chunk in chunks:
-                tasks.append(self._infer_chunk_async(session, chunk, ref_codes, ref_text, temperature, top_k))
+                tasks.append(self._infer_chunk_async(session, chunk, ref_codes, ref_text, temperature, top_k, semaphore, strict))
             
             # Process chunks in parallel
             wavs = await asyncio.gather(*tasks)
@@ -1748,16 +2178,14 @@ class RemoteVieNeuTTS(VieNeuTTS):
             if should_close_session:
                 await session.close()
     
-    async def _infer_chunk_async(self, session, chunk, ref_codes, ref_text, temperature, top_k):
-        """Internal async helper for a single chunk"""
-        if isinstance(ref_codes, torch.Tensor):
-            ref_codes_list = ref_codes.cpu().numpy().flatten().tolist()
-        elif isinstance(ref_codes, np.ndarray):
-            ref_codes_list = ref_codes.flatten().tolist()
-        else:
-            ref_codes_list = ref_codes
+    def _get_async_decoder(self) -> ThreadPoolExecutor:
+        if self._async_decoder is None:
+            self._async_decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vieneu-decode")
+        return self._async_decoder
 
-        prompt = self._format_prompt(ref_codes_list, ref_text, chunk)
+    async def _infer_chunk_async(self, session, chunk, ref_codes, ref_text, temperature, top_k, semaphore=None, strict=False):
+        """Internal async helper for a single chunk"""
+        prompt = self._format_prompt(ref_codes, ref_text, chunk)
         
         payload = {
             "model": self.model_name,
@@ -1770,18 +2198,28 @@ class RemoteVieNeuTTS(VieNeuTTS):
         }
         
         try:
-            async with session.post(f"{self.api_base}/chat/completions", json=payload, timeout=60) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                output_str = data["choices"][0]["message"]["content"]
-                return self._decode(output_str)
+            async with semaphore or contextlib.nullcontext():
+                async with session.post(f"{self.api_base}/chat/completions", json=payload, timeout=60) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json()
+            output_str = data["choices"][0]["message"]["content"]
+            # Decode in the codec thread so the other requests keep flowing meanwhile
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_async_decoder(), self._decode, output_str)
         except Exception as e:
+            if strict:
+                raise
             print(f"Error in async chunk: {e}")
             return np.array([], dtype=np.float32)
 
-    async def infer_batch_async(self, texts: list[str], ref_audio: str | Path = None, ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: dict = None, temperature: float = 1.0, top_k: int = 50, concurrency_limit: int = 50) -> list[np.ndarray]:
+    async def infer_batch_async(self, texts: list[str], ref_audio: str | Path = None, ref_codes: np.ndarray | torch.Tensor = None, ref_text: str = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: dict = None, temperature: float = 1.0, top_k: int = 50, concurrency_limit: int = 50, session=None, return_exceptions: bool = False) -> list[np.ndarray]:
         """
         High-performance Asynchronous Batch Inference.
+        
+        The chunks of all texts are requested concurrently, at most concurrency_limit at
+        a time, and reassembled per text. Pass a long-lived session to reuse its
+        connection pool across calls. With return_exceptions=True a text with a failed
+        chunk is returned as the exception (like asyncio.gather) instead of without it.
         """
         try:
             import aiohttp
@@ -1806,23 +2244,30 @@ class RemoteVieNeuTTS(VieNeuTTS):
         if ref_codes is None or ref_text is None:
              raise ValueError("Must provide either 'voice' dict or both 'ref_codes' and 'ref_text'.")
 
-        # Use Semaphore to control concurrency
+        ref_codes = self._reference_codes(ref_codes)
+        
+        # Semaphore bounds chunk requests across all texts, not texts
         sem = asyncio.Semaphore(concurrency_limit)
         
-        async with aiohttp.ClientSession() as session:
-            async def bounded_infer(text):
-                async with sem:
-                    return await self.infer_async(
-                        text, ref_codes=ref_codes, ref_text=ref_text,
-                        max_chars=max_chars, silence_p=silence_p, crossfade_p=crossfade_p,
-                        temperature=temperature, top_k=top_k, 
-                        session=session # Reuse session
-                    )
-            
-            tasks = [bounded_infer(text) for text in texts]
-            results = await asyncio.gather(*tasks)
-            
-        return results
+        should_close_session = False
+        if session is None:
+            session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency_limit))
+            should_close_session = True
+        
+        try:
+            tasks = [
+                self.infer_async(
+                    text, ref_codes=ref_codes, ref_text=ref_text,
+                    max_chars=max_chars, silence_p=silence_p, crossfade_p=crossfade_p,
+                    temperature=temperature, top_k=top_k,
+                    session=session, semaphore=sem, strict=return_exceptions
+                )
+                for text in texts
+            ]
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            if should_close_session:
+                await session.close()
 
 
 def Vieneu(mode="standard", **kwargs):
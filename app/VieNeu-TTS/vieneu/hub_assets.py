@@ -0,0 +1,207 @@
+"""
+Offline-first resolution of VieNeu assets (GGUF backbone, codec, voices.json).
+
+Every asset is looked up in this order:
+
+  1. VIENEU_MODELS_DIR: pinned local copies laid out as <dir>/<repo_id>/...
+     (e.g. models/pnnbao-ump/VieNeu-TTS-0.3B-q4-gguf/*.gguf). When it is set the
+     Hugging Face Hub is never contacted.
+  2. MODEL_STORE_DIR: the checksum-verified store filled by download_models.py
+     (same layout). Only repos whose last verification was complete are used.
+  3. The local Hugging Face cache. The hub is only checked in a background thread,
+     at most once per VIENEU_HUB_REFRESH_TTL seconds; an update is picked up by the
+     next engine construction.
+  4. A blocking download (first run on a machine only).
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+MODELS_DIR_ENV = "VIENEU_MODELS_DIR"
+REFRESH_TTL_ENV = "VIENEU_HUB_REFRESH_TTL"
+DEFAULT_REFRESH_TTL = 24 * 3600
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+
+
+def models_dir() -> Path | None:
+    value = os.environ.get(MODELS_DIR_ENV)
+    return Path(value).expanduser() if value else None
+
+
+def refresh_ttl() -> float:
+    value = os.environ.get(REFRESH_TTL_ENV)
+    return float(value) if value else DEFAULT_REFRESH_TTL
+
+
+def _force_hub_offline():
+    # Libraries that download on their own (neucodec, transformers) must not reach
+    # the hub either once assets are pinned
+    from huggingface_hub import constants
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    constants.HF_HUB_OFFLINE = True
+
+
+def is_offline() -> bool:
+    if models_dir() is not None:
+        return True
+    from huggingface_hub import constants
+    return bool(constants.HF_HUB_OFFLINE)
+
+
+def pinned_path(repo_id: str) -> Path | None:
+    """<VIENEU_MODELS_DIR>/<repo_id>, or None when assets are not pinned."""
+    root = models_dir()
+    if root is None:
+        return None
+    _force_hub_offline()
+    path = root / repo_id
+    if not path.exists():
+        raise FileNotFoundError(f"{MODELS_DIR_ENV}={root} is set but '{path}' does not exist")
+    return path
+
+
+def store_path(repo_id: str) -> Path | None:
+    """
+    <MODEL_STORE_DIR>/<repo_id> if download_models.py verified it completely, else None.
+    The store's layout, state format and path resolution belong to download_models;
+    outside the app (vieneu used on its own) there is no store.
+    """
+    try:
+        from download_models import ModelStore
+    except ImportError:
+        return None
+    folder = ModelStore().verified_dir(repo_id)
+    return Path(folder) if folder else None
+
+
+def _find(folder: Path, pattern: str) -> Path | None:
+    if not any(c in pattern for c in "*?["):
+        path = folder / pattern
+        return path if path.exists() else None
+    matches = sorted(folder.rglob(pattern))
+    return matches[0] if matches else None
+
+
+def _stamp_file() -> Path:
+    from huggingface_hub import constants
+    return Path(constants.HF_HUB_CACHE) / "vieneu_refresh.json"
+
+
+def _read_stamps() -> dict:
+    try:
+        with open(_stamp_file(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _mark_refreshed(key: str):
+    stamps = _read_stamps()
+    stamps[key] = time.time()
+    path = _stamp_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stamps, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _refresh_key(repo_id: str, allow_patterns) -> str:
+    return f"{repo_id}|{','.join(allow_patterns or ['*'])}"
+
+
+def schedule_refresh(repo_id: str, allow_patterns=None, token=None):
+    """Re-check the hub for repo_id in a daemon thread if the last check is older than the TTL."""
+    if is_offline():
+        return
+    key = _refresh_key(repo_id, allow_patterns)
+    if time.time() - _read_stamps().get(key, 0) < refresh_ttl():
+        return
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def _refresh():
+        from huggingface_hub import snapshot_download
+        try:
+            snapshot_download(repo_id, allow_patterns=allow_patterns, token=token)
+            _mark_refreshed(key)
+        except Exception as e:
+            print(f"   ⚠️ Background refresh of {repo_id} failed: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=_refresh, name=f"vieneu-refresh-{repo_id}", daemon=True).start()
+
+
+def local_snapshot(repo_id: str, allow_patterns=None, token=None) -> str | None:
+    """
+    Local folder holding repo_id (pinned copy or cached snapshot), or None if the
+    repo has never been downloaded. A cached snapshot schedules a background refresh.
+    """
+    pinned = pinned_path(repo_id) or store_path(repo_id)
+    if pinned is not None:
+        return str(pinned)
+
+    from huggingface_hub import snapshot_download
+    try:
+        folder = snapshot_download(repo_id, allow_patterns=allow_patterns, token=token, local_files_only=True)
+    except Exception:
+        return None
+    schedule_refresh(repo_id, allow_patterns, token)
+    return folder
+
+
+def resolve_file(repo_id: str, pattern: str, token=None) -> str:
+    """
+    Path of the first file in repo_id matching pattern (a filename or glob such as
+    "*.gguf"). Downloads only when no local copy exists.
+    """
+    folder = local_snapshot(repo_id, [pattern], token)
+    path = _find(Path(folder), pattern) if folder else None
+    if path is not None:
+        return str(path)
+    if is_offline():
+        raise FileNotFoundError(f"'{pattern}' from {repo_id} is not available locally (offline mode)")
+
+    from huggingface_hub import snapshot_download
+    print(f"   ⬇️ Downloading {pattern} from {repo_id} ...")
+    folder = snapshot_download(repo_id, allow_patterns=[pattern], token=token)
+    _mark_refreshed(_refresh_key(repo_id, [pattern]))
+    path = _find(Path(folder), pattern)
+    if path is None:
+        raise FileNotFoundError(f"No file matching '{pattern}' in {repo_id}")
+    return str(path)
+
+
+def from_pretrained(loader, repo_id: str, token=None, **kwargs):
+    """
+    loader.from_pretrained(repo_id) from the pinned folder or the local cache, with
+    the hub only as a fallback (first run). Works with any hub-aware loader
+    (transformers, huggingface_hub mixins such as NeuCodec).
+    """
+    if token is not None:
+        kwargs["token"] = token
+    pinned = pinned_path(repo_id) or store_path(repo_id)
+    if pinned is not None:
+        return loader.from_pretrained(str(pinned), **kwargs)
+
+    try:
+        model = loader.from_pretrained(repo_id, local_files_only=True, **kwargs)
+    except Exception:
+        if is_offline():
+            raise
+        model = loader.from_pretrained(repo_id, **kwargs)
+        _mark_refreshed(_refresh_key(repo_id, None))
+        return model
+    schedule_refresh(repo_id, token=token)
+    return model
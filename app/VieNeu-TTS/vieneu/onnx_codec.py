@@ -0,0 +1,175 @@
+"""
+ONNX export and onnxruntime loader for the NeuCodec decoder (CPU).
+
+Export the torch decoder once:
+
+    python -m vieneu.onnx_codec export --codec neuphonic/distill-neucodec --output models/distill-neucodec-decoder.onnx
+
+then pass the .onnx path as codec_repo (VieNeuTTS(codec_repo="models/distill-neucodec-decoder.onnx")).
+"""
+import argparse
+import os
+
+import numpy as np
+import torch
+
+from . import hub_assets
+
+# NeuCodec decodes 50 frames per second of 24 kHz audio
+FRAMES_PER_SECOND = 50
+
+
+class _CodecDecoder(torch.nn.Module):
+    """codes [B, 1, T] -> audio [B, 1, T * hop_length], the graph that gets exported."""
+
+    def __init__(self, codec):
+        super().__init__()
+        self.codec = codec
+
+    def forward(self, codes):
+        return self.codec.decode_code(codes)
+
+
+def load_torch_codec(codec_repo: str, device: str = "cpu"):
+    from neucodec import NeuCodec, DistillNeuCodec
+
+    match codec_repo:
+        case "neuphonic/neucodec":
+            codec = hub_assets.from_pretrained(NeuCodec, codec_repo)
+        case "neuphonic/distill-neucodec":
+            codec = hub_assets.from_pretrained(DistillNeuCodec, codec_repo)
+        case _:
+            raise ValueError(f"Unsupported codec repository for export: {codec_repo}")
+    return codec.eval().to(device)
+
+
+def default_num_threads() -> int:
+    """Intra-op threads: VIENEU_ONNX_THREADS, else the CPUs this process may run on."""
+    env = os.environ.get("VIENEU_ONNX_THREADS")
+    if env:
+        return max(int(env), 1)
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class OnnxCodecDecoder:
+    """
+    onnxruntime session for an exported decoder, with the same decode_code interface
+    as neucodec's NeuCodecOnnxDecoder (numpy codes in, numpy audio out).
+    """
+
+    def __init__(self, model_path: str, num_threads: int = None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("ONNX codec requires onnxruntime. Install with: pip install onnxruntime") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads or default_num_threads()
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        self.model_path = model_path
+        self.num_threads = options.intra_op_num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input = self.session.get_inputs()[0]
+        self._input_dtype = np.int64 if "int64" in self._input.type else np.int32
+
+    def decode_code(self, codes) -> np.ndarray:
+        if isinstance(codes, torch.Tensor):
+            codes = codes.cpu().numpy()
+        codes = np.asarray(codes, dtype=self._input_dtype)
+        return self.session.run(None, {self._input.name: codes})[0]
+
+
+def export_decoder(codec, output_path: str, opset: int = 17, example_frames: int = 100):
+    """Export codec.decode_code to ONNX with dynamic batch and sequence length."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    codes = torch.randint(0, 1000, (1, 1, example_frames), dtype=torch.long)
+    with torch.no_grad():
+        torch.onnx.export(
+            _CodecDecoder(codec).eval(),
+            (codes,),
+            output_path,
+            input_names=["codes"],
+            output_names=["audio"],
+            dynamic_axes={"codes": {0: "batch", 2: "frames"}, "audio": {0: "batch", 2: "samples"}},
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    return output_path
+
+
+def random_codes(frames: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 65536, size=(1, 1, frames), dtype=np.int64)
+
+
+def check_parity(codec, decoder: OnnxCodecDecoder, frame_counts=(25, 100, 400), atol: float = 1e-3) -> list[dict]:
+    """
+    Decode the same random codes with torch and onnxruntime. Several lengths are used
+    to make sure the sequence axis really is dynamic.
+    """
+    results = []
+    for frames in frame_counts:
+        codes = random_codes(frames, seed=frames)
+        with torch.no_grad():
+            reference = codec.decode_code(torch.from_numpy(codes).to(codec.device)).cpu().numpy()
+        output = decoder.decode_code(codes)
+        max_abs = float(np.abs(reference - output).max()) if reference.shape == output.shape else float("inf")
+        noise = np.sum((reference - output) ** 2) if reference.shape == output.shape else np.inf
+        snr = float(10 * np.log10(np.sum(reference ** 2) / max(noise, 1e-20)))
+        results.append({
+            "frames": frames,
+            "shape_ok": reference.shape == output.shape,
+            "max_abs_error": max_abs,
+            "snr_db": snr,
+            "ok": reference.shape == output.shape and max_abs <= atol,
+        })
+    return results
+
+
+def _print_parity(results):
+    for r in results:
+        status = "✅" if r["ok"] else "❌"
+        print(f"   {status} {r['frames']:>4} frames: max |err| {r['max_abs_error']:.2e}, SNR {r['snr_db']:.1f} dB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NeuCodec decoder ONNX tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Export the torch decoder to ONNX and check parity")
+    export.add_argument("--codec", default="neuphonic/distill-neucodec")
+    export.add_argument("--output", required=True)
+    export.add_argument("--opset", type=int, default=17)
+
+    parity = sub.add_parser("parity", help="Compare an exported decoder with the torch decoder")
+    parity.add_argument("--codec", default="neuphonic/distill-neucodec")
+    parity.add_argument("--model", required=True)
+    parity.add_argument("--threads", type=int, default=None)
+    parity.add_argument("--atol", type=float, default=1e-3)
+
+    args = parser.parse_args()
+    codec = load_torch_codec(args.codec)
+
+    if args.command == "export":
+        print(f"📦 Exporting {args.codec} decoder to {args.output} (opset {args.opset})...")
+        export_decoder(codec, args.output, opset=args.opset)
+        model_path, atol = args.output, 1e-3
+        threads = None
+    else:
+        model_path, atol, threads = args.model, args.atol, args.threads
+
+    decoder = OnnxCodecDecoder(model_path, num_threads=threads)
+    print(f"🔍 Parity check ({decoder.num_threads} threads):")
+    results = check_parity(codec, decoder, atol=atol)
+    _print_parity(results)
+    if not all(r["ok"] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
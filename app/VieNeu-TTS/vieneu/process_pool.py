@@ -0,0 +1,245 @@
+"""
+Multi-process pool of GGUF VieNeuTTS engines (CPU).
+
+A single llama.cpp instance stops scaling long before it uses every core of a
+large render node. The pool starts several worker processes, each with its own
+Llama (n_threads = cores / workers) and codec. Every worker opens the same GGUF
+file, which llama.cpp maps with mmap, so the weights are held once in the page cache.
+
+Text is split into chunks in the parent process, the chunks are spread over the
+workers and the audio is reassembled in the original order.
+
+    pool = VieNeuProcessPool(num_workers=4)
+    wav = pool.infer(text, voice=pool.get_preset_voice("Binh"))
+"""
+import json
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Generator
+
+import numpy as np
+
+from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks
+from . import hub_assets
+
+# Engine of the current worker process (set by _init_worker)
+_engine = None
+
+
+def available_cpus() -> int:
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(engine_kwargs: dict, n_threads: int, ready):
+    global _engine
+    # Keep the codec (torch / onnxruntime) within this worker's share of the cores
+    os.environ["OMP_NUM_THREADS"] = str(n_threads)
+    os.environ["VIENEU_ONNX_THREADS"] = str(n_threads)
+    import torch
+    torch.set_num_threads(n_threads)
+
+    from .core import VieNeuTTS
+    _engine = VieNeuTTS(backbone_threads=n_threads, **engine_kwargs)
+    ready.put(os.getpid())
+
+
+def _noop():
+    return None
+
+
+def _synthesize_chunk(chunk: str, voice: dict, max_chars: int, temperature: float, top_k: int) -> np.ndarray:
+    if voice.get("name") in _engine._preset_voices:
+        # Worker's own preset, with the prompt pieces prepared at load
+        voice = _engine.get_preset_voice(voice["name"])
+    return _engine.infer(chunk, voice=voice, max_chars=max_chars, silence_p=0.0,
+                         temperature=temperature, top_k=top_k)
+
+
+class VieNeuProcessPool:
+    """
+    GGUF VieNeuTTS spread over worker processes. Offers the engine methods used by
+    AudioService (infer, infer_batch, infer_stream, preset voices, save).
+    """
+
+    def __init__(
+        self,
+        backbone_repo="pnnbao-ump/VieNeu-TTS-0.3B-q4-gguf",
+        codec_repo="neuphonic/distill-neucodec",
+        num_workers=None,
+        threads_per_worker=None,
+        hf_token=None,
+        mp_context="spawn",
+    ):
+        """
+        Args:
+            backbone_repo: GGUF repository or path to a GGUF file
+            codec_repo: Codec repository (or exported .onnx decoder)
+            num_workers: Worker processes (default: CPUs / threads_per_worker, 4 threads each)
+            threads_per_worker: llama.cpp / codec threads per worker (default: CPUs / num_workers)
+            mp_context: multiprocessing start method; 'spawn' keeps torch and llama.cpp
+                threads of the parent out of the workers
+        """
+        if "gguf" not in str(backbone_repo).lower():
+            raise ValueError("VieNeuProcessPool only supports GGUF backbones")
+
+        cpus = available_cpus()
+        if num_workers is None:
+            num_workers = max(cpus // (threads_per_worker or 4), 1)
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(cpus // num_workers, 1)
+        self.sample_rate = 24_000
+
+        # Resolve the model once so the workers open the same file instead of racing on downloads
+        backbone_path = Path(backbone_repo)
+        if backbone_path.is_file():
+            model_path = str(backbone_path)
+        elif backbone_path.is_dir():
+            model_path = str(next(backbone_path.glob("*.gguf")))
+        else:
+            model_path = hub_assets.resolve_file(backbone_repo, "*.gguf", token=hf_token)
+        self.model_path = model_path
+
+        self._preset_voices = {}
+        self._default_voice = None
+        self._load_voices(backbone_repo, hf_token)
+
+        print(f"🧵 Starting VieNeu process pool: {self.num_workers} workers x {self.threads_per_worker} threads")
+        context = multiprocessing.get_context(mp_context)
+        # Each worker reports its pid here once its models are loaded (see warmup)
+        self._ready = context.Queue()
+        self._ready_workers = set()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=({"backbone_repo": model_path, "codec_repo": codec_repo, "hf_token": hf_token}, self.threads_per_worker, self._ready),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes (pending chunks are cancelled)."""
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def warmup(self) -> int:
+        """Start every worker and wait until all have loaded their models. Returns the ready count."""
+        # Workers are spawned on demand: one pending task per missing worker starts them all
+        futures = [self._executor.submit(_noop) for _ in range(self.num_workers - len(self._ready_workers))]
+        while len(self._ready_workers) < self.num_workers:
+            try:
+                self._ready_workers.add(self._ready.get(timeout=1.0))
+            except queue.Empty:
+                # A worker that fails to load breaks the pool; surface that instead of waiting forever
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise future.exception()
+        return len(self._ready_workers)
+
+    def _load_voices(self, backbone_repo, hf_token=None):
+        # Workers load the voices.json next to the GGUF file, the parent needs the list for the UI
+        json_path = Path(self.model_path).parent / "voices.json"
+        if not json_path.exists() and not Path(backbone_repo).exists():
+            try:
+                json_path = Path(hub_assets.resolve_file(backbone_repo, "voices.json", token=hf_token))
+            except Exception as e:
+                print(f"   ⚠️ Could not resolve voices.json: {e}")
+                return
+        if not json_path.exists():
+            print(f"   ⚠️ Warning: '{backbone_repo}' missing 'voices.json'. Falling back to Custom Voice mode.")
+            return
+
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._preset_voices.update(data.get("presets", {}))
+        self._default_voice = data.get("default_voice") or self._default_voice
+        print(f"   📢 Loaded {len(self._preset_voices)} voices from {json_path.name}")
+
+    def list_preset_voices(self):
+        """List available preset voices as (description, id)."""
+        return [
+            (v.get("description", k) if isinstance(v, dict) else str(v), k)
+            for k, v in self._preset_voices.items()
+        ]
+
+    def get_preset_voice(self, voice_name: str = None):
+        """Reference codes and text of a preset voice; 'name' lets workers use their prepared copy."""
+        if voice_name is None:
+            voice_name = self._default_voice or next(iter(self._preset_voices), None)
+            if voice_name is None:
+                raise ValueError("No voice specified and no preset voices available.")
+        if voice_name not in self._preset_voices:
+            raise ValueError(f"Voice '{voice_name}' not found. Available: {self.list_preset_voices()}")
+
+        voice_data = self._preset_voices[voice_name]
+        return {"codes": np.asarray(voice_data["codes"], dtype=np.int64), "text": voice_data["text"], "name": voice_name}
+
+    def _voice_payload(self, voice: dict = None) -> dict:
+        """Picklable voice for the workers (presets travel by name)."""
+        if voice is None:
+            voice = self.get_preset_voice(None)
+        if voice.get("name") in self._preset_voices:
+            return {"name": voice["name"]}
+        codes = voice["codes"]
+        if hasattr(codes, "cpu"):
+            codes = codes.cpu().numpy()
+        return {"codes": np.asarray(codes, dtype=np.int64).reshape(-1), "text": voice["text"]}
+
+    def _submit_chunks(self, chunks: list[str], voice: dict, max_chars: int, temperature: float, top_k: int):
+        payload = self._voice_payload(voice)
+        return [
+            self._executor.submit(_synthesize_chunk, chunk, payload, max_chars, temperature, top_k)
+            for chunk in chunks
+        ]
+
+    def infer(self, text: str, voice: dict = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, temperature: float = 1.0, top_k: int = 50) -> np.ndarray:
+        """Synthesise one text; its chunks run on all workers in parallel."""
+        chunks = split_text_into_chunks(text, max_chars=max_chars)
+        if not chunks:
+            return np.array([], dtype=np.float32)
+        futures = self._submit_chunks(chunks, voice, max_chars, temperature, top_k)
+        return join_audio_chunks((future.result() for future in futures), self.sample_rate, silence_p, crossfade_p)
+
+    def infer_batch(self, texts: list[str], voice: dict = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, temperature: float = 1.0, top_k: int = 50) -> list[np.ndarray]:
+        """
+        Synthesise several texts (e.g. every slide of a presentation). The chunks of
+        all texts are queued at once, so workers never idle at slide boundaries.
+        """
+        chunks_per_text = [split_text_into_chunks(text, max_chars=max_chars) for text in texts]
+        futures = self._submit_chunks([c for chunks in chunks_per_text for c in chunks], voice, max_chars, temperature, top_k)
+
+        wavs, start = [], 0
+        for chunks in chunks_per_text:
+            text_futures = futures[start:start + len(chunks)]
+            start += len(chunks)
+            if not text_futures:
+                wavs.append(np.array([], dtype=np.float32))
+                continue
+            wavs.append(join_audio_chunks((future.result() for future in text_futures), self.sample_rate, silence_p, crossfade_p))
+        return wavs
+
+    def infer_stream(self, text: str, voice: dict = None, max_chars: int = 256, temperature: float = 1.0, top_k: int = 50) -> Generator[np.ndarray, None, None]:
+        """Yield chunk audio in order; later chunks are generated while earlier ones are sent."""
+        futures = self._submit_chunks(split_text_into_chunks(text, max_chars=max_chars), voice, max_chars, temperature, top_k)
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def save(self, audio, output_path: str):
+        import soundfile as sf
+        sf.write(output_path, audio, self.sample_rate)
@@ -1,10 +1,16 @@
 import re
 import os
-from typing import List
+from typing import Callable, Iterable, List
 import numpy as np
 
-def join_audio_chunks(chunks: list[np.ndarray], sr: int, silence_p: float = 0.0, crossfade_p: float = 0.0) -> np.ndarray:
-    """Join audio chunks with optional silence padding and crossfading."""
+def join_audio_chunks(chunks: Iterable[np.ndarray], sr: int, silence_p: float = 0.0, crossfade_p: float = 0.0) -> np.ndarray:
+    """
+    Join audio chunks with optional silence padding and crossfading.
+
+    Accepts any iterable (e.g. a generator of streamed chunks). The output length is
+    computed first, then every chunk is written once into a single preallocated buffer.
+    """
+    chunks = list(chunks)
     if not chunks:
         return np.array([], dtype=np.float32)
     if len(chunks) == 1:
@@ -13,33 +19,53 @@ def join_audio_chunks(chunks: list[np.ndarray], sr: int, silence_p: float = 0.0,
     silence_samples = int(sr * silence_p)
     crossfade_samples = int(sr * crossfade_p)
     
-    final_wav = chunks[0]
+    # Pass 1: output length and the overlap used at each joint
+    overlaps = [0] * len(chunks)
+    total = len(chunks[0])
+    for i in range(1, len(chunks)):
+        size = len(chunks[i])
+        if silence_samples > 0:
+            total += silence_samples + size
+        elif crossfade_samples > 0:
+            overlaps[i] = min(total, size, crossfade_samples)
+            total += size - overlaps[i]
+        else:
+            total += size
+    
+    # Same dtype promotion as concatenating with float32 silence / fade curves
+    if silence_samples > 0 or crossfade_samples > 0:
+        dtype = np.result_type(np.float32, *chunks)
+    else:
+        dtype = np.result_type(*chunks)
+    
+    # Pass 2: write chunks, silences and crossfades in place
+    final_wav = np.empty(total, dtype=dtype)
+    fades = {}
+    pos = len(chunks[0])
+    final_wav[:pos] = chunks[0]
     
     for i in range(1, len(chunks)):
         next_chunk = chunks[i]
+        overlap = overlaps[i]
         
         if silence_samples > 0:
             # 1. Add silence between chunks
-            silence = np.zeros(silence_samples, dtype=np.float32)
-            final_wav = np.concatenate([final_wav, silence, next_chunk])
-        elif crossfade_samples > 0:
+            final_wav[pos:pos + silence_samples] = 0
+            pos += silence_samples
+        elif overlap > 0:
             # 2. Crossfade between chunks
-            overlap = min(len(final_wav), len(next_chunk), crossfade_samples)
-            if overlap > 0:
-                fade_out = np.linspace(1.0, 0.0, overlap, dtype=np.float32)
-                fade_in = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
-                
-                blended = (final_wav[-overlap:] * fade_out + next_chunk[:overlap] * fade_in)
-                final_wav = np.concatenate([
-                    final_wav[:-overlap],
-                    blended,
-                    next_chunk[overlap:]
-                ])
-            else:
-                final_wav = np.concatenate([final_wav, next_chunk])
-        else:
-            # 3. Simple concatenation
-            final_wav = np.concatenate([final_wav, next_chunk])
+            if overlap not in fades:
+                fades[overlap] = (
+                    np.linspace(1.0, 0.0, overlap, dtype=np.float32),
+                    np.linspace(0.0, 1.0, overlap, dtype=np.float32),
+                )
+            fade_out, fade_in = fades[overlap]
+            final_wav[pos - overlap:pos] = final_wav[pos - overlap:pos] * fade_out + next_chunk[:overlap] * fade_in
+        
+        # 3. Remainder of the chunk (simple concatenation)
+        size = len(next_chunk) - overlap
+        final_wav[pos:pos + size] = next_chunk[overlap:]
+        pos += size
             
     return final_wav
 
@@ -110,6 +136,42 @@ def split_text_into_chunks(text: str, max_chars: int = 256) -> List[str]:
 
     return [c.strip() for c in final_chunks if c.strip()]
 
+def split_text_into_token_chunks(text: str, count_tokens: Callable[[str], int], max_tokens: int, piece_chars: int = 64) -> List[str]:
+    """
+    Split raw text into chunks that fit a token budget instead of a character count.
+
+    The text is cut into short pieces (sentence, punctuation or word boundaries, at most
+    piece_chars each) with split_text_into_chunks, and the pieces are packed into the
+    fewest chunks of at most max_tokens tokens. The budget is then lowered as far as that
+    chunk count allows, so chunk lengths come out even and a batch finishes together.
+    """
+    pieces = split_text_into_chunks(text, max_chars=piece_chars)
+    if not pieces:
+        return []
+    counts = [count_tokens(piece) for piece in pieces]
+
+    def pack(budget):
+        groups, current, size = [], [], 0
+        for idx, count in enumerate(counts):
+            if current and size + count > budget:
+                groups.append(current)
+                current, size = [], 0
+            current.append(idx)
+            size += count
+        groups.append(current)
+        return groups
+
+    n_chunks = len(pack(max_tokens))
+    lo, hi = max(counts), max(max_tokens, max(counts))
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if len(pack(mid)) <= n_chunks:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    return [" ".join(pieces[idx] for idx in group) for group in pack(lo)]
+
 def env_bool(name: str, default: bool = False) -> bool:
     v = os.getenv(name)
     if v is None:
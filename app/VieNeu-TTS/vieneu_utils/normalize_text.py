@@ -1,12 +1,17 @@
 import re
+from functools import lru_cache
 
 class VietnameseTTSNormalizer:
     """
     A text normalizer for Vietnamese Text-to-Speech systems.
     Converts numbers, dates, units, and special characters into readable Vietnamese text.
+    
+    All patterns are compiled once at construction (units included, so changes to
+    self.units afterwards are not picked up) and normalize() results are memoised
+    in a bounded LRU cache of `cache_size` input strings.
     """
     
-    def __init__(self):
+    def __init__(self, cache_size=4096):
         self.units = {
             'km': 'ki lô mét', 'dm': 'đê xi mét', 'cm': 'xen ti mét',
             'mm': 'mi li mét', 'nm': 'na nô mét', 'µm': 'mic rô mét',
@@ -43,9 +48,114 @@ class VietnameseTTSNormalizer:
         
         self.digits = ['không', 'một', 'hai', 'ba', 'bốn', 
                       'năm', 'sáu', 'bảy', 'tám', 'chín']
+        
+        self._compile_patterns()
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
+    
+    def _compile_patterns(self):
+        """Compile every pattern used by the pipeline once."""
+        self._re_en_tag = re.compile(r'<en>.*?</en>', re.IGNORECASE)
+        
+        self._temperature_rules = [
+            (re.compile(r'-(\d+(?:[.,]\d+)?)\s*°\s*c\b', re.IGNORECASE), r'âm \1 độ xê'),
+            (re.compile(r'-(\d+(?:[.,]\d+)?)\s*°\s*f\b', re.IGNORECASE), r'âm \1 độ ép'),
+            (re.compile(r'(\d+(?:[.,]\d+)?)\s*°\s*c\b', re.IGNORECASE), r'\1 độ xê'),
+            (re.compile(r'(\d+(?:[.,]\d+)?)\s*°\s*f\b', re.IGNORECASE), r'\1 độ ép'),
+            (re.compile(r'°'), ' độ '),
+        ]
+        
+        self._re_decimal_currency = re.compile(r'(\d+)[.,](\d+)\s*([kmb])\b', re.IGNORECASE)
+        self._currency_rules = [
+            (re.compile(r'(\d+)\s*k\b', re.IGNORECASE), r'\1 nghìn'),
+            (re.compile(r'(\d+)\s*m\b', re.IGNORECASE), r'\1 triệu'),
+            (re.compile(r'(\d+)\s*b\b', re.IGNORECASE), r'\1 tỷ'),
+            (re.compile(r'(\d+(?:[.,]\d+)?)\s*đ\b'), r'\1 đồng'),
+            (re.compile(r'(\d+(?:[.,]\d+)?)\s*vnd\b', re.IGNORECASE), r'\1 đồng'),
+            (re.compile(r'\$\s*(\d+(?:[.,]\d+)?)'), r'\1 đô la'),
+            (re.compile(r'(\d+(?:[.,]\d+)?)\s*\$'), r'\1 đô la'),
+        ]
+        
+        self._re_percentage = re.compile(r'(\d+(?:[.,]\d+)?)\s*%')
+        
+        self._re_compound_unit_number = re.compile(r'(\d+(?:[.,]\d+)?)\s*([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b')
+        self._re_compound_unit = re.compile(r'\b([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b')
+        
+        # Units: one pass per unit, longest first. The passes chain ("8038 m2 cm": the 2 of
+        # m2 is the number of cm), so they stay sequential; a single alternation of every
+        # unit is searched first and skips all passes when no pattern can match
+        sorted_units = sorted(self.units.items(), key=lambda x: len(x[0]), reverse=True)
+        self._unit_rules = [
+            (re.compile(r'(\d+(?:[.,]\d+)?)\s*' + re.escape(unit) + r'\b', re.IGNORECASE), rf'\1 {full_name}')
+            for unit, full_name in sorted_units
+        ]
+        self._re_any_unit = re.compile(
+            r'(\d+(?:[.,]\d+)?)\s*(?:' + '|'.join(re.escape(unit) for unit, _ in sorted_units) + r')\b',
+            re.IGNORECASE
+        )
+        symbol_units = [(unit, full_name) for unit, full_name in sorted_units if any(c in unit for c in '²³°')]
+        self._symbol_unit_rules = [
+            (re.compile(r'\b' + re.escape(unit) + r'\b', re.IGNORECASE), full_name)
+            for unit, full_name in symbol_units
+        ]
+        self._re_any_symbol_unit = re.compile(
+            r'\b(?:' + '|'.join(re.escape(unit) for unit, _ in symbol_units) + r')\b',
+            re.IGNORECASE
+        )
+        
+        self._time_patterns = [
+            re.compile(r'(\d{1,2}):(\d{2}):(\d{2})'),
+            re.compile(r'(\d{1,2}):(\d{2})'),
+            re.compile(r'(\d{1,2})h(\d{2})'),
+            re.compile(r'(\d{1,2})h\b'),
+        ]
+        
+        self._re_date_prefixed = re.compile(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b')
+        self._re_date_prefixed_short = re.compile(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b')
+        self._re_date_iso = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+        self._re_date = re.compile(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b')
+        self._re_date_short = re.compile(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b')
+        
+        self._re_non_digit = re.compile(r'[^\d]')
+        self._phone_patterns = [
+            re.compile(r'(\+84|84)[\s\-\.]?\d[\d\s\-\.]{7,}'),
+            re.compile(r'\b0\d[\d\s\-\.]{8,}'),
+        ]
+        
+        self._re_version = re.compile(r'\b\d+(?:\.\d+){1,}\b')
+        
+        self._re_number_percentage = re.compile(r'(\d+(?:[,.]\d+)?)%')
+        self._re_thousands = re.compile(r'(\d{1,3})(?:\.(\d{3}))+')
+        self._re_decimal_comma = re.compile(r'(\d+),(\d+)')
+        self._re_decimal_dot = re.compile(r'(\d+)\.(\d{1,2})\b')
+        
+        self._re_integer = re.compile(r'\b\d+\b')
+        
+        self._special_char_rules = [
+            # Handle parentheses/brackets as natural pauses: (text) -> , text ,
+            (re.compile(r'[\(\[\{]\s*(.*?)\s*[\)\]\}]'), r', \1, '),
+            # Remaining individual brackets or parens
+            (re.compile(r'[\[\]\(\)\{\}]'), ' '),
+            # Paired dashes (like parentheses): - text - -> , text ,
+            (re.compile(r'(?:\s+|^)[-–—]\s*(.*?)\s*[-–—](?:\s+|$)'), r', \1 , '),
+            # Single dashes used as punctuation (with spaces) -> comma
+            (re.compile(r'\s+[-–—]+\s+'), ', '),
+            # Dashes at the start of a line (bullet points) -> comma
+            (re.compile(r'^[-–—]+\s+'), ', '),
+            # Collapse multiple commas and surrounding spaces (remove spaces before AND after commas)
+            (re.compile(r'\s*,\s*'), ', '),
+            (re.compile(r',\s*,+'), ','),  # Remove duplicate commas
+            (re.compile(r'\.{2,}'), ' '),
+            (re.compile(r'\s+\.\s+'), ' '),
+            (re.compile(r'[^\w\sàáảãạăắằẳẵặâấầẩẫậèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ.,!?;:@%_]'), ' '),
+        ]
+        
+        self._re_whitespace = re.compile(r'\s+')
     
     def normalize(self, text):
-        """Main normalization pipeline with EN tag protection."""
+        """Main normalization pipeline with EN tag protection (memoised per input string)."""
+        return self._normalize_cached(text)
+    
+    def _normalize(self, text):
         # Step 1: Extract and protect EN tags
         en_contents = []
         placeholder_pattern = "___EN_PLACEHOLDER_{}___ "
@@ -54,7 +164,7 @@ class VietnameseTTSNormalizer:
             en_contents.append(match.group(0))
             return placeholder_pattern.format(len(en_contents) - 1)
         
-        text = re.sub(r'<en>.*?</en>', extract_en, text, flags=re.IGNORECASE)
+        text = self._re_en_tag.sub(extract_en, text)
         
         # Step 2: Normal normalization pipeline
         text = text.lower()
@@ -82,11 +192,8 @@ class VietnameseTTSNormalizer:
     
     def _normalize_temperature(self, text):
         """Convert temperature notation to words."""
-        text = re.sub(r'-(\d+(?:[.,]\d+)?)\s*°\s*c\b', r'âm \1 độ xê', text, flags=re.IGNORECASE)
-        text = re.sub(r'-(\d+(?:[.,]\d+)?)\s*°\s*f\b', r'âm \1 độ ép', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*°\s*c\b', r'\1 độ xê', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*°\s*f\b', r'\1 độ ép', text, flags=re.IGNORECASE)
-        text = re.sub(r'°', ' độ ', text)
+        for pattern, repl in self._temperature_rules:
+            text = pattern.sub(repl, text)
         return text
     
     def _normalize_currency(self, text):
@@ -100,19 +207,14 @@ class VietnameseTTSNormalizer:
             unit_word = unit_map.get(unit.lower(), unit)
             return f"{whole} phẩy {decimal_words} {unit_word}"
         
-        text = re.sub(r'(\d+)[.,](\d+)\s*([kmb])\b', decimal_currency, text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+)\s*k\b', r'\1 nghìn', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+)\s*m\b', r'\1 triệu', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+)\s*b\b', r'\1 tỷ', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*đ\b', r'\1 đồng', text)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*vnd\b', r'\1 đồng', text, flags=re.IGNORECASE)
-        text = re.sub(r'\$\s*(\d+(?:[.,]\d+)?)', r'\1 đô la', text)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*\$', r'\1 đô la', text)
+        text = self._re_decimal_currency.sub(decimal_currency, text)
+        for pattern, repl in self._currency_rules:
+            text = pattern.sub(repl, text)
         return text
     
     def _normalize_percentage(self, text):
         """Convert percentage to words."""
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*%', r'\1 phần trăm', text)
+        text = self._re_percentage.sub(r'\1 phần trăm', text)
         return text
     
     def _normalize_units(self, text):
@@ -132,20 +234,16 @@ class VietnameseTTSNormalizer:
             full_unit2 = self.units.get(unit2, unit2)
             return f"{full_unit1} trên {full_unit2}"
         
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b', 
-                     expand_compound_with_number, text)
-        text = re.sub(r'\b([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b', 
-                     expand_compound_without_number, text)
-        
-        sorted_units = sorted(self.units.items(), key=lambda x: len(x[0]), reverse=True)
-        for unit, full_name in sorted_units:
-            pattern = r'(\d+(?:[.,]\d+)?)\s*' + re.escape(unit) + r'\b'
-            text = re.sub(pattern, rf'\1 {full_name}', text, flags=re.IGNORECASE)
+        text = self._re_compound_unit_number.sub(expand_compound_with_number, text)
+        text = self._re_compound_unit.sub(expand_compound_without_number, text)
         
-        for unit, full_name in sorted_units:
-            if any(c in unit for c in '²³°'):
-                pattern = r'\b' + re.escape(unit) + r'\b'
-                text = re.sub(pattern, full_name, text, flags=re.IGNORECASE)
+        # If no single pass matches the current text, none of them changes it
+        if self._re_any_unit.search(text):
+            for pattern, repl in self._unit_rules:
+                text = pattern.sub(repl, text)
+        if self._re_any_symbol_unit.search(text):
+            for pattern, repl in self._symbol_unit_rules:
+                text = pattern.sub(repl, text)
         
         return text
     
@@ -192,10 +290,8 @@ class VietnameseTTSNormalizer:
                 
                 return f"{hour} giờ"
         
-        text = re.sub(r'(\d{1,2}):(\d{2}):(\d{2})', validate_and_convert_time, text)
-        text = re.sub(r'(\d{1,2}):(\d{2})', validate_and_convert_time, text)
-        text = re.sub(r'(\d{1,2})h(\d{2})', validate_and_convert_time, text)
-        text = re.sub(r'(\d{1,2})h\b', validate_and_convert_time, text)
+        for pattern in self._time_patterns:
+            text = pattern.sub(validate_and_convert_time, text)
         
         return text
     
@@ -232,13 +328,11 @@ class VietnameseTTSNormalizer:
                 return f"ngày {day} tháng {month} năm {full_year}"
             return match.group(0)
         
-        text = re.sub(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b', 
-                    lambda m: date_to_text(m).replace('ngày ngày', 'ngày'), text)
-        text = re.sub(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b', 
-                    lambda m: date_short_year(m).replace('ngày ngày', 'ngày'), text)
-        text = re.sub(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b', date_iso_to_text, text)
-        text = re.sub(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b', date_to_text, text)
-        text = re.sub(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b', date_short_year, text)
+        text = self._re_date_prefixed.sub(lambda m: date_to_text(m).replace('ngày ngày', 'ngày'), text)
+        text = self._re_date_prefixed_short.sub(lambda m: date_short_year(m).replace('ngày ngày', 'ngày'), text)
+        text = self._re_date_iso.sub(date_iso_to_text, text)
+        text = self._re_date.sub(date_to_text, text)
+        text = self._re_date_short.sub(date_short_year, text)
         
         return text
     
@@ -246,7 +340,7 @@ class VietnameseTTSNormalizer:
         """Convert phone numbers to digit-by-digit reading."""
         def phone_to_text(match):
             phone = match.group(0)
-            phone = re.sub(r'[^\d]', '', phone)
+            phone = self._re_non_digit.sub('', phone)
             
             if phone.startswith('84') and len(phone) >= 10:
                 phone = '0' + phone[2:]
@@ -257,8 +351,8 @@ class VietnameseTTSNormalizer:
             
             return match.group(0)
         
-        text = re.sub(r'(\+84|84)[\s\-\.]?\d[\d\s\-\.]{7,}', phone_to_text, text)
-        text = re.sub(r'\b0\d[\d\s\-\.]{8,}', phone_to_text, text)
+        for pattern in self._phone_patterns:
+            text = pattern.sub(phone_to_text, text)
         return text
     
     def _normalize_versions(self, text):
@@ -272,12 +366,12 @@ class VietnameseTTSNormalizer:
         
         # Match sequences of numbers separated by dots (at least 2 dots to be sure it's a version)
         # e.g., 1.0.4, 17.21.1, 192.168.1.1
-        text = re.sub(r'\b\d+(?:\.\d+){1,}\b', version_to_text, text)
+        text = self._re_version.sub(version_to_text, text)
         return text
     
     def _normalize_numbers(self, text):
-        text = re.sub(r'(\d+(?:[,.]\d+)?)%', lambda m: f'{m.group(1)} phần trăm', text)
-        text = re.sub(r'(\d{1,3})(?:\.(\d{3}))+', lambda m: m.group(0).replace('.', ''), text)
+        text = self._re_number_percentage.sub(lambda m: f'{m.group(1)} phần trăm', text)
+        text = self._re_thousands.sub(lambda m: m.group(0).replace('.', ''), text)
     
         def decimal_to_words(match):
             whole = match.group(1)
@@ -286,8 +380,8 @@ class VietnameseTTSNormalizer:
             separator = 'phẩy' if ',' in match.group(0) else 'chấm'
             return f"{whole} {separator} {decimal_words}"
         
-        text = re.sub(r'(\d+),(\d+)', decimal_to_words, text)
-        text = re.sub(r'(\d+)\.(\d{1,2})\b', decimal_to_words, text)
+        text = self._re_decimal_comma.sub(decimal_to_words, text)
+        text = self._re_decimal_dot.sub(decimal_to_words, text)
         
         return text
     
@@ -377,7 +471,7 @@ class VietnameseTTSNormalizer:
             num = int(match.group(0))
             return self._convert_number_to_words(num)
         
-        text = re.sub(r'\b\d+\b', convert_number, text)
+        text = self._re_integer.sub(convert_number, text)
         return text
     
     def _normalize_special_chars(self, text):
@@ -394,33 +488,14 @@ class VietnameseTTSNormalizer:
         text = text.replace('+', ' cộng ')
         text = text.replace('=', ' bằng ')
         text = text.replace('#', ' thăng ')
-        # Handle parentheses/brackets as natural pauses: (text) -> , text ,
-        text = re.sub(r'[\(\[\{]\s*(.*?)\s*[\)\]\}]', r', \1, ', text)
-        
-        # Remaining individual brackets or parens
-        text = re.sub(r'[\[\]\(\)\{\}]', ' ', text)
-        
-        # Paired dashes (like parentheses): - text - -> , text ,
-        text = re.sub(r'(?:\s+|^)[-–—]\s*(.*?)\s*[-–—](?:\s+|$)', r', \1 , ', text)
-        
-        # Single dashes used as punctuation (with spaces) -> comma
-        text = re.sub(r'\s+[-–—]+\s+', ', ', text)
-        
-        # Dashes at the start of a line (bullet points) -> comma
-        text = re.sub(r'^[-–—]+\s+', ', ', text)
-        
-        # Collapse multiple commas and surrounding spaces (remove spaces before AND after commas)
-        text = re.sub(r'\s*,\s*', ', ', text)
-        text = re.sub(r',\s*,+', ',', text)  # Remove duplicate commas
         
-        text = re.sub(r'\.{2,}', ' ', text)
-        text = re.sub(r'\s+\.\s+', ' ', text)
-        text = re.sub(r'[^\w\sàáảãạăắằẳẵặâấầẩẫậèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ.,!?;:@%_]', ' ', text)
+        for pattern, repl in self._special_char_rules:
+            text = pattern.sub(repl, text)
         return text
     
     def _normalize_whitespace(self, text):
         """Normalize whitespace."""
-        text = re.sub(r'\s+', ' ', text)
+        text = self._re_whitespace.sub(' ', text)
         text = text.strip()
         return text
 
@@ -3,6 +3,9 @@ import json
 import platform
 import glob
 import re
+import atexit
+import threading
+from collections.abc import MutableMapping
 from phonemizer import phonemize
 from phonemizer.backend.espeak.espeak import EspeakWrapper
 from vieneu_utils.normalize_text import VietnameseTTSNormalizer
@@ -12,6 +15,11 @@ PHONEME_DICT_PATH = os.getenv(
     'PHONEME_DICT_PATH',
     os.path.join(os.path.dirname(__file__), "phoneme_dict.json")
 )
+# Words phonemised by espeak at runtime are appended here (word<TAB>phonemes per line)
+PHONEME_CACHE_PATH = os.getenv(
+    'PHONEME_CACHE_PATH',
+    os.path.join(os.path.dirname(PHONEME_DICT_PATH), "phoneme_cache.tsv")
+)
 
 def load_phoneme_dict(path=PHONEME_DICT_PATH):
     """Load phoneme dictionary from JSON file."""
@@ -24,6 +32,118 @@ def load_phoneme_dict(path=PHONEME_DICT_PATH):
             "Please create it or set PHONEME_DICT_PATH environment variable."
         )
 
+class PhonemeCache(MutableMapping):
+    """
+    Persistent word -> phoneme dictionary.
+
+    The base JSON dictionary and the runtime cache file are only read on first use,
+    not at import. Entries added after espeak fallbacks are written back to the cache
+    file in batches of `flush_every` (and at exit), so restarts do not pay the espeak
+    cost again. Lookup/espeak counters are available through stats().
+    """
+
+    def __init__(self, path=PHONEME_DICT_PATH, cache_path=PHONEME_CACHE_PATH, flush_every=64):
+        self.path = path
+        self.cache_path = cache_path
+        self.flush_every = flush_every
+        self._data = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.espeak_calls = 0
+        self.espeak_words = 0
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._load()
+        return self._data
+
+    def _load(self) -> dict:
+        try:
+            data = load_phoneme_dict(self.path)
+        except Exception as e:
+            print(f"Initialization error: {e}")
+            data = {}
+
+        if self.cache_path and os.path.exists(self.cache_path):
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    word, sep, phoneme = line.rstrip("\n").partition("\t")
+                    if sep:
+                        data[word] = phoneme
+        return data
+
+    def __getitem__(self, word):
+        return self.data[word]
+
+    def __contains__(self, word):
+        return word in self.data
+
+    def __setitem__(self, word, phoneme):
+        data = self.data
+        if data.get(word) == phoneme:
+            return
+        data[word] = phoneme
+        with self._lock:
+            self._pending[word] = phoneme
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def __delitem__(self, word):
+        del self.data[word]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def flush(self):
+        """Append pending espeak results to the cache file."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "a", encoding="utf-8") as f:
+                f.writelines(
+                    f"{word}\t{phoneme}\n" for word, phoneme in pending.items()
+                    if "\t" not in word + phoneme and "\n" not in word + phoneme
+                )
+        except OSError as e:
+            print(f"Warning: Could not write phoneme cache {self.cache_path}: {e}")
+            self.cache_path = None
+
+    def record(self, hits=0, misses=0, espeak_words=0):
+        """Update lookup counters (called by the phonemize functions)."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            if espeak_words:
+                self.espeak_calls += 1
+                self.espeak_words += espeak_words
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data) if self._data is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "espeak_calls": self.espeak_calls,
+            "espeak_words": self.espeak_words,
+            "pending_writes": len(self._pending),
+        }
+
+def _record_lookups(phoneme_dict, hits=0, misses=0, espeak_words=0):
+    if isinstance(phoneme_dict, PhonemeCache):
+        phoneme_dict.record(hits, misses, espeak_words)
+
 def setup_espeak_library():
     """Configure eSpeak library path based on operating system."""
     system = platform.system()
@@ -85,14 +205,14 @@ def _setup_macos_espeak():
 # Initialize
 setup_espeak_library()
 
-try:
-    phoneme_dict = load_phoneme_dict()
-    normalizer = VietnameseTTSNormalizer()
-except Exception as e:
-    print(f"Initialization error: {e}")
-    # We still need normalizer to function
-    normalizer = VietnameseTTSNormalizer()
-    phoneme_dict = {}
+# Loaded lazily on first lookup; new espeak entries are persisted to PHONEME_CACHE_PATH
+phoneme_dict = PhonemeCache()
+atexit.register(phoneme_dict.flush)
+normalizer = VietnameseTTSNormalizer()
+
+def phoneme_cache_stats() -> dict:
+    """Hit-rate and espeak usage counters of the shared phoneme dictionary."""
+    return phoneme_dict.stats()
 
 def phonemize_text(text: str) -> str:
     """
@@ -126,6 +246,7 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict) -> str:
     vi_word_maps = []
     
     processed_parts = []
+    hits = 0
     
     for part_idx, part in enumerate(parts):
         if re.match(r'<en>.*</en>', part, re.IGNORECASE):
@@ -146,6 +267,7 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict) -> str:
                 if not core:
                     processed_words.append(word)
                 elif core in phoneme_dict:
+                    hits += 1
                     processed_words.append(f"{pre}{phoneme_dict[core]}{suf}")
                 else:
                     vi_texts.append(word)
@@ -155,6 +277,8 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict) -> str:
             
             processed_parts.append(processed_words)
     
+    _record_lookups(phoneme_dict, hits=hits, misses=len(vi_texts), espeak_words=len(vi_texts))
+    
     if en_texts:
         try:
             en_phonemes = phonemize(
@@ -241,6 +365,7 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict) -> list:
     all_vi_maps = []
     
     results = []
+    hits = 0
     
     for text_idx, text in enumerate(normalized_texts):
         parts = re.split(r'(<en>.*?</en>)', text, flags=re.IGNORECASE)
@@ -263,6 +388,7 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict) -> list:
                     if not core:
                         processed_words.append(word)
                     elif core in phoneme_dict:
+                        hits += 1
                         processed_words.append(f"{pre}{phoneme_dict[core]}{suf}")
                     else:
                         all_vi_texts.append(word)
@@ -273,6 +399,8 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict) -> list:
         
         results.append(processed_parts)
     
+    _record_lookups(phoneme_dict, hits=hits, misses=len(all_vi_texts), espeak_words=len(all_vi_texts))
+    
     if all_en_texts:
         try:
             en_phonemes = phonemize(
@@ -291,6 +419,9 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict) -> list:
                 results[text_idx][part_idx] = phoneme.strip()
         except Exception as e:
             print(f"Warning: Batch EN phonemization failed: {e}")
+            # Keep the raw text, as phonemize_with_dict does: callers memoise the result
+            for (text_idx, part_idx), en_text in zip(all_en_maps, all_en_texts):
+                results[text_idx][part_idx] = en_text
     
     if all_vi_texts:
         try:
@@ -317,6 +448,8 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict) -> list:
                 results[text_idx][part_idx][word_idx] = phoneme
         except Exception as e:
             print(f"Warning: Batch VI phonemization failed: {e}")
+            for (text_idx, part_idx, word_idx), word in zip(all_vi_maps, all_vi_texts):
+                results[text_idx][part_idx][word_idx] = word
     
     final_results = []
     for processed_parts in results:
@@ -42,9 +42,17 @@ def create_app():
     from app.controllers.main import main_bp
     from app.controllers.presentation import presentation_bp
     from app.controllers.generation import generation_bp
+    from app.controllers.media import media_bp
+    from app.controllers.health import health_bp
+    from app.services import lifecycle
     
     app.register_blueprint(main_bp)
     app.register_blueprint(presentation_bp)
     app.register_blueprint(generation_bp)
+    # Generated audio/videos/results (ranges, ETags, caching); takes precedence over /static/<path>
+    app.register_blueprint(media_bp)
+    # Liveness/readiness probes and in-flight request tracking for draining
+    app.register_blueprint(health_bp)
+    lifecycle.init_app(app)
     
     return app
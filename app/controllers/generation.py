@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app, url_for
+from flask import Blueprint, request, jsonify, current_app, url_for, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import os
 from app.services.video_generator import VideoGenerationService
@@ -116,6 +116,48 @@ def api_generate_video():
         }), 500
 
 
+@generation_bp.route('/api/generate-tts/stream', methods=['GET', 'POST'])
+def api_generate_tts_stream():
+    """
+    Streaming variant of /api/generate-tts (preset voices only)
+    
+    Parameters (query string or form data):
+        - text: Text to synthesize
+        - voice: Voice ID (optional, default voice if omitted)
+    
+    Returns:
+        WAV audio sent with chunked transfer encoding as it is synthesised.
+        The finished stream is cached and reused for the same text and voice.
+    """
+    from app.services.audio_service import get_audio_service
+    
+    text = request.values.get('text', '').strip()
+    voice_id = request.values.get('voice')
+    if voice_id in ('', 'default'):
+        voice_id = None
+    
+    if not text:
+        return jsonify({'success': False, 'error': 'No text provided'}), 400
+    
+    print(f"[TTS stream] Voice: {voice_id or 'default'}, Text length: {len(text)}")
+    try:
+        audio_service = get_audio_service()
+        cache_path = audio_service.get_stream_cache_path(text, voice_id, current_app.static_folder)
+        
+        # Errors before the first audio chunk still get a JSON error response
+        chunks = audio_service.start_stream(audio_service.stream_audio(text, cache_path, voice_id=voice_id))
+        return Response(
+            stream_with_context(chunks),
+            mimetype='audio/wav',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+
 @generation_bp.route('/api/generate-tts', methods=['POST'])
 def api_generate_tts():
     """
@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+from app.services import lifecycle
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route('/healthz')
+def liveness():
+    """Liveness: the process answers requests (models may still be loading)"""
+    return jsonify({'status': 'alive', **lifecycle.status()})
+
+
+@health_bp.route('/readyz')
+def readiness():
+    """Readiness: models are warm and the worker is not draining"""
+    state = lifecycle.status()
+    if not lifecycle.is_ready():
+        return jsonify({'status': 'draining' if state['draining'] else 'starting', **state}), 503
+    return jsonify({'status': 'ready', **state})
@@ -0,0 +1,62 @@
+from flask import Blueprint, current_app, abort, send_file
+from werkzeug.security import safe_join
+from functools import lru_cache
+import hashlib
+import os
+import re
+
+media_bp = Blueprint('media', __name__)
+
+# Files whose name carries a uuid4().hex / content hash never change once written
+CONTENT_ADDRESSED = re.compile(r'(?:^|[/_.-])[0-9a-f]{32,}(?=[/_.-]|$)')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+@lru_cache(maxsize=4096)
+def _content_etag(path, size, mtime_ns):
+    """SHA-256 of the file, computed once per (path, size, mtime)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def send_media(folder, filename):
+    """
+    Serve a generated file with byte ranges (206), a strong content ETag and 304
+    answers to conditional requests. The body goes through wsgi.file_wrapper
+    (sendfile under gunicorn) or X-Sendfile when USE_X_SENDFILE is set.
+    """
+    root = os.path.join(current_app.static_folder, folder)
+    path = safe_join(root, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    stat = os.stat(path)
+    etag = _content_etag(path, stat.st_size, stat.st_mtime_ns)
+
+    if CONTENT_ADDRESSED.search(filename):
+        response = send_file(path, conditional=True, etag=etag, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        # Same URL may be regenerated (slide_1.wav, presentation_<id>.mp4): always revalidate
+        response = send_file(path, conditional=True, etag=etag, max_age=0)
+        response.cache_control.no_cache = True
+    return response
+
+
+@media_bp.route('/static/audio/<path:filename>')
+def audio(filename):
+    return send_media('audio', filename)
+
+
+@media_bp.route('/static/videos/<path:filename>')
+def videos(filename):
+    return send_media('videos', filename)
+
+
+@media_bp.route('/static/results/<path:filename>')
+def results(filename):
+    return send_media('results', filename)
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import os
 import uuid
@@ -8,6 +8,7 @@ from app.services.gemini import get_gemini_service
 from app.services.audio_service import get_audio_service
 from app.services.video_generator import VideoGenerationService
 from app.services.presentation_video_exporter import PresentationVideoExporter
+from app.services.video_packager import VideoPackager
 
 presentation_bp = Blueprint('presentation', __name__, url_prefix='/api')
 
@@ -19,6 +20,14 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def package_video(video_path, video_url):
+    """Streaming variants (faststart MP4, HLS) of a finished video, as {format: url}"""
+    packager = VideoPackager()
+    if not packager.enabled:
+        return {}
+    return packager.package(video_path, video_url)['manifests']
+
+
 @presentation_bp.route('/upload-presentation', methods=['POST'])
 def upload_presentation():
     """Upload PPT/PDF file and parse content"""
@@ -362,6 +371,32 @@ def preview_voice():
         print(f"Error previewing voice: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@presentation_bp.route('/preview-voice/stream', methods=['GET', 'POST'])
+def preview_voice_stream():
+    """Stream a short preview with the selected voice while it is being synthesised
+    
+    Sends a WAV stream (chunked transfer) that an <audio> element can play right away;
+    the same bytes are cached so a repeated preview is served from disk.
+    """
+    try:
+        data = request.get_json(silent=True) or request.values
+        text = (data.get('text') or 'Xin chào, đây là giọng nói mẫu.')[:100]
+        voice_id = data.get('voice_id')
+        
+        audio_service = get_audio_service()
+        cache_path = audio_service.get_stream_cache_path(text, voice_id, current_app.static_folder)
+        
+        # Errors before the first audio chunk still get a JSON error response
+        chunks = audio_service.start_stream(audio_service.stream_audio(text, cache_path, voice_id=voice_id))
+        return Response(
+            stream_with_context(chunks),
+            mimetype='audio/wav',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        print(f"Error streaming voice preview: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @presentation_bp.route('/presentation/<pres_id>/generate_audio', methods=['POST'])
 def generate_audio(pres_id):
     """Generate audio files for all slides in a presentation"""
@@ -392,10 +427,22 @@ def generate_audio(pres_id):
         results = []
         success_count = 0
         
+        # Phonemise all slides up front so each slide's synthesis skips espeak
+        slide_texts = [slide.get('edited_text') or slide.get('generated_text') or slide.get('content', '') for slide in slides]
+        audio_service.prepare_texts(slide_texts, voice_id=voice_id)
+        
+        # Multi-worker engine: synthesise every slide in one batch, the loop only records results
+        batch_results = {}
+        if audio_service.can_generate_batch() and not clone_voice_path:
+            indices = [i for i, text in enumerate(slide_texts) if text.strip()]
+            paths = [audio_service.get_audio_file_path(pres_id, i, static_folder) for i in indices]
+            batch_results = dict(zip(indices, audio_service.generate_audio_batch(
+                [slide_texts[i] for i in indices], paths, voice_id=voice_id)))
+        
         for i, slide in enumerate(slides):
             try:
                 # Get the text to convert (edited_text takes priority over generated_text)
-                text_to_convert = slide.get('edited_text') or slide.get('generated_text') or slide.get('content', '')
+                text_to_convert = slide_texts[i]
                 
                 if not text_to_convert.strip():
                     results.append({
@@ -410,12 +457,15 @@ def generate_audio(pres_id):
                 audio_url = audio_service.get_audio_url(pres_id, i)
                 
                 # Generate audio
-                success, message = audio_service.generate_audio(
-                    text_to_convert, 
-                    audio_file_path,
-                    voice_id=voice_id,
-                    clone_voice_path=clone_voice_path
-                )
+                if i in batch_results:
+                    success, message = batch_results[i]
+                else:
+                    success, message = audio_service.generate_audio(
+                        text_to_convert, 
+                        audio_file_path,
+                        voice_id=voice_id,
+                        clone_voice_path=clone_voice_path
+                    )
                 
                 if success:
                     # Update slide with audio URL
@@ -813,11 +863,13 @@ def export_presentation_video(pres_id):
         
         if result['success']:
             video_url = f'/static/videos/{pres_id}/{output_filename}'
+            manifests = package_video(output_path, video_url)
             
             # Update presentation model
             current_app.presentation_model.update(pres_id, {
                 'presentation_video_url': video_url,
-                'presentation_video_path': output_path
+                'presentation_video_path': output_path,
+                'presentation_video_manifests': manifests
             })
             
             print(f"✅ Presentation video exported: {video_url}")
@@ -830,6 +882,7 @@ def export_presentation_video(pres_id):
             return jsonify({
                 'success': True,
                 'video_url': video_url,
+                'manifests': manifests,
                 'message': message,
                 'slides_used': len(slides_with_audio),
                 'slides_skipped': len(skipped_slides)
@@ -1127,13 +1180,16 @@ def generate_final_video_v2(pres_id):
         # If NO Talking Head, we are done
         if not use_talking_head:
             video_url = f'/static/videos/{pres_id}/{base_filename}'
+            manifests = package_video(base_output_path, video_url)
             current_app.presentation_model.update(pres_id, {
                 'final_video_url': video_url,
-                'final_video_path': base_output_path
+                'final_video_path': base_output_path,
+                'final_video_manifests': manifests
             })
             return jsonify({
                 'success': True,
                 'video_url': video_url,
+                'manifests': manifests,
                 'message': 'Đã tạo video thành công (Không có MC ảo)!'
             })
 
@@ -1216,13 +1272,16 @@ def generate_final_video_v2(pres_id):
         
         if overlay_result['success']:
             video_url = f'/static/videos/{pres_id}/{final_filename}'
+            manifests = package_video(final_output_path, video_url)
             current_app.presentation_model.update(pres_id, {
                 'final_video_url': video_url,
-                'final_video_path': final_output_path
+                'final_video_path': final_output_path,
+                'final_video_manifests': manifests
             })
             return jsonify({
                 'success': True, 
                 'video_url': video_url,
+                'manifests': manifests,
                 'message': 'Đã tạo video thành công (Kèm MC ảo)!'
             })
         else:
@@ -5,26 +5,39 @@ This service provides audio generation capabilities with VieNeu-TTS as primary o
 and gTTS as fallback for stability.
 """
 
+import asyncio
+import hashlib
 import os
+import struct
 import sys
+import threading
+import time
 import traceback
 import uuid
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Generator, Optional, Tuple
 
-# Language detection
-try:
-    from langdetect import detect, DetectorFactory
-    # Set seed for consistent results
-    DetectorFactory.seed = 0
-    LANGDETECT_AVAILABLE = True
-    print("✅ langdetect available for advanced language detection")
-except ImportError:
-    LANGDETECT_AVAILABLE = False
-    print("ℹ️  langdetect not available - using fallback language detection")
-except Exception as e:
-    LANGDETECT_AVAILABLE = False
-    print(f"ℹ️  langdetect error: {e} - using fallback detection")
+# Language detection (langdetect is imported on the first detect_language call, off the startup path)
+LANGDETECT_AVAILABLE = None
+detect = None
+
+def _load_langdetect() -> bool:
+    global LANGDETECT_AVAILABLE, detect
+    if LANGDETECT_AVAILABLE is None:
+        try:
+            from langdetect import detect as _detect, DetectorFactory
+            # Set seed for consistent results
+            DetectorFactory.seed = 0
+            detect = _detect
+            LANGDETECT_AVAILABLE = True
+            print("✅ langdetect available for advanced language detection")
+        except ImportError:
+            LANGDETECT_AVAILABLE = False
+            print("ℹ️  langdetect not available - using fallback language detection")
+        except Exception as e:
+            LANGDETECT_AVAILABLE = False
+            print(f"ℹ️  langdetect error: {e} - using fallback detection")
+    return LANGDETECT_AVAILABLE
 
 # Add VieNeu-TTS to path for imports
 vieneu_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'VieNeu-TTS')
@@ -55,6 +68,14 @@ class AudioService:
     def __init__(self, force_gtts=False):
         self.vieneu_engine = None
         self.vieneu_available = False
+        self.vieneu_parallel = False  # engine synthesises several slides at once (generate_audio_batch)
+        self.vieneu_remote = False
+        self.remote_concurrency = int(os.environ.get('VIENEU_REMOTE_CONCURRENCY') or 16)
+        
+        # Event loop thread + aiohttp session for the remote engine, kept alive between batches
+        self._async_lock = threading.Lock()
+        self._async_loop = None
+        self._http_session = None
         self.preferred_voice = None
         self.force_gtts = force_gtts
         
@@ -85,7 +106,30 @@ class AudioService:
             # Try to initialize quickly
             try:
                 print("  🔧 Quick VieNeu initialization...")
-                self.vieneu_engine = Vieneu()
+                token_chunking = os.environ.get('VIENEU_TOKEN_CHUNKING', '').lower() in ('1', 'true', 'yes')
+                vieneu_kwargs = {'token_chunking': token_chunking}
+                if os.environ.get('VIENEU_CODEC_REPO'):
+                    vieneu_kwargs['codec_repo'] = os.environ['VIENEU_CODEC_REPO']
+                
+                workers = int(os.environ.get('VIENEU_WORKERS') or 0)
+                if os.environ.get('VIENEU_MODE', '').lower() == 'remote':
+                    # Backbone on an LMDeploy server, only the codec runs here
+                    vieneu_kwargs.pop('token_chunking')
+                    vieneu_kwargs['api_base'] = os.environ.get('VIENEU_API_BASE', 'http://localhost:23333/v1')
+                    if os.environ.get('VIENEU_MODEL_NAME'):
+                        vieneu_kwargs['model_name'] = os.environ['VIENEU_MODEL_NAME']
+                    self.vieneu_engine = Vieneu(mode='remote', **vieneu_kwargs)
+                    self.vieneu_remote = True
+                    self.vieneu_parallel = True
+                elif workers > 1:
+                    # GGUF engines in worker processes, chunks spread over all CPU cores
+                    from vieneu.process_pool import VieNeuProcessPool
+                    threads = int(os.environ.get('VIENEU_THREADS_PER_WORKER') or 0) or None
+                    vieneu_kwargs.pop('token_chunking')
+                    self.vieneu_engine = VieNeuProcessPool(num_workers=workers, threads_per_worker=threads, **vieneu_kwargs)
+                    self.vieneu_parallel = True
+                else:
+                    self.vieneu_engine = Vieneu(**vieneu_kwargs)
                 
                 # Get available voices quickly
                 available_voices = self.vieneu_engine.list_preset_voices()
@@ -111,7 +155,7 @@ class AudioService:
             return 'vi'  # Default to Vietnamese
         
         try:
-            if LANGDETECT_AVAILABLE:
+            if _load_langdetect():
                 detected = detect(text)
                 print(f"  🔍 Detected language: {detected}")
                 
@@ -227,6 +271,9 @@ class AudioService:
             self.vieneu_engine.save(audio_spec, output_path)
             
             print(f"✅ VieNeu-TTS audio saved to: {output_path}")
+            stats = self.get_phoneme_cache_stats()
+            if stats.get('hit_rate') is not None:
+                print(f"  📖 Phoneme cache hit rate: {stats['hit_rate']:.1%} ({stats['espeak_calls']} espeak calls)")
             return True
             
         except Exception as e:
@@ -234,6 +281,123 @@ class AudioService:
             traceback.print_exc()
             return False
     
+    def can_generate_batch(self) -> bool:
+        """True when generate_audio_batch is faster than calling generate_audio per slide"""
+        return self.vieneu_available and self.vieneu_parallel and not self.force_gtts
+    
+    def generate_audio_batch(self, texts: list, output_paths: list, voice_id: str = None) -> list:
+        """Generate the audio of several slides with one call to the VieNeu engine
+        
+        All Vietnamese slides are queued together, so the process pool keeps every worker
+        busy across slide boundaries. Other languages and failed batches go through
+        generate_audio one by one.
+        
+        Args:
+            texts: Slide texts
+            output_paths: WAV path for each text
+            voice_id: Optional preset voice ID for VieNeu-TTS
+            
+        Returns:
+            List of (success: bool, message: str), in the order of texts
+        """
+        results = [None] * len(texts)
+        clean_texts = [self._clean_text_for_tts(text) for text in texts]
+        vi_indices = []
+        for i, clean_text in enumerate(clean_texts):
+            if not clean_text.strip():
+                results[i] = (False, "No valid text provided")
+            elif self.can_generate_batch() and self.should_use_vieneu(self.detect_language(clean_text)):
+                vi_indices.append(i)
+        
+        if vi_indices:
+            try:
+                voice = self.vieneu_engine.get_preset_voice(voice_id) if voice_id else self.preferred_voice
+                vi_texts = [clean_texts[i] for i in vi_indices]
+                print(f"🎧 Generating {len(vi_indices)} slides with VieNeu-TTS in one batch...")
+                if self.vieneu_remote:
+                    wavs = self._run_async(self._infer_remote_batch(vi_texts, voice))
+                else:
+                    wavs = self.vieneu_engine.infer_batch(vi_texts, voice=voice)
+                for i, wav in zip(vi_indices, wavs):
+                    if isinstance(wav, BaseException):
+                        # Left to the per-slide fallback below
+                        print(f"  ⚠️ Slide text {i} failed in batch: {wav}")
+                        continue
+                    os.makedirs(os.path.dirname(output_paths[i]), exist_ok=True)
+                    self.vieneu_engine.save(wav, output_paths[i])
+                    results[i] = (True, "Generated using VieNeu-TTS (vi, batch)")
+            except Exception as e:
+                print(f"⚠️  Batch generation failed, falling back to per-slide: {e}")
+                traceback.print_exc()
+        
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self.generate_audio(texts[i], output_paths[i], voice_id=voice_id)
+        return results
+    
+    def _run_async(self, coro):
+        """Run a coroutine on the service's event loop thread and wait for the result"""
+        with self._async_lock:
+            if self._async_loop is None:
+                self._async_loop = asyncio.new_event_loop()
+                threading.Thread(target=self._async_loop.run_forever, name='audio-service-loop', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._async_loop).result()
+    
+    async def _get_http_session(self):
+        """aiohttp session shared by all remote batches (keep-alive connection pool)"""
+        if self._http_session is None or self._http_session.closed:
+            import aiohttp
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.remote_concurrency, keepalive_timeout=60)
+            )
+        return self._http_session
+    
+    async def _infer_remote_batch(self, texts: list, voice: dict = None) -> list:
+        """All chunks of all texts through RemoteVieNeuTTS.infer_batch_async; failed texts come back as exceptions"""
+        session = await self._get_http_session()
+        return await self.vieneu_engine.infer_batch_async(
+            texts, voice=voice, concurrency_limit=self.remote_concurrency,
+            session=session, return_exceptions=True
+        )
+    
+    def prepare_texts(self, texts: list, voice_id: str = None) -> int:
+        """Phonemise the Vietnamese texts of a whole presentation in one espeak batch
+        
+        Args:
+            texts: Slide texts that will be passed to generate_audio afterwards
+            voice_id: Preset voice ID whose reference text should be prepared too
+            
+        Returns:
+            Number of newly phonemised chunks (0 if VieNeu-TTS is not used)
+        """
+        if not self.vieneu_available or not hasattr(self.vieneu_engine, 'prepare_phonemes'):
+            return 0
+        
+        try:
+            clean_texts = [self._clean_text_for_tts(text) for text in texts if text and text.strip()]
+            vi_texts = [text for text in clean_texts if text.strip() and self.should_use_vieneu(self.detect_language(text))]
+            if not vi_texts:
+                return 0
+            
+            voice = self.vieneu_engine.get_preset_voice(voice_id) if voice_id else self.preferred_voice
+            count = self.vieneu_engine.prepare_phonemes(vi_texts, voice=voice)
+            print(f"📖 Phonemised {count} chunks of {len(vi_texts)} slides in one batch")
+            return count
+        except Exception as e:
+            print(f"⚠️  Batch phonemisation failed, falling back to per-slide: {e}")
+            return 0
+    
+    def get_phoneme_cache_stats(self) -> dict:
+        """Hit rate of the persistent phoneme dictionary and espeak usage since startup"""
+        if not self.vieneu_available:
+            return {}
+        try:
+            from vieneu_utils.phonemize_text import phoneme_cache_stats
+            return phoneme_cache_stats()
+        except Exception as e:
+            print(f"Error getting phoneme cache stats: {e}")
+            return {}
+    
     def _generate_with_gtts(self, text: str, output_path: str, language: str = 'vi') -> bool:
         """Generate audio using gTTS (Google Text-to-Speech) with language support"""
         try:
@@ -355,6 +519,163 @@ class AudioService:
             traceback.print_exc()
             return False, error_msg
     
+    def get_stream_cache_path(self, text: str, voice_id: str, static_folder: str) -> str:
+        """Cache file of a streamed utterance (same text + voice -> same file)"""
+        key = hashlib.sha1(f"{voice_id or ''}\n{text}".encode('utf-8')).hexdigest()
+        return os.path.join(static_folder, 'temp', 'tts_stream', f"{key}.wav")
+    
+    @staticmethod
+    def _wav_header(sample_rate: int, data_size: int = 0xFFFFFFFF - 36) -> bytes:
+        """PCM16 mono WAV header; the default sizes mark a stream of unknown length"""
+        return (b'RIFF' + struct.pack('<I', min(data_size + 36, 0xFFFFFFFF)) + b'WAVE'
+                + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+                + b'data' + struct.pack('<I', data_size))
+    
+    def stream_audio(self, text: str, cache_path: str, voice_id: str = None) -> Generator[bytes, None, None]:
+        """
+        Yield a WAV byte stream while VieNeu-TTS synthesises the text, writing the same
+        bytes to cache_path. The cache file only appears (with correct WAV sizes) once
+        the stream completes. Non-Vietnamese text or an unavailable VieNeu engine falls
+        back to generate_audio and streams the finished file.
+        
+        Nothing is yielded before the first audio is ready, so a caller that pulls the
+        first chunk inside its own try block (see start_stream) still sees setup and
+        synthesis errors.
+        """
+        if os.path.exists(cache_path):
+            try:
+                # Mark as recently played: the cache is pruned least-recently-used first
+                os.utime(cache_path)
+            except OSError:
+                pass
+            yield from self._stream_file(cache_path)
+            return
+        
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        clean_text = self._clean_text_for_tts(text)
+        if not clean_text.strip():
+            return
+        
+        # Written under a unique name and renamed when complete: a failed or concurrent
+        # synthesis never leaves a truncated file where later requests would serve it
+        part_path = f"{cache_path}.{uuid.uuid4().hex}.part.wav"
+        
+        if not self.should_use_vieneu(self.detect_language(clean_text)):
+            try:
+                success, message = self.generate_audio(clean_text, part_path, voice_id=voice_id)
+                if not success:
+                    raise RuntimeError(message)
+                os.replace(part_path, cache_path)
+            finally:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            self._prune_stream_cache(os.path.dirname(cache_path))
+            yield from self._stream_file(cache_path)
+            return
+        
+        voice = self.preferred_voice
+        if voice_id:
+            try:
+                voice = self.vieneu_engine.get_preset_voice(voice_id)
+            except Exception as e:
+                print(f"  ⚠️ Failed to get voice {voice_id}: {e}")
+        
+        import numpy as np
+        sample_rate = self.vieneu_engine.sample_rate
+        data_size = 0
+        completed = False
+        
+        print(f"🎧 Streaming audio with VieNeu-TTS...")
+        try:
+            with open(part_path, 'wb') as cache_file:
+                header = self._wav_header(sample_rate)
+                cache_file.write(header)
+                
+                stream = self.vieneu_engine.infer_stream(text=clean_text, voice=voice) if voice else self.vieneu_engine.infer_stream(text=clean_text)
+                for wav in stream:
+                    pcm = (np.clip(wav, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+                    cache_file.write(pcm)
+                    data_size += len(pcm)
+                    # The header goes out with the first chunk (see docstring)
+                    yield header + pcm if data_size == len(pcm) else pcm
+                if data_size == 0:
+                    yield header
+                
+                # Patch the real sizes into the cached copy
+                cache_file.seek(0)
+                cache_file.write(self._wav_header(sample_rate, data_size))
+            
+            os.replace(part_path, cache_path)
+            completed = True
+            print(f"✅ Streamed audio cached to: {cache_path}")
+            self._prune_stream_cache(os.path.dirname(cache_path))
+        finally:
+            # Client disconnected or synthesis failed: drop the partial file
+            if not completed and os.path.exists(part_path):
+                os.remove(part_path)
+    
+    @staticmethod
+    def start_stream(chunks: Generator[bytes, None, None]) -> Generator[bytes, None, None]:
+        """
+        Run a stream_audio generator up to its first chunk (raising its errors here, while
+        the route can still answer with an error status) and return the full stream.
+        """
+        first = next(chunks, b'')
+        
+        def resume():
+            try:
+                yield first
+                yield from chunks
+            finally:
+                # Client gone: stop synthesis and drop the partial cache file now
+                chunks.close()
+        
+        return resume()
+    
+    @staticmethod
+    def _prune_stream_cache(cache_dir: str, stale_part_seconds: int = 3600):
+        """
+        Keep the streamed TTS cache under TTS_STREAM_CACHE_MB (default 200): the least
+        recently played files are deleted first, as are .part.wav files left by a crash.
+        """
+        limit = int(float(os.environ.get('TTS_STREAM_CACHE_MB') or 200) * 1024 * 1024)
+        now = time.time()
+        entries, total = [], 0
+        try:
+            with os.scandir(cache_dir) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                        if entry.name.endswith('.part.wav'):
+                            if now - st.st_mtime > stale_part_seconds:
+                                os.remove(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError as e:
+            print(f"⚠️  Failed to prune the TTS stream cache: {e}")
+            return
+        
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _stream_file(path: str, block_size: int = 64 * 1024) -> Generator[bytes, None, None]:
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                yield block
+    
     def _clean_text_for_tts(self, text: str) -> str:
         """Clean and prepare text for TTS generation"""
         if not text:
@@ -432,9 +753,17 @@ class AudioService:
     def close(self):
         """Clean up resources"""
         try:
+            if self._async_loop is not None:
+                if self._http_session is not None:
+                    asyncio.run_coroutine_threadsafe(self._http_session.close(), self._async_loop).result(timeout=5)
+                self._async_loop.call_soon_threadsafe(self._async_loop.stop)
+                self._async_loop = None
             if self.vieneu_engine and hasattr(self.vieneu_engine, 'close'):
                 self.vieneu_engine.close()
                 print("🧹 VieNeu-TTS engine closed")
+            if self.vieneu_available:
+                from vieneu_utils.phonemize_text import phoneme_dict
+                phoneme_dict.flush()
         except Exception as e:
             print(f"⚠️  Error closing VieNeu engine: {e}")
 
@@ -1,4 +1,3 @@
-from app.services.gemini_service import GeminiService
 import os
 
 _gemini_service = None
@@ -8,6 +7,8 @@ def get_gemini_service():
     global _gemini_service
     if _gemini_service is None:
         try:
+            # google.genai is only imported once a script is actually requested
+            from app.services.gemini_service import GeminiService
             _gemini_service = GeminiService()
         except Exception as e:
             print(f"Warning: Could not initialize Gemini service: {e}")
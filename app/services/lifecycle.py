@@ -0,0 +1,135 @@
+"""
+Worker lifecycle: model warm-up, readiness and draining.
+
+Under gunicorn (gunicorn.conf.py) every worker calls warm_up() before it accepts
+connections, so the first user request never pays the model load. The state kept
+here backs the /healthz (liveness) and /readyz (readiness) endpoints.
+"""
+
+import os
+import threading
+import time
+import traceback
+
+# Paths that must not count as in-flight work (probes would keep a draining worker busy)
+PROBE_PATHS = ('/healthz', '/readyz')
+
+_ready = threading.Event()
+_draining = threading.Event()
+_inflight = 0
+_inflight_cond = threading.Condition()
+_status = {'pid': os.getpid(), 'tts': None, 'sadtalker': None, 'warmup_seconds': None}
+
+
+def init_app(app):
+    """Count in-flight requests so draining can wait for them."""
+
+    @app.before_request
+    def _begin_request():
+        global _inflight
+        from flask import request, g
+        if request.path in PROBE_PATHS:
+            return
+        g.lifecycle_tracked = True
+        with _inflight_cond:
+            _inflight += 1
+
+    @app.teardown_request
+    def _end_request(exc=None):
+        global _inflight
+        from flask import g
+        if not g.pop('lifecycle_tracked', False):
+            return
+        with _inflight_cond:
+            _inflight -= 1
+            _inflight_cond.notify_all()
+
+
+def check_sadtalker(prime_cache=False):
+    """
+    SadTalker runs as a subprocess per video, so there is nothing to keep loaded:
+    check that the checkpoints are present and optionally read them once so the
+    first inference loads them from the page cache instead of disk.
+    """
+    from download_models import ModelStore, SADTALKER_REPO, REQUIRED_MODELS, check_models_exist
+    store = ModelStore()
+    checkpoints_dir = store.repo_dir(SADTALKER_REPO)
+    if prime_cache:
+        # Checksum check against the store (size + mtime fast path, changed files are hashed)
+        ok, missing = store.verify(SADTALKER_REPO)
+    else:
+        # Existence only: cheap enough for the gunicorn master
+        ok, missing = check_models_exist(checkpoints_dir)
+    if ok and prime_cache:
+        for name in REQUIRED_MODELS:
+            with open(os.path.join(checkpoints_dir, name), 'rb') as f:
+                while f.read(16 * 1024 * 1024):
+                    pass
+    _status['sadtalker'] = 'ready' if ok else f"missing {', '.join(missing)}"
+    return ok
+
+
+def warm_up(synthesize=True):
+    """
+    Load the TTS engine (and start every process-pool worker) before serving.
+    A short synthesis also allocates the llama.cpp context and codec buffers.
+    """
+    from app.services.audio_service import get_audio_service
+    start = time.time()
+    _status['pid'] = os.getpid()
+    try:
+        service = get_audio_service()
+        engine = service.vieneu_engine
+        if engine is not None and hasattr(engine, 'warmup'):
+            engine.warmup()
+        if synthesize and service.vieneu_available and not service.vieneu_remote:
+            engine.infer("Xin chào.", voice=service.preferred_voice)
+        _status['tts'] = 'vieneu' if service.vieneu_available else 'gtts'
+    except Exception as e:
+        print(f"⚠️ TTS warm-up failed: {e}")
+        traceback.print_exc()
+        _status['tts'] = f'failed: {e}'
+
+    if _status['sadtalker'] is None:
+        check_sadtalker()
+
+    _status['warmup_seconds'] = round(time.time() - start, 1)
+    _ready.set()
+    print(f"🔥 Worker {os.getpid()} warmed up in {_status['warmup_seconds']}s (TTS: {_status['tts']})")
+
+
+def mark_ready():
+    """For servers without a warm-up hook (python run.py): ready as soon as the app exists."""
+    _ready.set()
+
+
+def begin_drain():
+    """Stop reporting ready; in-flight requests keep running."""
+    _draining.set()
+
+
+def wait_idle(timeout):
+    """Block until no request is in flight or timeout expires. Returns True when idle."""
+    deadline = time.time() + timeout
+    with _inflight_cond:
+        while _inflight > 0:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            _inflight_cond.wait(remaining)
+    return True
+
+
+def shutdown():
+    """Release engines (process pool, HTTP session) once the worker has drained."""
+    from app.services import audio_service
+    if audio_service._audio_service is not None:
+        audio_service._audio_service.close()
+
+
+def is_ready():
+    return _ready.is_set() and not _draining.is_set()
+
+
+def status():
+    return dict(_status, ready=_ready.is_set(), draining=_draining.is_set(), inflight=_inflight)
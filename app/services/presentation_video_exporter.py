@@ -3,15 +3,6 @@ import shutil
 import traceback
 import uuid
 import time
-from PIL import Image, ImageFilter, ImageOps
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
-from moviepy.video.fx.all import fadein, fadeout
-
-# Handle Pillow version differences for resampling
-if hasattr(Image, 'Resampling'):
-    RESAMPLE_METHOD = Image.Resampling.LANCZOS
-else:
-    RESAMPLE_METHOD = Image.ANTIALIAS
 
 class PresentationVideoExporter:
     """Export presentation slides + audio as video with transitions and layout styling"""
@@ -25,6 +16,14 @@ class PresentationVideoExporter:
         """
         Create a styled 16:9 slide with blurred background if needed
         """
+        from PIL import Image, ImageFilter, ImageOps
+        
+        # Handle Pillow version differences for resampling
+        if hasattr(Image, 'Resampling'):
+            RESAMPLE_METHOD = Image.Resampling.LANCZOS
+        else:
+            RESAMPLE_METHOD = Image.ANTIALIAS
+        
         try:
             output_path = os.path.join(temp_dir, f"styled_slide_{index}.png")
             
@@ -89,6 +88,10 @@ class PresentationVideoExporter:
         """
         Create video from slides with audio sync
         """
+        # moviepy is imported on first use: it dominates the web process startup time
+        from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
+        from moviepy.video.fx.all import fadein, fadeout
+        
         temp_dir = None
         try:
             if not slides or len(slides) == 0:
@@ -19,6 +19,14 @@ class VideoGenerationService:
         """
         Generate talking head video using SadTalker
         """
+        # Checkpoints are checked once per process at startup; wait here if that is still running
+        from download_models import wait_for_models, ModelStore, SADTALKER_REPO
+        if not wait_for_models():
+            return {
+                'success': False,
+                'error': "Chưa có model SadTalker. Vui lòng chạy 'python download_models.py' hoặc kiểm tra kết nối mạng."
+            }
+        
         # Ensure absolute paths
         source_image_abs = os.path.abspath(source_image_path)
         driven_audio_abs = os.path.abspath(driven_audio_path)
@@ -50,12 +58,19 @@ class VideoGenerationService:
             '--still', 
             '--preprocess', 'full',  # 'full' for better quality, 'crop' for cropped face
             '--size', '512',  # Higher resolution (256, 512)
-            '--checkpoint_dir', 'checkpoints',
+            '--checkpoint_dir', ModelStore().repo_dir(SADTALKER_REPO),  # verified store (init_path)
             '--batch_size', '2',  # Larger batch for smoother results
             # '--enhancer', 'gfpgan',  # Disabled: gfpgan not installed
             '--expression_scale', '1.0'  # Expression intensity
         ]
         
+        # Optional face renderer precision (fp32, fp16, bf16) and channels-last layout
+        precision = os.environ.get('SADTALKER_PRECISION')
+        if precision:
+            command += ['--precision', precision]
+        if os.environ.get('SADTALKER_CHANNELS_LAST', '').lower() in ('1', 'true', 'yes'):
+            command.append('--channels_last')
+
         if use_cpu:
             command.append('--cpu')
             print("Force CPU mode enabled.")
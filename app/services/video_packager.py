@@ -0,0 +1,122 @@
+import mimetypes
+import os
+import shutil
+import subprocess
+import time
+import uuid
+
+# Flask's static handler picks the Content-Type from these
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/iso.segment', '.m4s')
+
+DEFAULT_FORMATS = 'faststart,hls'
+SUPPORTED_FORMATS = ('faststart', 'hls')
+
+
+class VideoPackager:
+    """
+    Remux a finished presentation video for streaming playback (no re-encoding):
+
+      faststart  <name>.faststart.mp4 with the moov atom first, so playback starts
+                 before the whole file is downloaded
+      hls        <name>_hls/index.m3u8 + fragmented MP4 segments (init.mp4, *.m4s),
+                 so the player only fetches the segments around the playhead
+    """
+
+    def __init__(self, formats=None, segment_seconds=None):
+        if formats is None:
+            formats = os.environ.get('VIDEO_PACKAGING', DEFAULT_FORMATS)
+        if isinstance(formats, str):
+            formats = [f.strip().lower() for f in formats.split(',') if f.strip()]
+        self.formats = [f for f in formats if f in SUPPORTED_FORMATS]
+        self.segment_seconds = segment_seconds or float(os.environ.get('HLS_SEGMENT_SECONDS', 6))
+
+    @property
+    def enabled(self):
+        return bool(self.formats)
+
+    @staticmethod
+    def _ffmpeg_exe():
+        exe = shutil.which('ffmpeg')
+        if exe:
+            return exe
+        # Binary bundled with moviepy
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+
+    def _run(self, args):
+        command = [self._ffmpeg_exe(), '-y', '-hide_banner', '-loglevel', 'error'] + args
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if process.returncode != 0:
+            raise RuntimeError(process.stderr.strip()[-500:] or f'ffmpeg exited with {process.returncode}')
+
+    def faststart(self, input_path, output_path):
+        """Copy the streams into an MP4 whose index comes before the media data."""
+        temp_path = f'{output_path}.{uuid.uuid4().hex}.tmp.mp4'
+        try:
+            self._run(['-i', input_path, '-map', '0', '-c', 'copy', '-movflags', '+faststart', temp_path])
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return output_path
+
+    def hls(self, input_path, output_dir):
+        """
+        Segment into a VOD HLS playlist with fMP4 segments. Segments can only be cut
+        on keyframes, so they are at least one GOP long.
+        """
+        # Build next to the final folder and swap it in, so a player never sees half a playlist
+        temp_dir = f'{output_dir}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(temp_dir)
+        try:
+            self._run([
+                '-i', input_path, '-map', '0', '-c', 'copy',
+                '-f', 'hls',
+                '-hls_time', f'{self.segment_seconds:g}',
+                '-hls_playlist_type', 'vod',
+                '-hls_segment_type', 'fmp4',
+                '-hls_flags', 'independent_segments',
+                '-hls_fmp4_init_filename', 'init.mp4',
+                '-hls_segment_filename', os.path.join(temp_dir, 'segment_%05d.m4s'),
+                os.path.join(temp_dir, 'index.m3u8'),
+            ])
+            if os.path.exists(output_dir):
+                shutil.rmtree(output_dir)
+            os.replace(temp_dir, output_dir)
+        finally:
+            if os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        return os.path.join(output_dir, 'index.m3u8')
+
+    def package(self, video_path, video_url):
+        """
+        Write every enabled variant next to video_path.
+        Returns {'success', 'manifests': {format: url}, 'errors': {format: message}};
+        a failed variant never affects the original video.
+        """
+        manifests, errors = {}, {}
+        if not self.enabled or not video_path or not os.path.exists(video_path):
+            return {'success': False, 'manifests': manifests, 'errors': errors}
+
+        video_dir = os.path.dirname(video_path)
+        url_dir = video_url.rsplit('/', 1)[0]
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+
+        for fmt in self.formats:
+            start = time.time()
+            try:
+                if fmt == 'faststart':
+                    filename = f'{stem}.faststart.mp4'
+                    self.faststart(video_path, os.path.join(video_dir, filename))
+                    manifests[fmt] = f'{url_dir}/{filename}'
+                elif fmt == 'hls':
+                    folder = f'{stem}_hls'
+                    self.hls(video_path, os.path.join(video_dir, folder))
+                    manifests[fmt] = f'{url_dir}/{folder}/index.m3u8'
+                print(f"📦 Packaged {fmt}: {manifests[fmt]} ({time.time() - start:.1f}s)")
+            except Exception as e:
+                print(f"⚠️ Packaging {fmt} failed for {video_path}: {e}")
+                errors[fmt] = str(e)
+
+        return {'success': bool(manifests), 'manifests': manifests, 'errors': errors}
@@ -1,10 +1,6 @@
 """
 Module để đọc nội dung từ file PowerPoint và PDF
 """
-from pptx import Presentation
-from pypdf import PdfReader
-import fitz  # pymupdf
-from PIL import Image
 import os
 from typing import List, Dict
 
@@ -16,6 +12,9 @@ class PresentationReader:
         """
         Đọc file PowerPoint và trả về danh sách slides
         """
+        # Imported on first use: python-pptx, pypdf and pymupdf are slow to import at startup
+        from pptx import Presentation
+        
         try:
             prs = Presentation(file_path)
             slides_data = []
@@ -48,6 +47,8 @@ class PresentationReader:
         """
         Đọc file PDF và trả về danh sách pages
         """
+        from pypdf import PdfReader
+        
         try:
             reader = PdfReader(file_path)
             pages_data = []
@@ -139,6 +140,8 @@ class PresentationReader:
                 PresentationReader._convert_ppt_to_pdf(file_path, pdf_path)
         
         # Extract slides from PDF using pymupdf
+        import fitz
+        
         try:
             doc = fitz.open(pdf_path)
             image_paths = []
@@ -0,0 +1,67 @@
+"""
+NeuCodec decoder benchmark: torch vs exported ONNX (onnxruntime) on CPU.
+
+Decodes random codes of a slide-sized utterance with the torch decoder and with
+onnxruntime at several intra-op thread counts, then runs the parity check.
+
+    python -m vieneu.onnx_codec export --output models/distill-neucodec-decoder.onnx   # from app/VieNeu-TTS
+    python benchmarks/codec_decoder.py --model app/VieNeu-TTS/models/distill-neucodec-decoder.onnx --threads 1 2 4 8
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import torch
+
+VIENEU_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'VieNeu-TTS')
+sys.path.insert(0, VIENEU_DIR)
+
+from vieneu.onnx_codec import (  # noqa: E402
+    FRAMES_PER_SECOND, OnnxCodecDecoder, check_parity, default_num_threads, load_torch_codec, random_codes,
+)
+
+
+def time_decode(decode, codes, repeat):
+    decode(codes)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decode(codes)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(args):
+    codec = load_torch_codec(args.codec)
+    codes = random_codes(int(args.seconds * FRAMES_PER_SECOND))
+
+    def torch_decode(c):
+        with torch.no_grad():
+            return codec.decode_code(torch.from_numpy(c)).numpy()
+
+    print(f"{args.seconds:.0f} s of audio, {codes.shape[-1]} frames")
+    print(f"{'decoder':<16}{'threads':>8}{'ms':>10}{'RTF':>8}")
+    default_threads = torch.get_num_threads()
+    baseline = time_decode(torch_decode, codes, args.repeat)
+    print(f"{'torch':<16}{default_threads:>8}{baseline * 1000:>10.1f}{baseline / args.seconds:>8.3f}")
+
+    for threads in args.threads or [default_num_threads()]:
+        decoder = OnnxCodecDecoder(args.model, num_threads=threads)
+        elapsed = time_decode(decoder.decode_code, codes, args.repeat)
+        print(f"{'onnxruntime':<16}{threads:>8}{elapsed * 1000:>10.1f}{elapsed / args.seconds:>8.3f}"
+              f"   {baseline / elapsed:.2f}x")
+
+    print("parity:")
+    for r in check_parity(codec, OnnxCodecDecoder(args.model), atol=args.atol):
+        print(f"   {'ok ' if r['ok'] else 'BAD'} {r['frames']:>4} frames: max |err| {r['max_abs_error']:.2e}, "
+              f"SNR {r['snr_db']:.1f} dB")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--codec', default='neuphonic/distill-neucodec')
+    parser.add_argument('--model', required=True, help='decoder exported with vieneu.onnx_codec export')
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--threads', type=int, nargs='*', default=None)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--atol', type=float, default=1e-3)
+    main(parser.parse_args())
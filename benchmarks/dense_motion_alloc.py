@@ -0,0 +1,105 @@
+"""
+DenseMotionNetwork per-frame allocation microbenchmark.
+
+Compares the cached-grid implementation against the previous one (rebuilt
+coordinate grids and repeated tensors on every forward) and prints the number
+of CPU allocations and allocated bytes per frame.
+
+    python benchmarks/dense_motion_alloc.py --size 256 --frames 10
+"""
+import os
+import sys
+import warnings
+from argparse import ArgumentParser
+
+import torch
+import torch.nn.functional as F
+import yaml
+from torch.profiler import ProfilerActivity, profile
+
+SADTALKER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'SadTalker')
+sys.path.insert(0, SADTALKER_DIR)
+
+from src.facerender.modules.dense_motion import DenseMotionNetwork  # noqa: E402
+from src.facerender.modules.util import make_coordinate_grid  # noqa: E402
+
+warnings.filterwarnings('ignore')
+
+
+def legacy_kp2gaussian(kp, spatial_size, kp_variance):
+    mean = kp['value']
+    coordinate_grid = make_coordinate_grid(spatial_size, mean.type())
+    number_of_leading_dimensions = len(mean.shape) - 1
+    shape = (1,) * number_of_leading_dimensions + coordinate_grid.shape
+    coordinate_grid = coordinate_grid.view(*shape)
+    repeats = mean.shape[:number_of_leading_dimensions] + (1, 1, 1, 1)
+    coordinate_grid = coordinate_grid.repeat(*repeats)
+    shape = mean.shape[:number_of_leading_dimensions] + (1, 1, 1, 3)
+    mean = mean.view(*shape)
+    mean_sub = (coordinate_grid - mean)
+    return torch.exp(-0.5 * (mean_sub ** 2).sum(-1) / kp_variance)
+
+
+class LegacyDenseMotionNetwork(DenseMotionNetwork):
+    """The pre-cache implementation, kept here only as the benchmark baseline."""
+
+    def create_sparse_motions(self, feature, kp_driving, kp_source):
+        bs, _, d, h, w = feature.shape
+        identity_grid = make_coordinate_grid((d, h, w), type=kp_source['value'].type())
+        identity_grid = identity_grid.view(1, 1, d, h, w, 3)
+        coordinate_grid = identity_grid - kp_driving['value'].view(bs, self.num_kp, 1, 1, 1, 3)
+        driving_to_source = coordinate_grid + kp_source['value'].view(bs, self.num_kp, 1, 1, 1, 3)
+        identity_grid = identity_grid.repeat(bs, 1, 1, 1, 1, 1)
+        return torch.cat([identity_grid, driving_to_source], dim=1)
+
+    def create_heatmap_representations(self, feature, kp_driving, kp_source):
+        spatial_size = feature.shape[3:]
+        gaussian_driving = legacy_kp2gaussian(kp_driving, spatial_size=spatial_size, kp_variance=0.01)
+        gaussian_source = legacy_kp2gaussian(kp_source, spatial_size=spatial_size, kp_variance=0.01)
+        heatmap = gaussian_driving - gaussian_source
+        zeros = torch.zeros(heatmap.shape[0], 1, spatial_size[0], spatial_size[1], spatial_size[2]).type(heatmap.type())
+        heatmap = torch.cat([zeros, heatmap], dim=1)
+        return heatmap.unsqueeze(2)
+
+
+def count_allocations(network, feature, kps, frames):
+    with torch.no_grad():
+        compressed = network.compress_feature(feature)
+        network(feature, kps[0][0], kps[0][1], compressed_feature=compressed)  # warm-up fills the caches
+        with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+            for kp_driving, kp_source in kps[:frames]:
+                network(feature, kp_driving, kp_source, compressed_feature=compressed)
+    allocations = [e.cpu_memory_usage for e in prof.events() if e.cpu_memory_usage > 0]
+    return len(allocations) / frames, sum(allocations) / frames
+
+
+def main(args):
+    with open(os.path.join(SADTALKER_DIR, 'src', 'config', 'facerender_still.yaml')) as f:
+        config = yaml.safe_load(f)['model_params']
+    params = dict(num_kp=config['common_params']['num_kp'], feature_channel=config['generator_params']['reshape_channel'],
+                  estimate_occlusion_map=True, **config['generator_params']['dense_motion_params'])
+
+    torch.manual_seed(0)
+    spatial = args.size // 4
+    feature = torch.rand(args.batch_size, params['feature_channel'], params['reshape_depth'], spatial, spatial)
+    num_kp = params['num_kp']
+    kps = [({'value': torch.rand(args.batch_size, num_kp, 3) * 2 - 1},
+            {'value': torch.rand(args.batch_size, num_kp, 3) * 2 - 1}) for _ in range(args.frames + 1)]
+
+    results = {}
+    for name, cls in (('before', LegacyDenseMotionNetwork), ('after', DenseMotionNetwork)):
+        torch.manual_seed(0)
+        network = cls(**params).eval()
+        results[name] = count_allocations(network, feature, kps, args.frames)
+
+    print(f"{'':<8}{'allocs/frame':>14}{'MiB/frame':>12}")
+    for name, (count, size) in results.items():
+        print(f"{name:<8}{count:>14.1f}{size / 2 ** 20:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--size', type=int, default=256, help='face renderer image size')
+    parser.add_argument('--batch_size', type=int, default=2)
+    parser.add_argument('--frames', type=int, default=10)
+    main(parser.parse_args())
@@ -0,0 +1,99 @@
+"""
+Face renderer precision benchmark.
+
+Renders the same avatar with every precision mode of AnimateFromCoeff, reports
+frames/s and the PSNR of each mode against the fp32 output.
+
+    python benchmarks/facerender_precision.py --source_image avatar.png --frames 50
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+import torch
+from PIL import Image
+from skimage import img_as_float32, transform
+
+SADTALKER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'SadTalker')
+sys.path.insert(0, SADTALKER_DIR)
+
+from src.facerender.animate import AnimateFromCoeff  # noqa: E402
+from src.facerender.modules.make_animation import make_animation  # noqa: E402
+from src.utils.init_path import init_path  # noqa: E402
+
+
+def load_source_image(path, size, batch_size):
+    image = img_as_float32(np.array(Image.open(path).convert('RGB')))
+    image = transform.resize(image, (size, size, 3)).transpose((2, 0, 1))
+    return torch.FloatTensor(image).unsqueeze(0).repeat(batch_size, 1, 1, 1)
+
+
+def fixed_semantics(coeff_nc, frames, batch_size, seed=0):
+    # deterministic coefficients so every mode renders the exact same motion
+    generator = torch.Generator().manual_seed(seed)
+    source = torch.randn(1, coeff_nc, 1, generator=generator) * 0.1
+    source_semantics = source.repeat(batch_size, 1, 27)
+    jitter = torch.randn(batch_size, frames, coeff_nc, 27, generator=generator) * 0.05
+    target_semantics = source.unsqueeze(0).repeat(batch_size, frames, 1, 27) + jitter
+    return source_semantics, target_semantics
+
+
+def psnr(reference, output):
+    mse = torch.mean((reference - output) ** 2).item()
+    return float('inf') if mse == 0 else 10 * np.log10(1.0 / mse)
+
+
+def render(animate, source_image, source_semantics, target_semantics):
+    return make_animation(source_image, source_semantics, target_semantics,
+                          animate.generator, animate.kp_extractor, animate.he_estimator, animate.mapping,
+                          use_half=animate.amp_dtype is not None, amp_dtype=animate.amp_dtype,
+                          channels_last=animate.channels_last)
+
+
+def main(args):
+    paths = init_path(args.checkpoint_dir, os.path.join(SADTALKER_DIR, 'src', 'config'), args.size, False, args.preprocess)
+    modes = [('fp32', False), ('fp32', True), ('bf16', False), ('bf16', True)]
+    if args.device.startswith('cuda'):
+        modes += [('fp16', False), ('fp16', True)]
+
+    source_image = load_source_image(args.source_image, args.size, args.batch_size).to(args.device)
+    reference = None
+    baseline_fps = None
+    print(f"{'mode':<22}{'frames/s':>10}{'speedup':>10}{'PSNR (dB)':>12}")
+    for precision, channels_last in modes:
+        animate = AnimateFromCoeff(paths, args.device, precision=precision, channels_last=channels_last)
+        coeff_nc = animate.mapping.first[0].in_channels
+        source_semantics, target_semantics = fixed_semantics(coeff_nc, args.frames, args.batch_size)
+        source_semantics = source_semantics.to(args.device)
+        target_semantics = target_semantics.to(args.device)
+
+        # warm-up pass so lazy kernels and allocator growth are not timed
+        render(animate, source_image, source_semantics, target_semantics[:, :2])
+        if args.device.startswith('cuda'):
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        predictions = render(animate, source_image, source_semantics, target_semantics)
+        if args.device.startswith('cuda'):
+            torch.cuda.synchronize()
+        fps = args.frames * args.batch_size / (time.perf_counter() - start)
+        predictions = predictions.cpu()
+
+        if reference is None:
+            reference, baseline_fps = predictions, fps
+        name = precision + (' + channels_last' if channels_last else '')
+        print(f"{name:<22}{fps:>10.2f}{fps / baseline_fps:>9.2f}x{psnr(reference, predictions):>12.2f}")
+        del animate
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--source_image', required=True, help='fixed avatar used for every mode')
+    parser.add_argument('--checkpoint_dir', default=os.path.join(SADTALKER_DIR, 'checkpoints'))
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--preprocess', default='full')
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--batch_size', type=int, default=2)
+    parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu')
+    main(parser.parse_args())
@@ -0,0 +1,105 @@
+"""
+VietnameseTTSNormalizer throughput benchmark.
+
+Normalises a corpus of real slide scripts (by default every slide text in
+data/presentations.json) and prints characters/s for:
+
+  legacy    per-unit patterns rebuilt on every call, no memoisation
+  compiled  precompiled pipeline, cold LRU cache
+  memoised  precompiled pipeline, second pass served from the LRU cache
+
+    python benchmarks/normalizer_throughput.py --repeat 3
+    python benchmarks/normalizer_throughput.py --corpus scripts.txt   # one script per line
+"""
+import json
+import os
+import re
+import sys
+import time
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'app', 'VieNeu-TTS'))
+
+from vieneu_utils.normalize_text import VietnameseTTSNormalizer  # noqa: E402
+
+
+class LegacyNormalizer(VietnameseTTSNormalizer):
+    """The previous unit handling (one re.sub per unit per call), kept only as the benchmark baseline."""
+
+    def normalize(self, text):
+        return self._normalize(text)
+
+    def _normalize_units(self, text):
+        text = self._re_compound_unit_number.sub(
+            lambda m: f"{m.group(1)} {self.units.get(m.group(2).lower(), m.group(2).lower())} trên "
+                      f"{self.units.get(m.group(3).lower(), m.group(3).lower())}", text)
+        text = self._re_compound_unit.sub(
+            lambda m: f"{self.units.get(m.group(1).lower(), m.group(1).lower())} trên "
+                      f"{self.units.get(m.group(2).lower(), m.group(2).lower())}", text)
+
+        sorted_units = sorted(self.units.items(), key=lambda x: len(x[0]), reverse=True)
+        for unit, full_name in sorted_units:
+            pattern = r'(\d+(?:[.,]\d+)?)\s*' + re.escape(unit) + r'\b'
+            text = re.sub(pattern, rf'\1 {full_name}', text, flags=re.IGNORECASE)
+
+        for unit, full_name in sorted_units:
+            if any(c in unit for c in '²³°'):
+                pattern = r'\b' + re.escape(unit) + r'\b'
+                text = re.sub(pattern, full_name, text, flags=re.IGNORECASE)
+        return text
+
+
+def load_corpus(path):
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+
+    with open(os.path.join(ROOT, 'data', 'presentations.json'), 'r', encoding='utf-8') as f:
+        presentations = json.load(f)
+    texts = []
+    for presentation in presentations.values():
+        for slide in presentation.get('slides', []):
+            text = slide.get('edited_text') or slide.get('generated_text') or slide.get('content', '')
+            if text.strip():
+                texts.append(text)
+    return texts
+
+
+def throughput(normalize, texts, repeat):
+    chars = sum(len(t) for t in texts) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            normalize(text)
+    return chars / (time.perf_counter() - start)
+
+
+def main(args):
+    texts = load_corpus(args.corpus)
+    print(f"{len(texts)} scripts, {sum(len(t) for t in texts)} characters")
+
+    legacy = LegacyNormalizer()
+    compiled = VietnameseTTSNormalizer()
+    mismatches = sum(legacy.normalize(t) != compiled._normalize(t) for t in texts)
+
+    results = {
+        'legacy': throughput(legacy.normalize, texts, args.repeat),
+        'compiled': throughput(compiled._normalize, texts, args.repeat),
+    }
+    compiled._normalize_cached.cache_clear()
+    for text in texts:
+        compiled.normalize(text)
+    results['memoised'] = throughput(compiled.normalize, texts, args.repeat)
+
+    print(f"{'':<10}{'chars/s':>14}{'speedup':>10}")
+    for name, rate in results.items():
+        print(f"{name:<10}{rate:>14,.0f}{rate / results['legacy']:>9.1f}x")
+    print(f"outputs differing from legacy: {mismatches}")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--corpus', default=None, help='text file with one slide script per line')
+    parser.add_argument('--repeat', type=int, default=3)
+    main(parser.parse_args())
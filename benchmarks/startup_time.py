@@ -0,0 +1,82 @@
+"""
+Web process cold-start benchmark.
+
+Runs `python -X importtime` on the app factory in a fresh interpreter and prints
+the wall time of `create_app()` plus the slowest imports (cumulative), so heavy
+modules that sneak back onto the startup path are easy to spot.
+
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --top 30 --repeat 5
+    python benchmarks/startup_time.py --target app.controllers.presentation
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:       self [us] |   cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)')
+
+APP_SCRIPT = (
+    "import time; start = time.perf_counter()\n"
+    "from app import create_app; create_app()\n"
+    "print(f'WALL {time.perf_counter() - start:.6f}')\n"
+)
+
+
+def run_once(target):
+    if target:
+        script = (f"import time; start = time.perf_counter()\nimport {target}\n"
+                  f"print(f'WALL {{time.perf_counter() - start:.6f}}')\n")
+    else:
+        script = APP_SCRIPT
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], cwd=ROOT,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'startup failed')
+
+    wall = float(re.search(r'^WALL (\S+)$', result.stdout, re.MULTILINE).group(1))
+    imports = []
+    for line in result.stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m:
+            imports.append((m.group(3), int(m.group(1)), int(m.group(2))))
+    return wall, imports
+
+
+def main(args):
+    walls, imports = [], []
+    for _ in range(args.repeat):
+        wall, imports = run_once(args.target)
+        walls.append(wall)
+
+    label = f'import {args.target}' if args.target else 'create_app()'
+    print(f"{label}: median {statistics.median(walls) * 1000:.0f} ms, "
+          f"min {min(walls) * 1000:.0f} ms over {args.repeat} cold runs")
+
+    # Self time summed per distribution (flask, werkzeug, moviepy, ...): nothing is counted twice
+    packages = {}
+    for name, self_us, _ in imports:
+        root = name.split('.')[0]
+        count, total = packages.get(root, (0, 0))
+        packages[root] = (count + 1, total + self_us)
+    total_us = sum(total for _, total in packages.values())
+    print(f"\n{'ms':>8}{'share':>8}{'modules':>9}  package")
+    for root, (count, self_us) in sorted(packages.items(), key=lambda p: p[1][1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>8.1f}{self_us / total_us:>8.0%}{count:>9}  {root}")
+
+    heavy = [name for name in ('moviepy', 'torch', 'fitz', 'pptx', 'pypdf', 'google.genai', 'langdetect', 'vieneu')
+             if any(i[0] == name or i[0].startswith(name + '.') for i in imports)]
+    print(f"\nheavy modules imported at startup: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--target', default=None, help='module to import instead of running create_app()')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    main(parser.parse_args())
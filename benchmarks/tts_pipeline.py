@@ -0,0 +1,97 @@
+"""
+VieNeuTTS generation/decoding pipeline benchmark.
+
+Synthesises one ~2,000 character slide three ways and prints wall time and
+real-time factor for each:
+
+  sequential  generate chunk i, decode chunk i, then move on (previous behaviour)
+  pipelined   decode thread overlaps with generation, one chunk per batch
+  batched     decode thread plus batched generation/decoding (max_batch_size)
+
+    python benchmarks/tts_pipeline.py --backbone pnnbao-ump/VieNeu-TTS-0.3B --device cuda
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import torch
+
+VIENEU_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'VieNeu-TTS')
+sys.path.insert(0, VIENEU_DIR)
+
+from vieneu.core import VieNeuTTS  # noqa: E402
+from vieneu_utils.core_utils import split_text_into_chunks  # noqa: E402
+
+SLIDE_PARAGRAPH = (
+    "Trí tuệ nhân tạo đang thay đổi cách chúng ta học tập và làm việc mỗi ngày. "
+    "Trong bài trình bày này, chúng ta sẽ tìm hiểu các khái niệm cơ bản, những ứng dụng phổ biến "
+    "trong giáo dục, y tế và sản xuất, cũng như các thách thức về dữ liệu, chi phí và đạo đức. "
+    "Cuối cùng, chúng ta sẽ thảo luận một số bước đơn giản để bắt đầu áp dụng công nghệ này vào thực tế. "
+)
+
+
+def slide_text(length):
+    text = SLIDE_PARAGRAPH * (length // len(SLIDE_PARAGRAPH) + 1)
+    return text[:length].rsplit(' ', 1)[0] + '.'
+
+
+def sequential_infer(tts, chunks, voice):
+    wavs = []
+    for chunk in chunks:
+        for output_strs in tts._generate_chunk_batches([chunk], voice['codes'], voice['text'], max_batch_size=1):
+            wavs.extend(tts._decode(codes) for codes in output_strs)
+    return wavs
+
+
+def pipelined_infer(tts, chunks, voice, max_batch_size):
+    return tts._generate_and_decode(chunks, voice['codes'], voice['text'], max_batch_size=max_batch_size)
+
+
+def timed(fn, *args):
+    torch.manual_seed(0)
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    wavs = fn(*args)
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return time.perf_counter() - start, wavs
+
+
+def main(args):
+    tts = VieNeuTTS(backbone_repo=args.backbone, backbone_device=args.device,
+                    codec_repo=args.codec, codec_device=args.device, max_batch_size=args.max_batch_size)
+    voice = tts.get_preset_voice(args.voice)
+
+    text = slide_text(args.chars)
+    chunks = split_text_into_chunks(text, max_chars=args.max_chars)
+    print(f"{len(text)} characters, {len(chunks)} chunks")
+
+    # warm-up compiles kernels and fills the reference prefix cache
+    pipelined_infer(tts, chunks[:1], voice, 1)
+
+    runs = [
+        ('sequential', sequential_infer, (tts, chunks, voice)),
+        ('pipelined', pipelined_infer, (tts, chunks, voice, 1)),
+        ('batched', pipelined_infer, (tts, chunks, voice, args.max_batch_size)),
+    ]
+    print(f"{'mode':<12}{'seconds':>10}{'audio s':>10}{'RTF':>8}")
+    for name, fn, fn_args in runs:
+        elapsed, wavs = timed(fn, *fn_args)
+        audio_seconds = sum(len(w) for w in wavs) / tts.sample_rate
+        print(f"{name:<12}{elapsed:>10.2f}{audio_seconds:>10.1f}{elapsed / max(audio_seconds, 1e-6):>8.3f}")
+
+    tts.close()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--backbone', default='pnnbao-ump/VieNeu-TTS-0.3B')
+    parser.add_argument('--codec', default='neuphonic/distill-neucodec')
+    parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu')
+    parser.add_argument('--voice', default=None, help='preset voice id (default voice if omitted)')
+    parser.add_argument('--chars', type=int, default=2000)
+    parser.add_argument('--max_chars', type=int, default=256)
+    parser.add_argument('--max_batch_size', type=int, default=4)
+    main(parser.parse_args())
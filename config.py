@@ -7,6 +7,8 @@ class Config:
     DATA_FOLDER = 'data'
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB max file size
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    # Let a fronting Apache (mod_xsendfile) / lighttpd send media files (X-Sendfile header instead of the body)
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
 
     @staticmethod
     def init_app(app):
@@ -1,128 +1,512 @@
-from huggingface_hub import snapshot_download, list_repo_files
+"""
+Model provisioning: a manifest of every model file (size + SHA256), a verified
+local store, and parallel, resumable downloads of only what is missing or corrupt.
+
+Store layout (MODEL_STORE_DIR, default 'models'):
+
+    <store>/<repo_id>/<file>                 e.g. models/pnnbao-ump/VieNeu-TTS-0.3B-q4-gguf/*.gguf
+    <store>/.verified/<owner>--<name>.json   size, mtime and SHA256 of every verified file
+
+A manifest entry may pin its own folder ("path"): SadTalker keeps its checkpoints
+in app/SadTalker/checkpoints, which existing installs and (read-only) Docker mounts use.
+
+Every file is checked against a reference checksum: the manifest's, else (entry not
+pinned yet) the hub's LFS SHA256 or git blob SHA1. A present file without any reference
+(hub unreachable) is let through as unverified, but never recorded as verified. Checks are cheap: a file whose size and mtime still match its
+verified record is trusted, only changed or new files are hashed. A lock file per repo
+(<store>/.verified/<owner>--<name>.lock) serialises provisioning across processes.
+
+    python download_models.py                      # SadTalker (MODEL_GROUPS)
+    python download_models.py --group vieneu       # VieNeu GGUF backbone + codec
+    python download_models.py --verify             # re-hash everything, no download
+    python download_models.py --update-manifest    # pin sizes/SHA256 from the hub
+"""
+import fnmatch
+import hashlib
+import json
 import os
-import shutil
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(ROOT, "models_manifest.json")
+STORE_ENV = "MODEL_STORE_DIR"
+DEFAULT_STORE_DIR = "models"
+STATE_DIR = ".verified"
+STATE_VERSION = 2
+SADTALKER_REPO = "vinthony/SadTalker"
+
+def load_manifest(path=None):
+    with open(path or os.environ.get("MODEL_MANIFEST") or MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 # Required model files for SadTalker
-REQUIRED_MODELS = [
-    'auido2exp_00300-model.pth',
-    'auido2pose_00140-model.pth',
-    'epoch_20.pth',
-    'wav2lip.pth',
-    'facevid2vid_00189-model.pth.tar',
-    'mapping_00109-model.pth.tar',
-    'mapping_00229-model.pth.tar',
-]
+REQUIRED_MODELS = list(load_manifest()["repos"][SADTALKER_REPO]["files"])
+
+def store_root():
+    root = os.environ.get(STORE_ENV) or DEFAULT_STORE_DIR
+    return root if os.path.isabs(root) else os.path.join(ROOT, root)
+
+def file_sha256(path, block_size=8 * 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _lfs_sha256(sibling):
+    lfs = sibling.lfs
+    if lfs is None:
+        return None
+    return lfs.get("sha256") if isinstance(lfs, dict) else lfs.sha256
+
+def _git_blob_sha1(path, block_size=8 * 1024 * 1024):
+    """SHA1 git gives a blob: what the hub reports for regular (non-LFS) files."""
+    digest = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _has_reference(spec):
+    return bool(spec.get("sha256") or spec.get("git_sha1"))
+
+def _matches(path, sha256, spec):
+    if spec.get("sha256"):
+        return sha256 == spec["sha256"]
+    return _git_blob_sha1(path) == spec["git_sha1"]
+
+def _report_unverifiable(repo_id, names):
+    if names:
+        print(f"  ⚠️ {repo_id}: {len(names)} file(s) present but unverified (no reference checksum): "
+              f"{', '.join(names)}")
+
+class ModelStore:
+    """Verified local copies of the repositories listed in the manifest."""
+
+    def __init__(self, manifest=None, root=None):
+        self.manifest = manifest or load_manifest()
+        self.root = root or store_root()
+
+    def repos(self, groups=None):
+        return [
+            repo_id for repo_id, entry in self.manifest["repos"].items()
+            if groups is None or entry.get("group") in groups
+        ]
+
+    def repo_dir(self, repo_id):
+        entry = self.manifest["repos"].get(repo_id, {})
+        if entry.get("path"):
+            return os.path.join(ROOT, entry["path"])
+        return os.path.join(self.root, repo_id)
+
+    def verified_dir(self, repo_id):
+        """repo_dir(repo_id) if its last verification was complete, else None (no hashing, no hub)."""
+        folder = self.repo_dir(repo_id)
+        if self._read_state(repo_id).get("complete") and os.path.isdir(folder):
+            return folder
+        return None
+
+    def _state_path(self, repo_id, suffix=".json"):
+        return os.path.join(self.root, STATE_DIR, repo_id.replace("/", "--") + suffix)
+
+    def _read_state(self, repo_id):
+        try:
+            with open(self._state_path(repo_id), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+        # Older state files may hold files hashed without a reference: start over
+        if not state or state.get("version") != STATE_VERSION:
+            return {"complete": False, "files": {}}
+        return state
+
+    def _write_state(self, repo_id, files, complete):
+        path = self._state_path(repo_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "complete": complete, "verified_at": time.time(),
+                       "files": files}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def _lock(self, repo_id):
+        """
+        Serialise verification and downloads of one repo across threads and processes
+        (gunicorn workers, request threads, the startup check): otherwise one provisioner
+        deletes or re-downloads a file another one has just verified.
+        """
+        from filelock import FileLock, Timeout
+        lock = FileLock(self._state_path(repo_id, ".lock"))
+        try:
+            os.makedirs(os.path.dirname(lock.lock_file), exist_ok=True)
+            try:
+                lock.acquire(timeout=0)
+            except Timeout:
+                print(f"⏳ {repo_id}: waiting for another process to finish provisioning")
+                lock.acquire()
+        except OSError as e:
+            print(f"  ⚠️ Could not lock {repo_id} ({e}), continuing without the lock")
+            lock = None
+        try:
+            yield
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def _remote_files(self, repo_id):
+        """
+        {filename: {size, sha256}} from the hub. LFS files carry their SHA256, regular
+        git files only their blob SHA1 (git_sha1).
+        """
+        from huggingface_hub import HfApi
+        entry = self.manifest["repos"][repo_id]
+        info = HfApi().model_info(repo_id, revision=entry.get("revision"), files_metadata=True)
+        patterns = entry.get("allow_patterns")
+        files = {}
+        for s in info.siblings:
+            if s.rfilename.startswith(".") or (patterns and not any(fnmatch.fnmatch(s.rfilename, p) for p in patterns)):
+                continue
+            files[s.rfilename] = {"size": s.size, "sha256": _lfs_sha256(s)}
+            if s.lfs is None and s.blob_id:
+                files[s.rfilename]["git_sha1"] = s.blob_id
+        return files
+
+    def expected_files(self, repo_id, state=None):
+        """
+        Files the repo must contain: the manifest list, else (repo not pinned yet)
+        the files verified earlier, else the hub listing.
+        """
+        files = self.manifest["repos"][repo_id].get("files")
+        if files:
+            return files
+        state = state if state is not None else self._read_state(repo_id)
+        if state.get("complete") and state.get("files"):
+            return {name: {"size": None, "sha256": None} for name in state["files"]}
+        return self._remote_files(repo_id)
+
+    def _with_references(self, repo_id, expected, state):
+        """
+        Fill the size/SHA256 the manifest leaves null: from the last verification
+        (which was itself checked against a reference), else from the hub. A file the
+        hub cannot be asked about keeps no reference and is never reported as verified.
+        """
+        resolved, unknown = {}, []
+        for name, spec in expected.items():
+            spec, record = dict(spec), state["files"].get(name)
+            if not _has_reference(spec) and record:
+                spec["sha256"] = record["sha256"]
+                spec["size"] = spec.get("size") or record["size"]
+            if not _has_reference(spec):
+                unknown.append(name)
+            resolved[name] = spec
+
+        if unknown:
+            try:
+                remote = self._remote_files(repo_id)
+            except Exception as e:
+                print(f"  ⚠️ {repo_id}: no reference checksum for {len(unknown)} file(s) and the hub "
+                      f"is unreachable ({e}); pin them with 'python download_models.py --update-manifest'")
+                remote = {}
+            for name in unknown:
+                for key, value in remote.get(name, {}).items():
+                    if resolved[name].get(key) is None:
+                        resolved[name][key] = value
+        return resolved
+
+    def _check(self, repo_id, expected, state, full=False):
+        """
+        Compare every expected file with its reference. Size + mtime unchanged since
+        the last verification -> trusted without hashing (unless full); anything else
+        is hashed. Records what passed; the repo only counts as complete (see
+        vieneu.hub_assets) when every file was checked against a reference.
+
+        Returns:
+            tuple: (missing, corrupt, unverifiable) file name lists; unverifiable files
+            are present but have no reference checksum
+        """
+        folder = self.repo_dir(repo_id)
+        verified, missing, corrupt, unverifiable = {}, [], [], []
+
+        for name, spec in expected.items():
+            path = os.path.join(folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                missing.append(name)
+                continue
+            if spec.get("size") is not None and st.st_size != spec["size"]:
+                print(f"  ✗ Size mismatch: {name}")
+                corrupt.append(name)
+                continue
+            if not _has_reference(spec):
+                unverifiable.append(name)
+                continue
+
+            record = state["files"].get(name)
+            if (not full and record and record["size"] == st.st_size and record["mtime_ns"] == st.st_mtime_ns
+                    and record["sha256"] == spec.get("sha256")):
+                verified[name] = record
+                continue
+
+            sha256 = file_sha256(path)
+            if not _matches(path, sha256, spec):
+                print(f"  ✗ Checksum mismatch: {name}")
+                corrupt.append(name)
+                continue
+            verified[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+
+        complete = not (missing or corrupt or unverifiable)
+        if verified != state["files"] or state.get("complete") != complete:
+            try:
+                self._write_state(repo_id, verified, complete=complete)
+            except OSError as e:
+                print(f"  ⚠️ Could not record verification of {repo_id}: {e}")
+        return missing, corrupt, unverifiable
+
+    def verify(self, repo_id, full=False, expected=None):
+        """
+        Check every expected file against its reference checksum.
+
+        Returns:
+            tuple: (ok: bool, bad_files: list)
+        """
+        with self._lock(repo_id):
+            state = self._read_state(repo_id)
+            expected = self._with_references(repo_id, expected or self.expected_files(repo_id, state), state)
+            missing, corrupt, unverifiable = self._check(repo_id, expected, state, full=full)
+        _report_unverifiable(repo_id, unverifiable)
+        bad = missing + corrupt
+        return not bad, bad
+
+    def _download(self, repo_id, name, spec, force=False):
+        from huggingface_hub import hf_hub_download
+        if not _has_reference(spec):
+            raise IOError(f"{name} has no reference checksum")
+        entry = self.manifest["repos"][repo_id]
+        folder = self.repo_dir(repo_id)
+        for attempt in range(2):
+            # local_dir downloads keep a .incomplete file and resume it with a Range request
+            path = hf_hub_download(repo_id, name, revision=entry.get("revision"), local_dir=folder,
+                                   force_download=force or attempt > 0)
+            sha256 = file_sha256(path)
+            if _matches(path, sha256, spec):
+                st = os.stat(path)
+                return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+            print(f"  ✗ {name}: checksum mismatch after download, retrying")
+            os.remove(path)
+        raise IOError(f"{name} does not match the reference checksum")
+
+    def provision(self, repo_id, force=False, workers=None):
+        """
+        Make repo_id complete and verified, downloading (in parallel) only the
+        files that are missing or corrupt.
+
+        Returns:
+            bool: True if every file is present and none failed its checksum
+        """
+        folder = self.repo_dir(repo_id)
+        with self._lock(repo_id):
+            state = self._read_state(repo_id)
+            try:
+                expected = self._with_references(repo_id, self.expected_files(repo_id, state), state)
+            except Exception as e:
+                print(f"✗ Cannot list files of {repo_id}: {e}")
+                return False
+
+            if force:
+                fetch = list(expected)
+            else:
+                missing, corrupt, unverifiable = self._check(repo_id, expected, state)
+                # Present files without a reference are kept: a download could not be checked either
+                fetch = missing + corrupt
+                if not fetch:
+                    _report_unverifiable(repo_id, unverifiable)
+                    print(f"✓ {repo_id}: {len(expected) - len(unverifiable)} file(s) verified in {folder}")
+                    return True
+                for name in corrupt:
+                    # Failed its checksum: hf_hub_download would take it as up to date
+                    os.remove(os.path.join(folder, name))
+
+            print(f"⬇️ {repo_id}: downloading {len(fetch)} file(s) to {folder}")
+            os.makedirs(folder, exist_ok=True)
+            workers = workers or int(os.environ.get("MODEL_DOWNLOAD_WORKERS") or 4)
+            state = self._read_state(repo_id)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._download, repo_id, name, expected[name], force): name
+                           for name in fetch}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        # Hashed while downloading: the check below takes the fast path
+                        state["files"][name] = future.result()
+                        print(f"  ✓ {name}")
+                    except Exception as e:
+                        print(f"  ✗ {name}: {e}")
+            try:
+                self._write_state(repo_id, state["files"], complete=False)
+            except OSError:
+                pass
+
+            missing, corrupt, unverifiable = self._check(repo_id, expected, state)
+        _report_unverifiable(repo_id, unverifiable)
+        still_bad = missing + corrupt
+        if still_bad:
+            print(f"✗ {repo_id}: {len(still_bad)} file(s) missing or corrupt: {', '.join(still_bad)}")
+        return not still_bad
+
+    def update_manifest(self, repo_ids, path=None):
+        """Pin the hub's current file list, sizes and SHA256 in the manifest."""
+        for repo_id in repo_ids:
+            entry = self.manifest["repos"][repo_id]
+            remote = self._remote_files(repo_id)
+            names = list(entry.get("files") or remote)
+            files = {}
+            for name in names:
+                spec = dict(remote.get(name, {"size": None, "sha256": None}))
+                local = os.path.join(self.repo_dir(repo_id), name)
+                if spec["sha256"] is None and spec.get("git_sha1") and os.path.exists(local) \
+                        and _git_blob_sha1(local) == spec["git_sha1"]:
+                    # Regular (non-LFS) git files only expose a SHA1: hash the matching local copy
+                    spec["sha256"] = file_sha256(local)
+                if spec["sha256"] is not None:
+                    spec.pop("git_sha1", None)
+                elif not spec.get("git_sha1"):
+                    print(f"  ⚠️ {name}: not on the hub, left unpinned")
+                files[name] = spec
+            entry["files"] = files
+            print(f"📌 {repo_id}: pinned {len(files)} file(s)")
+
+        with open(path or MANIFEST_PATH, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+            f.write("\n")
 
 def check_models_exist(models_dir):
     """
     Check if all required SadTalker models exist in the checkpoints directory.
-    
+
     Args:
         models_dir: Path to the checkpoints directory
-        
+
     Returns:
         tuple: (all_exist: bool, missing_models: list)
     """
     if not os.path.exists(models_dir):
         return False, REQUIRED_MODELS
-    
+
     missing = []
     for model_file in REQUIRED_MODELS:
         model_path = os.path.join(models_dir, model_file)
         if not os.path.exists(model_path):
             missing.append(model_file)
-    
+
     return len(missing) == 0, missing
 
 def download_sadtalker_models(force=False):
     """
     Download SadTalker models from HuggingFace.
-    
+
     Args:
         force: If True, download even if models exist
     """
     print("Checking SadTalker models...")
-    
-    # Destination directory for the models (app/SadTalker/checkpoints)
-    models_dir = os.path.join(os.getcwd(), "app", "SadTalker", "checkpoints")
-    
-    # Check if models already exist
-    all_exist, missing = check_models_exist(models_dir)
-    
-    if all_exist and not force:
-        print(f"✓ All required SadTalker models found in: {models_dir}")
-        print("  No download needed.")
+    store = ModelStore()
+    if store.provision(SADTALKER_REPO, force=force):
         return True
-    
-    if not all_exist:
-        print(f"✗ Missing {len(missing)} model file(s):")
-        for model in missing:
-            print(f"  - {model}")
-    
-    os.makedirs(models_dir, exist_ok=True)
-    
-    repo_id = "vinthony/SadTalker"
-
-    try:
-        print(f"\nDownloading from: {repo_id}")
-        files = list_repo_files(repo_id=repo_id)
-        print(f"Found {len(files)} files in repository.")
-        
-        print(f"Downloading to: {models_dir}")
-        print("Note: This requires approximately 4GB of free disk space.")
-        print("This may take several minutes depending on your internet speed...\n")
-        
-        path = snapshot_download(
-            repo_id=repo_id,
-            local_dir=models_dir,
-            local_dir_use_symlinks=False
-        )
-        
-        # Verify download
-        all_exist, still_missing = check_models_exist(models_dir)
-        if all_exist:
-            print(f"\n✓ Successfully downloaded all SadTalker models to: {path}")
-            return True
-        else:
-            print(f"\n⚠ Download completed but some files are still missing:")
-            for model in still_missing:
-                print(f"  - {model}")
-            return False
-
-    except Exception as e:
-        print(f"\n✗ Download Error: {e}")
-        print("\n[!] Download failed. Please check:")
-        print("  - Internet connection")
-        print(f"  - Available disk space (need ~4-5GB on {os.path.splitdrive(os.getcwd())[0]})")
-        print("  - HuggingFace Hub access")
-        return False
-
-def ensure_models():
+
+    print("\n[!] Download failed. Please check:")
+    print("  - Internet connection")
+    print(f"  - Available disk space (need ~4-5GB on {os.path.splitdrive(store.repo_dir(SADTALKER_REPO))[0] or '/'})")
+    print("  - HuggingFace Hub access")
+    return False
+
+def ensure_models(groups=None):
     """
-    Ensure all required models are available. Download if necessary.
+    Ensure all required models are available and verified. Download if necessary.
     This function can be called from other modules.
-    
+
+    Args:
+        groups: Manifest groups to provision (default: MODEL_GROUPS, 'sadtalker')
+
     Returns:
         bool: True if all models are available, False otherwise
     """
-    models_dir = os.path.join(os.getcwd(), "app", "SadTalker", "checkpoints")
-    all_exist, missing = check_models_exist(models_dir)
-    
-    if all_exist:
-        return True
-    
-    print("\n" + "="*60)
-    print("SadTalker models are required but not found.")
-    print("="*60)
-    return download_sadtalker_models()
+    if groups is None:
+        groups = [g.strip() for g in (os.environ.get("MODEL_GROUPS") or "sadtalker").split(",") if g.strip()]
+    store = ModelStore()
+    return all([store.provision(repo_id) for repo_id in store.repos(groups)])
+
+# One model check per process, started at startup (run.py, gunicorn post_worker_init)
+# or by the first caller; its result is kept for the life of the process
+_models_thread = None
+_models_ok = None
+_models_lock = threading.Lock()
+
+def ensure_models_in_background():
+    """
+    Run ensure_models() once in a daemon thread so the web server starts immediately.
+    Code that needs the checkpoints calls wait_for_models() first.
+    """
+    global _models_thread
+
+    def _run():
+        global _models_ok
+        _models_ok = ensure_models()
+        if not _models_ok:
+            print("\n[ERROR] Failed to ensure SadTalker models are available.")
+            print("Please run 'python download_models.py' manually or check your internet connection, "
+                  "then restart the server.")
+
+    with _models_lock:
+        if _models_thread is None:
+            _models_thread = threading.Thread(target=_run, name="ensure-models", daemon=True)
+            _models_thread.start()
+    return _models_thread
+
+def wait_for_models(timeout=None):
+    """
+    Block until this process's model check finished (starting it if nobody did) and
+    return its cached result: requests never provision, hash or call the hub themselves.
+
+    Returns:
+        bool: True if all models are available
+    """
+    ensure_models_in_background().join(timeout)
+    return bool(_models_ok)
 
 if __name__ == "__main__":
     import argparse
-    
-    parser = argparse.ArgumentParser(description='Download SadTalker models')
-    parser.add_argument('--force', action='store_true', 
+
+    parser = argparse.ArgumentParser(description='Provision and verify model files')
+    parser.add_argument('--group', action='append', default=None,
+                        help='Manifest group to provision (sadtalker, vieneu); repeatable')
+    parser.add_argument('--all', action='store_true', help='Provision every repository in the manifest')
+    parser.add_argument('--force', action='store_true',
                         help='Force download even if models exist')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel downloads (MODEL_DOWNLOAD_WORKERS)')
+    parser.add_argument('--verify', action='store_true', help='Re-hash every file, do not download')
+    parser.add_argument('--update-manifest', action='store_true',
+                        help='Write the current hub sizes and SHA256 into the manifest')
     args = parser.parse_args()
-    
-    success = download_sadtalker_models(force=args.force)
+
+    store = ModelStore()
+    groups = None if args.all else (args.group or ["sadtalker"])
+    repo_ids = store.repos(groups)
+
+    if args.update_manifest:
+        store.update_manifest(repo_ids)
+        exit(0)
+
+    if args.verify:
+        results = []
+        for repo_id in repo_ids:
+            ok, bad = store.verify(repo_id, full=True)
+            print(f"{'✓' if ok else '✗'} {repo_id}" + (f": {', '.join(bad)}" if bad else ""))
+            results.append(ok)
+        exit(0 if all(results) else 1)
+
+    success = all([store.provision(repo_id, force=args.force, workers=args.workers) for repo_id in repo_ids])
     exit(0 if success else 1)
@@ -0,0 +1,104 @@
+"""
+gunicorn configuration for production:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- The app is imported once in the master (preload) and shared copy-on-write.
+  Models are NOT loaded there: CUDA and llama.cpp threads do not survive fork.
+- Each worker warms up its TTS engine in post_worker_init, before it accepts a
+  connection, so no user request pays the model load. /readyz turns 200 then.
+- SIGTERM drains: listeners close, in-flight requests get graceful_timeout
+  seconds, then the engines (process pool, HTTP sessions) are closed.
+- One worker process by default, scaled with threads: presentations live in a
+  per-process PresentationModel that rewrites presentations.json without a file
+  lock, so several workers would overwrite each other's slide and video updates.
+  WEB_CONCURRENCY > 1 is only safe once that storage is shared.
+"""
+import os
+import signal
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _available_cpus():
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY') or 1)
+# Threads keep the worker responsive (probes, media, polling) while requests render videos;
+# synthesis and rendering run outside the GIL (llama.cpp, SadTalker subprocess)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS') or 0) or min(max(_available_cpus(), 4), 16)
+preload_app = True
+# gthread heartbeats from its main loop, so long renders are fine; this bounds a hung worker
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 120)
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT') or 300)
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Master, once: report the SadTalker checkpoints (never blocks startup on a download)."""
+    from app.services import lifecycle
+    if not lifecycle.check_sadtalker():
+        print("⚠️ SadTalker checkpoints missing: they are downloaded on the first video request "
+              "(or run 'python download_models.py' beforehand)")
+    if workers > 1:
+        print(f"⚠️ WEB_CONCURRENCY={workers}: presentation updates are not shared between worker "
+              "processes (presentations.json is rewritten per process); use 1 worker and more threads")
+    print(f"🚀 Starting {workers} workers x {threads} threads on {bind}")
+
+
+def post_worker_init(worker):
+    """Worker, before accepting connections: load and warm up the models."""
+    from app.services import lifecycle
+
+    # Warm-up can outlast the worker timeout; keep telling the master we are alive
+    done = threading.Event()
+
+    def heartbeat():
+        while not done.wait(1.0):
+            worker.notify()
+
+    threading.Thread(target=heartbeat, name='warmup-heartbeat', daemon=True).start()
+
+    # Model check once per worker, off the request path; video requests wait on its result
+    from download_models import ensure_models_in_background
+    ensure_models_in_background()
+    try:
+        lifecycle.warm_up()
+    finally:
+        done.set()
+
+    # First worker only: verify the checkpoints and read them once in the background
+    # so every SadTalker subprocess loads them from the page cache
+    if worker.age == 1 and os.environ.get('SADTALKER_PRIME_CACHE', '1').lower() in ('1', 'true', 'yes'):
+        threading.Thread(target=lifecycle.check_sadtalker, args=(True,),
+                         name='sadtalker-prime-cache', daemon=True).start()
+
+    # Stop reporting ready as soon as a shutdown starts (gunicorn's own handler still runs)
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def on_sigterm(signum, frame):
+        lifecycle.begin_drain()
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+
+def worker_exit(server, worker):
+    """Worker, after in-flight requests finished (or graceful_timeout passed)."""
+    from app.services import lifecycle
+    lifecycle.begin_drain()
+    if not lifecycle.wait_idle(timeout=5):
+        print(f"⚠️ Worker {worker.pid} exiting with {lifecycle.status()['inflight']} requests in flight")
+    lifecycle.shutdown()
@@ -17,21 +17,25 @@ if sys.platform == 'win32':
         # Silently continue if reconfigure fails
         pass
 
-from app import create_app
-from download_models import ensure_models
 
-# Check and download SadTalker models if needed
-print("Initializing VideoTeaching application...")
-if not ensure_models():
-    print("\n[ERROR] Failed to ensure SadTalker models are available.")
-    print("Please run 'python download_models.py' manually or check your internet connection.")
-    sys.exit(1)
+if __name__ == '__main__':
+    # Everything runs under the guard: VieNeu's process pool (VIENEU_WORKERS > 1) spawns
+    # workers that re-import this module as __mp_main__, and each would otherwise start
+    # its own model check and Flask app
+    from app import create_app
+    from download_models import ensure_models_in_background
 
-print("\n" + "="*60)
-print("Starting Flask application...")
-print("="*60 + "\n")
+    # Check and download SadTalker models in the background; video generation waits for them
+    print("Initializing VideoTeaching application...")
+    ensure_models_in_background()
 
-app = create_app()
+    print("\n" + "="*60)
+    print("Starting Flask application...")
+    print("="*60 + "\n")
 
-if __name__ == '__main__':
+    app = create_app()
+
+    # Development server: models still load on first use (production: gunicorn -c gunicorn.conf.py wsgi:app)
+    from app.services import lifecycle
+    lifecycle.mark_ready()
     app.run(host='0.0.0.0', port=5000, debug=True)
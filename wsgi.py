@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+WSGI entry point for production servers:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Models are checked once in the gunicorn master and warmed up in every worker
+before it accepts requests (see gunicorn.conf.py).
+"""
+from app import create_app
+
+app = create_app()